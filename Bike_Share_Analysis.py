@@ -59,6 +59,7 @@ import csv # read and write csv files
 from datetime import datetime # operations to parse dates
 from pprint import pprint # use to print data structures like dictionaries in
                           # a nicer way than the base print function.
+from bikeshare.csvio import first_row # first trip of a plain or compressed csv file
 
 
 # In[36]:
@@ -73,19 +74,13 @@ def print_first_point(filename):
     city = filename.split('-')[0].split('/')[-1]
     print('\nCity: {}'.format(city))
     
-    with open(filename, 'r') as f_in:
-        ## TODO: Use the csv library to set up a DictReader object. ##
-        ## see https://docs.python.org/3/library/csv.html           ##
-        trip_reader = csv.DictReader(f_in)
-        
-        ## TODO: Use a function on the DictReader object to read the     ##
-        ## first trip from the data file and store it in a variable.     ##
-        ## see https://docs.python.org/3/library/csv.html#reader-objects ##
-        first_trip =next(trip_reader)
-        
-        ## TODO: Use the pprint library to print the first trip. ##
-        ## see https://docs.python.org/3/library/pprint.html     ##
-        pprint(first_trip)
+    # first_row reads the header and the first trip, also from the
+    # gzip/zip archives of the raw data
+    first_trip = first_row(filename)
+    
+    ## TODO: Use the pprint library to print the first trip. ##
+    ## see https://docs.python.org/3/library/pprint.html     ##
+    pprint(first_trip)
     # output city name and first trip for later testing
     return (city, first_trip)
 
@@ -122,27 +117,9 @@ for data_file in data_files:
 # In[37]:
 
 
-def duration_in_mins(datum, city):
-    """
-    Takes as input a dictionary containing info about a single trip (datum) and
-    its origin city (city) and returns the trip duration in units of minutes.
-    
-    Remember that Washington is in terms of milliseconds while Chicago and NYC
-    are in terms of seconds. 
-    
-    HINT: The csv module reads in all of the data as strings, including numeric
-    values. You will need a function to convert the strings into an appropriate
-    numeric type when making your transformations.
-    see https://docs.python.org/3/library/functions.html
-    """
-    # YOUR CODE HERE
-    
-    if (city == 'NYC') or (city == 'Chicago'):
-        duration = int(datum['tripduration']) #We want time in terms of seconds for 'NYC' and 'Chicago'
-    else: 
-        duration = int(datum['Duration (ms)'])/1000 #We want time in terms of milliseconds for 'Washington' and 1 ms = 1/1000 
-    
-    return duration/60
+# The cleaning helpers live in bikeshare.wrangling so that the condense jobs
+# can import them without running the notebook.
+from bikeshare.wrangling import duration_in_mins
 
 
 # Some tests to check that your code works. There should be no output if all of
@@ -159,54 +136,7 @@ for city in tests:
 # In[38]:
 
 
-def time_of_trip(datum, city):
-    """
-    Takes as input a dictionary containing info about a single trip (datum) and
-    its origin city (city) and returns the month, hour, and day of the week in
-    which the trip was made.
-    
-    Remember that NYC includes seconds, while Washington and Chicago do not.
-    
-    HINT: You should use the datetime module to parse the original date
-    strings into a format that is useful for extracting the desired information.
-    see https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior
-    """
-    from datetime import datetime
-    
-    # YOUR CODE HERE
-    if city == 'NYC':
-        start_time = datum['starttime'] #Getting starttime from NewYork Data
-        
-        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string 
-        
-        t1 = datetime.strptime(start_time, '%m/%d/%Y %H:%M:%S') #Newyork includes seconds, So we used %S.
-        
-        #We are converting a local time to the String format we need by using strftime module
-        
-        day_of_week = t1.strftime('%A') #For getting full weekday name in solution
-        
-        return (t1.month, t1.hour, day_of_week)
-    elif city == 'Chicago':
-        start_time = datum['starttime']
-        
-        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string
-        
-        t2 = datetime.strptime(start_time, '%m/%d/%Y %H:%M') #Here we are not including seconds  
-        
-        #We are converting a local time to the String format we need by using strftime module
-        day_of_week = t2.strftime('%A')
-        
-        return (t2.month, t2.hour, day_of_week)
-    else:
-        starttime = datum['Start date']
-        
-        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string
-        t3 = datetime.strptime(starttime, '%m/%d/%Y %H:%M')
-        
-        #We are converting a local time to the String format we need by using strftime module
-        
-        day_of_week = t3.strftime('%A')
-        return (t3.month, t3.hour, day_of_week)
+from bikeshare.wrangling import time_of_trip
 
 
 # Some tests to check that your code works. There should be no output if all of
@@ -223,37 +153,7 @@ for city in tests:
 # In[39]:
 
 
-def type_of_user(datum, city):
-    """
-    Takes as input a dictionary containing info about a single trip (datum) and
-    its origin city (city) and returns the type of system user that made the
-    trip.
-    
-    Remember that Washington has different category names compared to Chicago
-    and NYC. 
-    """
-    
-    # YOUR CODE HERE
-    
-    if city == 'NYC' :
-        
-        user_type = datum['usertype']
-        
-    elif city == 'Chicago':
-        
-        user_type = datum['usertype']
-        
-    elif city == 'Washington':
-        
-        if datum['Member Type'] == 'Registered':
-            
-            user_type = 'Subscriber'
-            
-        else:
-            
-            user_type = 'Customer'
-    
-    return user_type
+from bikeshare.wrangling import type_of_user
 
 
 # Some tests to check that your code works. There should be no output if all of
@@ -272,48 +172,9 @@ for city in tests:
 # In[40]:
 
 
-def condense_data(in_file, out_file, city):
-    """
-    This function takes full data from the specified input file
-    and writes the condensed data to a specified output file. The city
-    argument determines how the input file will be parsed.
-    
-    HINT: See the cell below to see how the arguments are structured!
-    """
-    
-    with open(out_file, 'w') as f_out, open(in_file, 'r') as f_in:
-        # set up csv DictWriter object - writer requires column names for the
-        # first row as the "fieldnames" argument
-        out_colnames = ['duration', 'month', 'hour', 'day_of_week', 'user_type']        
-        trip_writer = csv.DictWriter(f_out, fieldnames = out_colnames)
-        trip_writer.writeheader()
-        
-        ## TODO: set up csv DictReader object ##
-        trip_reader = csv.DictReader(f_in)
-
-        first_trip = next(trip_reader)
-        # collect data from and process each row
-        for row in trip_reader:
-            # set up a dictionary to hold the values for the cleaned and trimmed
-            # data point
-            new_point = {}
-
-            ## TODO: use the helper functions to get the cleaned data from  ##
-            ## the original data dictionaries.                              ##
-            ## Note that the keys for the new_point dictionary should match ##
-            ## the column names set in the DictWriter object above.         ##
-            month, hour, day_of_week = time_of_trip(row, city)
-            new_point[out_colnames[0]] = duration_in_mins(row, city)
-            new_point[out_colnames[1]] = month
-            new_point[out_colnames[2]] = hour
-            new_point[out_colnames[3]] = day_of_week
-            new_point[out_colnames[4]] = type_of_user(row, city)
-            
-
-            ## TODO: write the processed information to the output file.     ##
-            ## see https://docs.python.org/3/library/csv.html#writer-objects ##
-            trip_writer.writerow(new_point)
-            
+# condense_data is in bikeshare.wrangling. The next cell condenses all three
+# cities at once with bikeshare.parallel.condense_cities, which writes the
+# same Summary files.
 
 
 # In[41]:
@@ -327,8 +188,10 @@ city_info = {'Washington': {'in_file': './data/Washington-CapitalBikeshare-2016.
              'NYC': {'in_file': './data/NYC-CitiBike-2016.csv',
                      'out_file': './data/NYC-2016-Summary.csv'}}
 
+# condense all three cities at once, using every core
+from bikeshare.parallel import condense_cities
+condense_cities(city_info)
 for city, filenames in city_info.items():
-    condense_data(filenames['in_file'], filenames['out_file'], city)
     print_first_point(filenames['out_file'])
 
 
@@ -351,36 +214,9 @@ for city, filenames in city_info.items():
 # In[42]:
 
 
-def number_of_trips(filename):
-    """
-    This function reads in a file with trip data and reports the number of
-    trips made by subscribers, customers, and total overall.
-    """
-    with open(filename, 'r') as f_in:
-        # set up csv reader object
-        reader = csv.DictReader(f_in)
-        
-        # initialize count variables
-        n_subscribers = 0
-        n_customers = 0
-        
-        # tally up ride types
-        for row in reader:
-            if row['user_type'] == 'Subscriber':
-                n_subscribers += 1 #Counting the no of trips made by Subscribers and Customers.
-            else:
-                n_customers += 1
-        
-        # compute total number of rides
-        n_total = n_subscribers + n_customers
-        
-        #Calculating proportion of the Subscribers and Customers using formula proportion = (count/total)*100
-        
-        sub_proportion = (n_subscribers/n_total)*100  #Here we used (count of ridership of subscribers/total)*100
-        
-        cus_proportion = (n_customers/n_total)*100 #Here we used (count of ridership of customers/total)*100
-        # return tallies as a tuple
-        return(n_subscribers, n_customers, n_total, sub_proportion, cus_proportion )
+# The tallies for Questions 4a-4c are registered aggregates in bikeshare.aggregate,
+# so all of them are computed from a single pass over each Summary file.
+from bikeshare.aggregate import summarize
 
 
 # In[43]:
@@ -392,9 +228,10 @@ def number_of_trips(filename):
 
 #Using my own new files of data created with middle name 'Summary1' 
 data_file = ['./data/Washington-2016-Summary1.csv', './data/Chicago-2016-Summary1.csv', './data/NYC-2016-Summary1.csv'] 
+trip_summaries = summarize(data_file)
 for datafiles in data_file:
     print(datafiles,": \n")
-    n_subscribers, n_customers, n_total, sub_proportion, cus_proportion = number_of_trips(datafiles)
+    n_subscribers, n_customers, n_total, sub_proportion, cus_proportion = trip_summaries[datafiles]['number_of_trips']
     #print(number_of_trips(datafiles))
     print("n_subscribers: ", n_subscribers)
     print("n_customers: ", n_customers)
@@ -423,27 +260,6 @@ for datafiles in data_file:
 ## TIP: For the Bay Area example, the average trip length is 14 minutes ##
 ## and 3.5% of trips are longer than 30 minutes.                        ##
 ## I will need a function to convert the strings into an appropriate numeric type before you aggregate data. 
-def len_of_trip(filename):
-    
-    with open(filename, 'r') as f_in:
-        
-        reader = csv.DictReader(f_in)
-        
-        s = 0 #Users taking time less than 30 min
-        t = 0 #Users taking time more than 30 min
-        total = 0 #Total duration
-        for row in reader:
-            s+=1
-            duration=float(row['duration'])
-            total=total + duration
-            if duration > 30:
-                t += 1
-        avg_length = (total/s) # calculating average trip length
-        
-        #Calculating proportion of total users taking time more than 30 minutes to the users taking time less than 30 minutes
-        prop = (t/s)*100 
-        
-        return (s, t, avg_length, prop, total)
 
 
 # In[45]:
@@ -453,7 +269,7 @@ data_file = ['./data/Washington-2016-Summary1.csv', './data/Chicago-2016-Summary
 for datafiles in data_file:
     print(datafiles,": \n")
     
-    s, t, avg_length, prop, total = len_of_trip(datafiles)
+    s, t, avg_length, prop, total = trip_summaries[datafiles]['len_of_trip']
     print("Average trip : ", avg_length)
     print("Total duration length: ", total)
     print("Proportion : ", prop)
@@ -477,34 +293,6 @@ for datafiles in data_file:
 ## Subscriber trip duration to be 9.5 minutes and the average Customer ##
 ## trip duration to be 54.6 minutes. Do the other cities have this     ##
 ## level of difference?                                                ##
-def Duration_RiderShip(filename):
-    
-    with open(filename, 'r') as f_in:
-        
-        reader = csv.DictReader(f_in)
-        
-        #Here we are counting the subscribers and customers and finding there total duration of each city
-        sub = 0
-        cus = 0
-        sub_total = 0
-        cus_total = 0
-        for row in reader:
-            user_type = row['user_type']
-            duration=float(row['duration'])
-            if user_type == 'Subscriber':
-                
-                sub += 1
-                
-                sub_total += duration
-            elif user_type == 'Customer':
-                
-                cus += 1
-                
-                cus_total += duration
-        average_sub = sub_total / sub
-        average_cus = cus_total / cus
-        
-        return (sub, cus, average_sub, average_cus)
 
 
 # In[47]:
@@ -514,7 +302,7 @@ data_file = ['./data/Washington-2016-Summary1.csv', './data/Chicago-2016-Summary
 for datafiles in data_file:
     
     print(datafiles,": \n")
-    sub, cus, average_sub, average_cus = Duration_RiderShip(datafiles)
+    sub, cus, average_sub, average_cus = trip_summaries[datafiles]['Duration_RiderShip']
     print("Subscriber: ", sub)
     print("Customer: ", cus)
     print("Average Subscriber Ride duration: ", average_sub)
@@ -553,21 +341,22 @@ plt.show()
 
 ## Use this and additional cells to collect all of the trip times as a list ##
 ## and then use pyplot functions to generate a histogram of trip times.     ##
-import pandas as pt
 import matplotlib.pyplot as plt
-import numpy as py
 get_ipython().run_line_magic('matplotlib', 'inline')
 
+# The bin counts are computed in one chunked pass over the Summary file, for
+# every user type at once, and only the counts are handed to matplotlib.
+import numpy as np
+
+from bikeshare.analysis import duration_histograms
+from bikeshare.plots import plot_histogram
+
 
 # In[50]:
 
 
-trip_times = pt.read_csv('./data/NYC-2016-Summary1.csv') 
-duration = trip_times['duration']
-bins = py.arange(0,75,4) # I am using arange function from numpy and we are giving it 3parameters namely- start, end, step
-plt.hist(duration, bins)
-plt.title('Trip Durations of NYC')
-plt.xlabel('Duration(m)')
+edges, histograms = duration_histograms('./data/NYC-2016-Summary1.csv', bins=np.arange(0, 75, 4))
+plot_histogram(edges, histograms['all'], 'Trip Durations of NYC', 'Duration(m)')
 plt.show()
 
 
@@ -582,18 +371,11 @@ plt.show()
 
 ## Use this and additional cells to answer Question 5. ##
 ## For Subscribers
-#query function from pandas library for checking user_type and duration
-sub = trip_times.query('user_type == "Subscriber"') #query function from pandas library for checking user_type
-sub1 = sub.query('duration < 75')
-duration = sub1['duration']
-bins = py.arange(0,75,5)
-
-plt.hist(duration, bins)
-bar = bins + 5 #We want bars at 5minutes wide interval
-label = ['5','10','15','20','25','30','35','40','45','50','55,''60','65','70','75']
-plt.xticks(bar, label)
-plt.title('Trip Durations for subscribers')
-plt.xlabel('Duration (m) ')
+# trips of less than 75 minutes, in bars 5 minutes wide
+edges, histograms = duration_histograms('./data/NYC-2016-Summary1.csv', bins=np.arange(0, 75, 5))
+
+plot_histogram(edges, histograms['Subscriber'], 'Trip Durations for subscribers', 'Duration (m) ')
+plt.xticks(edges[1:])
 plt.show()
 
 
@@ -601,17 +383,8 @@ plt.show()
 
 
 ##For Customers
-cus = trip_times.query('user_type == "Customer"')
-cus1 = cus.query('duration < 75')
-duration = cus1['duration']
-bins = py.arange(0,75,5)
-
-plt.hist(duration, bins)
-bar = bins + 5
-labels = ['5','10','15','20','25','30','35','40','45','50','55,''60','65','70','75']
-plt.xticks(bar, labels)
-plt.title('Trip Durations for Customers')
-plt.xlabel('Duration (m) ')
+plot_histogram(edges, histograms['Customer'], 'Trip Durations for Customers', 'Duration (m) ')
+plt.xticks(edges[1:])
 plt.show()
 
 
@@ -644,55 +417,16 @@ plt.show()
 # In[59]:
 
 
-def rider_ship(filename,city): #making a function to calculate ridership
-    #Subscriber count for weekdays and duration of subscribers for weekends and weekdays
-    dur_wkend_Sub=0
-    sub_wkend_count=0
-    dur_wkday_Sub=0
-    sub_wkday_count=0
-    
-    #Customer count for weekdays and duration of subscribers for weekends and weekdays
-    dur_wkend_Cus=0
-    Cus_wkend_count=0
-    dur_wkday_Cus=0
-    Cus_wkday_count=0
-    
-    
-    with open(filename, 'r') as f_in:
-        tripreader = csv.DictReader(f_in)
-        
-        for row in tripreader:
-            day = time_of_trip(row,city)[2] # For Getting day
-            user = type_of_user(row,city) # For Getting user_type
-            dur = duration_in_mins(row, city) # For Getting Duration
-            if user == 'Subscriber':
-                if (day =='Saturday') or (day == 'Sunday'):
-                    dur_wkend_Sub += dur
-                    sub_wkend_count += 1
-                else:
-                    dur_wkday_Sub += dur
-                    sub_wkday_count += 1
-            else:
-                if (day =='Saturday') or (day == 'Sunday'):
-                    dur_wkend_Cus += dur
-                    Cus_wkend_count += 1
-                else:
-                    dur_wkday_Cus += dur
-                    Cus_wkday_count += 1
-        
-        avg_wkend_sub = dur_wkend_Sub/sub_wkend_count #Average weekend duration of Subscribers
-        avg_wkday_sub = dur_wkday_Sub/sub_wkday_count #Average weekday duration of Subscribers
-        avg_wkend_Cus = dur_wkend_Cus/Cus_wkend_count #Average weekend duration of Customers
-        avg_wkday_Cus = dur_wkday_Cus/Cus_wkday_count #Average weekday duration of Customers
-        
-        return avg_wkend_Cus, avg_wkend_sub, avg_wkday_Cus, avg_wkday_sub
-    
+# rider_ship is kept in bikeshare.analysis with the other analyses. Given
+# the condensed Summary file it uses the weekday column directly instead of
+# parsing every timestamp of the raw file again.
+from bikeshare.analysis import rider_ship
 
 
 # In[54]:
 
 
-data_file = './data/Chicago-Divvy-2016.csv'
+data_file = './data/Chicago-2016-Summary.csv'
 city ='Chicago' 
 
 print(data_file,": \n")
@@ -753,6 +487,20 @@ plt.xlabel('Customers')
 plt.show()
 
 
+# In[60]:
+
+
+# During what time of day is the system used the most? The same kind of
+# question can be asked of any grouping of the condensed columns.
+from bikeshare.query import query, top
+
+hourly = query('./data/Chicago-2016-Summary.csv', by=['user_type', 'hour'],
+               aggregates=['count', 'share'])
+for row in top(hourly, 'user_type'):
+    print("Busiest hour for {}s: {}:00 ({:.2f}% of trips)".format(
+        row['user_type'], row['hour'], row['share']))
+
+
 # <h1>References Which Helped me in making this Project: </h1>
 # 
 # <h3>List of Links: </h3>
@@ -786,6 +534,9 @@ plt.show()
 # In[ ]:
 
 
-from subprocess import call
-call(['python', '-m', 'nbconvert', 'Bike_Share_Analysis.ipynb'])
+# The report is built by bikeshare.report from the Summary files, one
+# worker process per city, without executing the notebook again. The same
+# report can be generated outside Jupyter with `python -m bikeshare.report`.
+from bikeshare.report import build_report
+build_report({city: filenames['out_file'] for city, filenames in city_info.items()}, './report')
 
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of bikeshare.timeparse.parse_start_time against the
+strptime based time_of_trip it replaced.
+
+    python benchmarks/bench_timeparse.py [number of timestamps]
+"""
+
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bikeshare.timeparse import calendar_day, parse_start_time, start_time_parser
+
+
+def strptime_time_of_trip(start_time, time_format):
+    """
+    The original implementation of time_of_trip, for reference.
+    """
+    t1 = datetime.strptime(start_time, time_format)
+    return (t1.month, t1.hour, t1.strftime('%A'))
+
+
+def make_timestamps(n, with_seconds, seed=2016):
+    """
+    Returns n random 2016 start times in the layout the cities use, with
+    unpadded month and day as in the raw files.
+    """
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1)
+    timestamps = []
+    for _ in range(n):
+        t = start + timedelta(seconds=rng.randrange(366 * 24 * 3600))
+        clock = t.strftime('%H:%M:%S' if with_seconds else '%H:%M')
+        timestamps.append('{}/{}/{} {}'.format(t.month, t.day, t.year, clock))
+    return timestamps
+
+
+def main(n=200000):
+    for label, with_seconds, time_format in [('NYC', True, '%m/%d/%Y %H:%M:%S'),
+                                             ('Chicago/Washington', False, '%m/%d/%Y %H:%M')]:
+        timestamps = make_timestamps(n, with_seconds)
+
+        # both versions have to agree on every timestamp
+        for value in timestamps:
+            assert parse_start_time(value, time_format) == \
+                strptime_time_of_trip(value, time_format), value
+
+        calendar_day.cache_clear()
+        slow = timeit.timeit(
+            lambda: [strptime_time_of_trip(v, time_format) for v in timestamps], number=1)
+        # the parser the adapters use, looked up once per file
+        parse = start_time_parser(time_format)
+        fast = timeit.timeit(lambda: [parse(v) for v in timestamps], number=1)
+        print('{:<20} strptime {:8.0f} rows/s   parse_start_time {:9.0f} rows/s   x{:.1f}'.format(
+            label, n / slow, n / fast, slow / fast))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,169 @@
+"""
+Benchmark suite for the wrangling and analysis functions.
+
+Generates synthetic raw files for each city (see synthetic.py), runs every
+function over them and reports time, rows per second and peak Python
+memory (tracemalloc, measured in a separate run so tracing does not skew
+the timings). Results are written as JSON so runs of different versions
+can be compared. The result cache (bikeshare.cache) is disabled for the
+run, including one configured through BIKESHARE_CACHE_DIR, so every
+benchmark does the work it measures:
+
+    python benchmarks/run_benchmarks.py --rows 1000000 --output new.json
+    python benchmarks/run_benchmarks.py --rows 1000000 --compare old.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bikeshare.analysis import (Duration_RiderShip, len_of_trip, number_of_trips,
+                                rider_ship)
+from bikeshare.cache import disable_cache
+from bikeshare.wrangling import (condense_data, duration_in_mins, time_of_trip,
+                                 type_of_user)
+from synthetic import write_raw_file
+
+
+CITIES = ['NYC', 'Chicago', 'Washington']
+
+
+def load_rows(filename):
+    with open(filename, 'r') as f_in:
+        return list(csv.DictReader(f_in))
+
+
+def benchmark_cases(city, raw_file, summary_file, rows):
+    """
+    Returns (name, function) pairs; each function runs one benchmark over
+    the synthetic files of city.
+    """
+    def helper(function):
+        return lambda: [function(row, city) for row in rows]
+
+    def condense(mode):
+        return lambda: condense_data(raw_file, summary_file + '.' + mode, city, mode=mode)
+
+    cases = [('duration_in_mins', helper(duration_in_mins)),
+             ('time_of_trip', helper(time_of_trip)),
+             ('type_of_user', helper(type_of_user)),
+             ('condense_data', lambda: condense_data(raw_file, summary_file, city))]
+    try:
+        import pandas  # noqa: F401 - the vectorized mode needs it
+        cases.append(('condense_data[vectorized]', condense('vectorized')))
+    except ImportError:
+        pass
+    cases += [('number_of_trips', lambda: number_of_trips(summary_file)),
+              ('len_of_trip', lambda: len_of_trip(summary_file)),
+              ('Duration_RiderShip', lambda: Duration_RiderShip(summary_file)),
+              ('rider_ship', lambda: rider_ship(raw_file, city))]
+    return cases
+
+
+def measure(function, repeat, memory):
+    """
+    Runs function repeat times and returns the best time in seconds and,
+    if memory is True, the peak traced memory of one extra run in bytes.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(n_rows, cities, repeat=1, memory=True, work_dir=None):
+    """
+    Runs the suite with the result cache disabled and returns the results
+    as a dictionary.
+    """
+    # a cached answer would time the cache lookup instead of the function
+    disable_cache()
+    results = {'revision': git_revision(),
+               'python': platform.python_version(),
+               'rows': n_rows,
+               'repeat': repeat,
+               'cache': 'disabled',
+               'cities': {}}
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        for city in cities:
+            raw_file = os.path.join(tmp, '{}-raw.csv'.format(city))
+            summary_file = os.path.join(tmp, '{}-Summary.csv'.format(city))
+            write_raw_file(city, n_rows, raw_file)
+            rows = load_rows(raw_file)
+
+            city_results = results['cities'][city] = {}
+            for name, function in benchmark_cases(city, raw_file, summary_file, rows):
+                seconds, peak = measure(function, repeat, memory)
+                city_results[name] = {'seconds': seconds,
+                                      'rows_per_sec': n_rows / seconds if seconds else None,
+                                      'peak_bytes': peak}
+                print('{:<11} {:<26} {:9.3f} s {:12.0f} rows/s {:>12}'.format(
+                    city, name, seconds, n_rows / seconds,
+                    '' if peak is None else '{:.1f} MiB'.format(peak / 2**20)))
+    return results
+
+
+def compare(results, baseline):
+    """
+    Prints the time of every benchmark relative to a baseline run.
+    """
+    print('\nspeedup against the baseline ({} rows, revision {}):'.format(
+        baseline.get('rows'), baseline.get('revision')))
+    for city, city_results in results['cities'].items():
+        for name, result in city_results.items():
+            old = baseline.get('cities', {}).get(city, {}).get(name)
+            if old is None:
+                continue
+            print('{:<11} {:<26} x{:.2f}'.format(city, name, old['seconds'] / result['seconds']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=100000, help='trips per city')
+    parser.add_argument('--cities', nargs='+', default=CITIES, choices=CITIES)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per benchmark, best is kept')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--work-dir', help='directory for the synthetic files')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.cities, args.repeat, not args.no_memory, args.work_dir)
+    if args.output:
+        with open(args.output, 'w') as f_out:
+            json.dump(results, f_out, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as f_in:
+            compare(results, json.load(f_in))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Synthetic trip generator for the benchmarks.
+
+Writes random 2016 trips in the raw schema of each city, so the wrangling
+functions can be measured at any size without the real data:
+
+    python benchmarks/synthetic.py NYC 1000000 ./NYC-synthetic.csv
+"""
+
+import csv
+import random
+import sys
+from datetime import datetime, timedelta
+
+
+# city -> header of the raw file
+RAW_COLUMNS = {
+    'NYC': ['tripduration', 'starttime', 'stoptime', 'start station id',
+            'start station name', 'start station latitude', 'start station longitude',
+            'end station id', 'end station name', 'end station latitude',
+            'end station longitude', 'bikeid', 'usertype', 'birth year', 'gender'],
+    'Chicago': ['trip_id', 'starttime', 'stoptime', 'bikeid', 'tripduration',
+                'from_station_id', 'from_station_name', 'to_station_id',
+                'to_station_name', 'usertype', 'gender', 'birthyear'],
+    'Washington': ['Duration (ms)', 'Start date', 'End date', 'Start station number',
+                   'Start station', 'End station number', 'End station',
+                   'Bike number', 'Member Type'],
+}
+
+YEAR_START = datetime(2016, 1, 1)
+N_STATIONS = 600
+
+
+def _timestamp(t, with_seconds):
+    # the raw files do not zero pad the month and day
+    clock = t.strftime('%H:%M:%S' if with_seconds else '%H:%M')
+    return '{}/{}/{} {}'.format(t.month, t.day, t.year, clock)
+
+
+def generate_trips(city, n_rows, seed=2016):
+    """
+    Yields n_rows random trips for city as lists in the order of
+    RAW_COLUMNS[city]. Durations are roughly log-normal around 12 minutes
+    and about 10% of trips are made by customers.
+    """
+    rng = random.Random(seed)
+    for i in range(n_rows):
+        start = YEAR_START + timedelta(seconds=rng.randrange(366 * 24 * 3600))
+        seconds = max(60, int(rng.lognormvariate(6.6, 0.7)))
+        stop = start + timedelta(seconds=seconds)
+        origin = rng.randrange(N_STATIONS)
+        destination = rng.randrange(N_STATIONS)
+        subscriber = rng.random() < 0.9
+
+        if city == 'NYC':
+            yield [seconds, _timestamp(start, True), _timestamp(stop, True),
+                   origin, 'Station {}'.format(origin), '40.7', '-74.0',
+                   destination, 'Station {}'.format(destination), '40.7', '-74.0',
+                   rng.randrange(10000), 'Subscriber' if subscriber else 'Customer',
+                   1980 if subscriber else '', rng.randrange(3)]
+        elif city == 'Chicago':
+            yield [i, _timestamp(start, False), _timestamp(stop, False),
+                   rng.randrange(10000), seconds, origin, 'Station {}'.format(origin),
+                   destination, 'Station {}'.format(destination),
+                   'Subscriber' if subscriber else 'Customer',
+                   'Male' if subscriber else '', 1980 if subscriber else '']
+        else:
+            yield [seconds * 1000 + rng.randrange(1000), _timestamp(start, False),
+                   _timestamp(stop, False), origin, 'Station {}'.format(origin),
+                   destination, 'Station {}'.format(destination),
+                   'W{:05d}'.format(rng.randrange(10000)),
+                   'Registered' if subscriber else 'Casual']
+
+
+def write_raw_file(city, n_rows, filename, seed=2016):
+    """
+    Writes a raw trip file with a header and n_rows synthetic trips.
+    """
+    with open(filename, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(RAW_COLUMNS[city])
+        writer.writerows(generate_trips(city, n_rows, seed))
+
+
+if __name__ == '__main__':
+    city, n_rows, filename = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    write_raw_file(city, n_rows, filename)
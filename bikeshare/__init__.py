@@ -0,0 +1,7 @@
+"""
+Helpers for wrangling and analysing the 2016 US bike share trip data.
+
+The notebook (Bike_Share_Analysis.ipynb) and its exported script walk
+through the analysis question by question; the modules in this package
+hold the reusable pieces so they can be run over the full-year data.
+"""
@@ -0,0 +1,9 @@
+"""
+Entry point of python -m bikeshare, see bikeshare.cli.
+"""
+
+from bikeshare.cli import main
+
+
+if __name__ == '__main__':
+    main()
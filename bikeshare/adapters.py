@@ -0,0 +1,134 @@
+"""
+City adapters.
+
+Every bike share system publishes the same information under its own
+column names and conventions. A CityAdapter declares them once for a city:
+which column holds the duration and in which unit, which column holds the
+start time and in which layout, and how the user types map onto
+'Subscriber' and 'Customer'. Adding another Motivate city is then a matter
+of registering an adapter.
+
+compile_transformer turns an adapter and the header of a raw file into a
+function that condenses one csv row (a list of strings) into the tuple
+(duration, month, hour, day_of_week, user_type), with the column
+positions resolved up front and no per-row branching on the city.
+"""
+
+from bikeshare.timeparse import start_time_parser
+
+
+class CityAdapter(object):
+    """
+    Column mapping and conventions of one city's raw trip files.
+
+    duration_unit is the number of duration units per second (1 for
+    seconds, 1000 for milliseconds). time_format is the strptime layout of
+    the start times. user_types maps raw user type values to the condensed
+    names; values missing from it become default_user_type. When
+    user_types is None the raw values are kept as they are.
+    start_station_column and end_station_column name the origin and
+    destination stations, for the station index (see bikeshare.stations).
+    Start times in the layouts of the three cities are parsed by slicing
+    the string (see bikeshare.timeparse), any other layout with strptime.
+    """
+    def __init__(self, city, duration_column, duration_unit, start_column,
+                 time_format, user_type_column, user_types=None,
+                 default_user_type='Customer', start_station_column=None,
+                 end_station_column=None):
+        self.city = city
+        self.duration_column = duration_column
+        self.duration_unit = duration_unit
+        self.start_column = start_column
+        self.time_format = time_format
+        self.user_type_column = user_type_column
+        self.user_types = user_types
+        self.default_user_type = default_user_type
+        self.start_station_column = start_station_column
+        self.end_station_column = end_station_column
+
+    def columns(self):
+        """
+        The raw columns the condensed data is derived from.
+        """
+        return [self.duration_column, self.start_column, self.user_type_column]
+
+    def __repr__(self):
+        return 'CityAdapter({!r})'.format(self.city)
+
+
+CITY_ADAPTERS = {}
+
+
+def register_city(adapter):
+    """
+    Adds an adapter to the registry, replacing any earlier one for the
+    same city.
+    """
+    CITY_ADAPTERS[adapter.city] = adapter
+    return adapter
+
+
+def get_adapter(city):
+    try:
+        return CITY_ADAPTERS[city]
+    except KeyError:
+        raise KeyError('no adapter registered for city {!r}'.format(city))
+
+
+register_city(CityAdapter('NYC', 'tripduration', 1, 'starttime',
+                          '%m/%d/%Y %H:%M:%S', 'usertype',
+                          start_station_column='start station name',
+                          end_station_column='end station name'))
+register_city(CityAdapter('Chicago', 'tripduration', 1, 'starttime',
+                          '%m/%d/%Y %H:%M', 'usertype',
+                          start_station_column='from_station_name',
+                          end_station_column='to_station_name'))
+register_city(CityAdapter('Washington', 'Duration (ms)', 1000, 'Start date',
+                          '%m/%d/%Y %H:%M', 'Member Type',
+                          user_types={'Registered': 'Subscriber'},
+                          start_station_column='Start station',
+                          end_station_column='End station'))
+
+
+def compile_transformer(city, header):
+    """
+    Returns a function that condenses one raw csv row of city, given as a
+    list of strings laid out as in header, into the tuple (duration,
+    month, hour, day_of_week, user_type). The values are exactly those of
+    duration_in_mins, time_of_trip and type_of_user.
+    """
+    adapter = get_adapter(city)
+    duration_index = header.index(adapter.duration_column)
+    start_index = header.index(adapter.start_column)
+    user_index = header.index(adapter.user_type_column)
+    unit = adapter.duration_unit
+    user_types = adapter.user_types
+    default_user_type = adapter.default_user_type
+    parse = start_time_parser(adapter.time_format)
+
+    # one specialised closure per combination, so the returned function
+    # does no work that depends only on the city
+    if user_types is None:
+        if unit == 1:
+            def transform(row):
+                month, hour, day_of_week = parse(row[start_index])
+                return (int(row[duration_index])/60, month, hour, day_of_week,
+                        row[user_index])
+        else:
+            def transform(row):
+                month, hour, day_of_week = parse(row[start_index])
+                return (int(row[duration_index])/unit/60, month, hour, day_of_week,
+                        row[user_index])
+    else:
+        lookup = user_types.get
+        if unit == 1:
+            def transform(row):
+                month, hour, day_of_week = parse(row[start_index])
+                return (int(row[duration_index])/60, month, hour, day_of_week,
+                        lookup(row[user_index], default_user_type))
+        else:
+            def transform(row):
+                month, hour, day_of_week = parse(row[start_index])
+                return (int(row[duration_index])/unit/60, month, hour, day_of_week,
+                        lookup(row[user_index], default_user_type))
+    return transform
@@ -0,0 +1,239 @@
+"""
+Single pass aggregation over the condensed trip data.
+
+Each question in the notebook (number of trips, trip length, duration by
+user type, weekday against weekend ridership) is a reduction over the same
+condensed columns. Instead of reading the Summary file once per question,
+the aggregates are registered here and all of them are updated from one
+streaming pass over the file.
+"""
+
+from bikeshare.cache import cached
+from bikeshare.csvio import iter_columns
+from bikeshare.partition import is_partitioned, iter_dataset_trips
+from bikeshare.store import is_trip_store, iter_trips
+from bikeshare.wrangling import out_colnames
+
+
+WEEKEND_DAYS = ('Saturday', 'Sunday')
+
+# name -> aggregate class, filled in by register_aggregate
+AGGREGATES = {}
+
+
+def register_aggregate(name):
+    """
+    Class decorator that adds an aggregate to the registry under the given
+    name, so that it can be requested by name from run_aggregates.
+    """
+    def decorator(cls):
+        if name in AGGREGATES:
+            raise ValueError('aggregate {!r} is already registered'.format(name))
+        cls.name = name
+        AGGREGATES[name] = cls
+        return cls
+    return decorator
+
+
+class Aggregate(object):
+    """
+    Base class for an aggregate. update is called once per condensed trip
+    with the already parsed fields and result returns the final answer.
+    Aggregates with default set to False only run when asked for by name.
+    """
+    name = None
+    default = True
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+@register_aggregate('number_of_trips')
+class TripCounts(Aggregate):
+    """
+    Number of trips made by subscribers and customers, the total, and the
+    proportion (in percent) of each user type.
+    """
+    def __init__(self):
+        self.n_subscribers = 0
+        self.n_customers = 0
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        if user_type == 'Subscriber':
+            self.n_subscribers += 1
+        else:
+            self.n_customers += 1
+
+    def result(self):
+        n_total = self.n_subscribers + self.n_customers
+        sub_proportion = (self.n_subscribers/n_total)*100
+        cus_proportion = (self.n_customers/n_total)*100
+        return (self.n_subscribers, self.n_customers, n_total,
+                sub_proportion, cus_proportion)
+
+
+@register_aggregate('len_of_trip')
+class TripLength(Aggregate):
+    """
+    Number of trips, number of trips longer than the threshold (30 minutes
+    by default), the average trip length, the proportion (in percent) of
+    long trips and the total duration.
+    """
+    def __init__(self, threshold=30):
+        self.threshold = threshold
+        self.count = 0
+        self.over = 0
+        self.total = 0
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        self.count += 1
+        self.total += duration
+        if duration > self.threshold:
+            self.over += 1
+
+    def result(self):
+        avg_length = self.total/self.count
+        prop = (self.over/self.count)*100
+        return (self.count, self.over, avg_length, prop, self.total)
+
+
+@register_aggregate('Duration_RiderShip')
+class DurationByUserType(Aggregate):
+    """
+    Number of subscriber and customer trips and the average duration of
+    each. Trips with any other user type are ignored.
+    """
+    def __init__(self):
+        self.sub = 0
+        self.cus = 0
+        self.sub_total = 0
+        self.cus_total = 0
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        if user_type == 'Subscriber':
+            self.sub += 1
+            self.sub_total += duration
+        elif user_type == 'Customer':
+            self.cus += 1
+            self.cus_total += duration
+
+    def result(self):
+        return (self.sub, self.cus, self.sub_total/self.sub,
+                self.cus_total/self.cus)
+
+
+@register_aggregate('rider_ship')
+class WeekendSplit(Aggregate):
+    """
+    Average trip duration of customers and subscribers on weekends and on
+    weekdays, in the order returned by rider_ship: (weekend customer,
+    weekend subscriber, weekday customer, weekday subscriber). A
+    combination without any trip averages to NaN, as in the rollup cube.
+    Only computed when asked for by name.
+    """
+    default = False
+
+    def __init__(self):
+        # [weekend, weekday] x [customer, subscriber]
+        self.totals = [[0, 0], [0, 0]]
+        self.counts = [[0, 0], [0, 0]]
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        segment = 0 if day_of_week in WEEKEND_DAYS else 1
+        user = 1 if user_type == 'Subscriber' else 0
+        self.totals[segment][user] += duration
+        self.counts[segment][user] += 1
+
+    def add(self, weekend, user_type, total, count):
+        """
+        Adds count trips of the given total duration at once, for the
+        callers that have already summed them up.
+        """
+        segment = 0 if weekend else 1
+        user = 1 if user_type == 'Subscriber' else 0
+        self.totals[segment][user] += total
+        self.counts[segment][user] += count
+
+    def result(self):
+        return tuple(self.totals[segment][user]/self.counts[segment][user]
+                     if self.counts[segment][user] else float('nan')
+                     for segment in (0, 1) for user in (0, 1))
+
+
+def make_aggregates(names=None):
+    """
+    Instantiates the named aggregates (all default aggregates when names
+    is None). Aggregate instances may also be passed in directly, which is
+    how non-default parameters such as a different threshold are given.
+    """
+    if names is None:
+        names = [name for name, cls in AGGREGATES.items() if cls.default]
+    aggregates = []
+    for name in names:
+        if isinstance(name, Aggregate):
+            aggregates.append(name)
+        elif name in AGGREGATES:
+            aggregates.append(AGGREGATES[name]())
+        else:
+            raise KeyError('unknown aggregate {!r}'.format(name))
+    return aggregates
+
+
+def run_aggregates(filename, names=None):
+    """
+    Reads a condensed trip file (Summary csv or trip store) once and updates
+    every requested aggregate from that single pass. Returns a dictionary
+    mapping each aggregate name to its result.
+
+    Requests made by name are answered from the result cache when it is
+    enabled (see bikeshare.cache); passing aggregate instances always reads
+    the file, since the instances are updated in place.
+    """
+    if names is not None and not all(isinstance(name, str) for name in names):
+        return _run_aggregates(filename, names)
+    return _run_named_aggregates(filename, None if names is None else list(names))
+
+
+@cached
+def _run_named_aggregates(filename, names):
+    return _run_aggregates(filename, names)
+
+
+def _run_aggregates(filename, names):
+    aggregates = make_aggregates(names)
+    updates = [aggregate.update for aggregate in aggregates]
+
+    for duration, month, hour, day_of_week, user_type in iter_condensed(filename):
+        for update in updates:
+            update(duration, month, hour, day_of_week, user_type)
+
+    return {aggregate.name: aggregate.result() for aggregate in aggregates}
+
+
+def iter_condensed(filename):
+    """
+    Yields (duration, month, hour, day_of_week, user_type) for every trip
+    in a condensed file, which may be a Summary csv file or a binary trip
+    store, or a partitioned dataset directory. Each field is parsed once
+    here and shared by all aggregates.
+    """
+    if is_partitioned(filename):
+        yield from iter_dataset_trips(filename)
+        return
+    if is_trip_store(filename):
+        yield from iter_trips(filename)
+        return
+
+    for duration, month, hour, day_of_week, user_type in iter_columns(filename, out_colnames):
+        yield float(duration), int(month), int(hour), day_of_week, user_type
+
+
+def summarize(filenames, names=None):
+    """
+    Runs the requested aggregates over each of the condensed trip files,
+    one pass per file. Returns a dictionary keyed by filename.
+    """
+    return {filename: run_aggregates(filename, names) for filename in filenames}
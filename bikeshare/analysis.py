@@ -0,0 +1,239 @@
+"""
+Descriptive statistics over the trip data (Questions 4 and 6 of the notebook).
+
+These keep the interface of the functions written for Question 4 of the
+notebook; each one is a thin wrapper around a registered aggregate. When
+several of them are needed for the same file, use
+bikeshare.aggregate.run_aggregates so the file is only read once.
+
+The results are kept in the persistent result cache when it is enabled
+(see bikeshare.cache); the aggregates are cached by run_aggregates.
+"""
+
+import csv
+
+from bikeshare.adapters import compile_transformer
+from bikeshare.aggregate import WEEKEND_DAYS, WeekendSplit, run_aggregates
+from bikeshare.cache import cached
+from bikeshare.inputs import open_input
+from bikeshare.partition import is_partitioned
+from bikeshare.store import is_trip_store
+from bikeshare.timeparse import DAY_NAMES
+from bikeshare.wrangling import out_colnames
+
+
+# number of trips processed at a time by the trip store analyses
+CHUNK_ROWS = 1 << 20
+
+
+def number_of_trips(filename):
+    """
+    This function reads in a file with trip data and reports the number of
+    trips made by subscribers, customers, and total overall, along with the
+    proportion of subscribers and customers.
+    """
+    return run_aggregates(filename, ['number_of_trips'])['number_of_trips']
+
+
+def len_of_trip(filename):
+    """
+    This function reads in a file with trip data and reports the number of
+    trips, the number longer than 30 minutes, the average trip length, the
+    proportion of trips longer than 30 minutes and the total duration.
+    """
+    return run_aggregates(filename, ['len_of_trip'])['len_of_trip']
+
+
+def Duration_RiderShip(filename):
+    """
+    This function reads in a file with trip data and reports the number of
+    subscriber and customer trips and the average duration of each.
+    """
+    return run_aggregates(filename, ['Duration_RiderShip'])['Duration_RiderShip']
+
+
+def histogram_edges(bin_width=5, cutoff=75):
+    """
+    Bin edges from 0 to cutoff minutes in steps of bin_width; the last bin
+    is narrower when cutoff is not a multiple of bin_width.
+    """
+    import numpy as np
+
+    edges = np.arange(0, cutoff, bin_width, dtype=np.float64)
+    return np.append(edges, float(cutoff))
+
+
+@cached
+def duration_histograms(filename, bin_width=5, cutoff=75, bins=None, chunk_rows=CHUNK_ROWS):
+    """
+    This function counts the trips of a condensed file shorter than cutoff
+    minutes in bins of bin_width minutes, for all trips and for each user
+    type, in one chunked pass. Returns the bin edges and a dictionary of
+    counts keyed by 'all' and by user type, ready to be plotted with
+    bikeshare.plots.plot_histogram without holding the durations.
+
+    bins, the bin edges as for numpy.histogram (the last bin includes its
+    right edge), replaces bin_width and cutoff; the notebook's plots use
+    numpy.arange(0, 75, 5), which ends at 70 minutes.
+    """
+    import numpy as np
+    from bikeshare.query import iter_column_chunks
+
+    if bins is None:
+        edges = histogram_edges(bin_width, cutoff)
+    else:
+        edges = np.asarray(bins, dtype=np.float64)
+    n_bins = len(edges) - 1
+    counts = np.zeros(0, dtype=np.int64)
+    user_types = []
+    for chunk, user_types in iter_column_chunks(filename, chunk_rows):
+        durations = chunk['duration']
+        if bins is None:
+            keep = (durations >= 0) & (durations < cutoff)
+        else:
+            keep = (durations >= edges[0]) & (durations <= edges[-1])
+        # a trip on the last edge belongs to the last bin
+        cell = np.minimum(np.searchsorted(edges, durations[keep], side='right') - 1,
+                          n_bins - 1)
+        cell += chunk['user_type'][keep].astype(np.intp) * n_bins
+        size = n_bins * len(user_types)
+        counts = np.pad(counts, (0, size - len(counts)))
+        counts += np.bincount(cell, minlength=size)
+
+    counts = counts.reshape(len(user_types), n_bins)
+    histograms = {'all': counts.sum(axis=0)}
+    for code, user_type in enumerate(user_types):
+        histograms[user_type] = counts[code]
+    return edges, histograms
+
+
+# day segments of the weekday against weekend analysis of Question 6
+WEEKEND_SEGMENTS = {'weekend': WEEKEND_DAYS,
+                    'weekday': ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')}
+
+
+def is_condensed(filename):
+    """
+    Returns True if filename holds condensed trips (a trip store, a Summary
+    csv file or a partitioned dataset) rather than a raw city file.
+    """
+    if is_trip_store(filename) or is_partitioned(filename):
+        return True
+    with open_input(filename) as f_in:
+        return next(csv.reader(f_in), None) == out_colnames
+
+
+@cached
+def segment_durations(filename, segments=None, holidays=(), holiday_segment='holiday',
+                      chunk_rows=CHUNK_ROWS):
+    """
+    This function splits the trips of a condensed file (trip store or
+    Summary csv) into day segments and reports, for every segment and user
+    type, the number of trips, their total duration and the average
+    duration, keyed by (segment, user_type).
+
+    segments maps each segment name to the day names it covers (the
+    weekend and weekday split of Question 6 by default); a day missing
+    from every segment is left out. Trips started on one of the holidays,
+    given as (month, day) pairs or datetime.date values, form the segment
+    holiday_segment whatever their day of the week. Holidays need the day
+    of the month, which only trip stores of version 2 have.
+    """
+    return _segment_durations(filename, segments, holidays, holiday_segment, chunk_rows)
+
+
+def _segment_durations(filename, segments, holidays, holiday_segment, chunk_rows):
+    import numpy as np
+    from bikeshare.query import iter_column_chunks
+
+    segments = WEEKEND_SEGMENTS if segments is None else segments
+    names = list(segments)
+    # segment code of each weekday, len(names) for days in no segment
+    weekday_segment = np.full(len(DAY_NAMES), len(names), dtype=np.intp)
+    for code, name in enumerate(names):
+        for day_name in segments[name]:
+            weekday_segment[DAY_NAMES.index(day_name)] = code
+
+    holiday_table = None
+    if holidays:
+        names.append(holiday_segment)
+        holiday_table = np.zeros((13, 32), dtype=bool)
+        for holiday in holidays:
+            month, day = (holiday.month, holiday.day) if hasattr(holiday, 'month') else holiday
+            holiday_table[month, day] = True
+
+    n_segments = len(names) + 1
+    counts = np.zeros(0, dtype=np.int64)
+    totals = np.zeros(0)
+    user_types = []
+    for chunk, user_types in iter_column_chunks(filename, chunk_rows):
+        segment = weekday_segment[chunk['day_of_week']]
+        if holiday_table is not None:
+            if 'day' not in chunk:
+                raise ValueError('{} has no day column, holidays need a trip store'.format(
+                    filename))
+            segment = np.where(holiday_table[chunk['month'], chunk['day']],
+                               names.index(holiday_segment), segment)
+        cell = chunk['user_type'].astype(np.intp) * n_segments + segment
+        size = n_segments * len(user_types)
+        counts = np.pad(counts, (0, size - len(counts)))
+        totals = np.pad(totals, (0, size - len(totals)))
+        counts += np.bincount(cell, minlength=size)
+        totals += np.bincount(cell, weights=chunk['duration'], minlength=size)
+
+    result = {}
+    for code, user_type in enumerate(user_types):
+        for segment, name in enumerate(names):
+            count = int(counts[code * n_segments + segment])
+            if count:
+                total = float(totals[code * n_segments + segment])
+                result[(name, user_type)] = {'count': count, 'total': total,
+                                             'mean': total/count}
+    return result
+
+
+@cached
+def weekend_durations(filename, chunk_rows=CHUNK_ROWS):
+    """
+    This function reports the average trip duration of customers and
+    subscribers on weekends and on weekdays from a condensed file (trip
+    store or Summary csv), in the order rider_ship returns them: (weekend
+    customer, weekend subscriber, weekday customer, weekday subscriber).
+    Any user type other than Subscriber is counted as a customer, as
+    rider_ship does.
+    """
+    return _weekend_durations(filename, chunk_rows)
+
+
+def _weekend_durations(filename, chunk_rows):
+    split = WeekendSplit()
+    cells = _segment_durations(filename, WEEKEND_SEGMENTS, (), None, chunk_rows)
+    for (name, user_type), cell in cells.items():
+        split.add(name == 'weekend', user_type, cell['total'], cell['count'])
+    return split.result()
+
+
+@cached
+def rider_ship(filename, city):
+    """
+    This function reads in a trip file of the given city and reports the
+    average trip duration of customers and subscribers on weekends and on
+    weekdays: (weekend customer, weekend subscriber, weekday customer,
+    weekday subscriber).
+
+    Condensed files (Summary csv or trip store) are answered by
+    weekend_durations without parsing any timestamp; a raw city file is
+    condensed row by row into the rider_ship aggregate. A combination
+    without any trip averages to NaN.
+    """
+    if is_condensed(filename):
+        return _weekend_durations(filename, CHUNK_ROWS)
+
+    split = WeekendSplit()
+    update = split.update
+    with open_input(filename) as f_in:
+        tripreader = csv.reader(f_in)
+        transform = compile_transformer(city, next(tripreader))
+        for row in tripreader:
+            update(*transform(row))
+    return split.result()
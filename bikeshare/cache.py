@@ -0,0 +1,241 @@
+"""
+Persistent cache of analysis results.
+
+The analysis functions decorated with cached store their results on disk,
+keyed by the function, its parameters and a fingerprint of every input
+file (size, modification time and a hash of the contents). Calling them
+again on unchanged files returns the stored result without reading the
+data. The content hash is only computed the first time a file is seen
+with a given size and modification time, so in effect a change to a file
+is noticed through its size and modification time: a rewrite that keeps
+both (to the nanosecond) still gets the old results. Entries that have
+not been used for the longest time are evicted once the cache grows past
+its size cap.
+
+The cache is off until it is enabled, either with
+
+    enable_cache('~/.cache/bikeshare', max_bytes=64 << 20)
+
+or by setting the BIKESHARE_CACHE_DIR environment variable (and
+optionally BIKESHARE_CACHE_MAX_BYTES).
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+
+
+# size cap used when none is given
+DEFAULT_MAX_BYTES = 256 << 20
+
+# names of the parameters that hold input files
+FILE_PARAMETERS = ('filename', 'in_file')
+
+HASH_BLOCK_BYTES = 1 << 20
+
+# the active cache; None until enable_cache is called or the environment
+# variable is read on first use
+_cache = None
+_checked_environment = False
+
+# marks a cache miss, since None is a valid result
+_missing = object()
+
+
+def content_hash(filename):
+    """
+    SHA-1 of the contents of a file.
+    """
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f_in:
+        for block in iter(lambda: f_in.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _digest(key):
+    return hashlib.sha256(pickle.dumps(key, protocol=4)).hexdigest()
+
+
+class ResultCache(object):
+    """
+    A directory of pickled results, one file per entry. The modification
+    time of an entry is refreshed on every hit, so the least recently used
+    entries are the oldest files.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest + '.pickle')
+
+    def get(self, key, default=None):
+        path = self._path(_digest(key))
+        try:
+            with open(path, 'rb') as f_in:
+                stored_key, value = pickle.load(f_in)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # a truncated entry, or one pickled by code that has changed
+            # since, is recomputed and replaced
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return default
+        if stored_key != key:
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        # written under a temporary name first so readers never see a
+        # partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f_out:
+                pickle.dump((key, value), f_out, protocol=4)
+            os.replace(temp_path, self._path(_digest(key)))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """
+        (last used, size, path) of every entry, least recently used first.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in
+        max_bytes.
+        """
+        entries = self.entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+    def fingerprint(self, filename):
+        """
+        (size, mtime, content hash) of an input file. The content hash of
+        a file whose path, size and modification time have been seen before
+        is itself read from the cache rather than recomputed, so the
+        fingerprint only changes when the size or modification time does.
+        A partitioned dataset directory is fingerprinted by its manifest,
+        which is rewritten whenever the dataset is.
+        """
+        if os.path.isdir(filename):
+            from bikeshare.partition import manifest_path
+            filename = manifest_path(filename)
+        stat = os.stat(filename)
+        path = os.path.abspath(filename)
+        hash_key = ('content_hash', path, stat.st_size, stat.st_mtime_ns)
+        digest = self.get(hash_key)
+        if digest is None:
+            digest = content_hash(filename)
+            self.put(hash_key, digest)
+        return (stat.st_size, stat.st_mtime_ns, digest)
+
+
+def enable_cache(directory, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Turns on the result cache, stored in directory. Returns the cache.
+    """
+    global _cache
+    _cache = ResultCache(directory, max_bytes)
+    return _cache
+
+
+def disable_cache():
+    global _cache, _checked_environment
+    _cache = None
+    _checked_environment = True
+
+
+def active_cache():
+    """
+    The cache in use, or None. The first call without an explicitly enabled
+    cache reads the BIKESHARE_CACHE_DIR environment variable.
+    """
+    global _checked_environment
+    if _cache is None and not _checked_environment:
+        _checked_environment = True
+        directory = os.environ.get('BIKESHARE_CACHE_DIR')
+        if directory:
+            max_bytes = int(os.environ.get('BIKESHARE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+            enable_cache(directory, max_bytes)
+    return _cache
+
+
+def _parameter(value):
+    # NumPy arrays (histogram bin edges) are keyed by their values
+    if hasattr(value, 'tolist'):
+        return ('array', value.tolist())
+    return value
+
+
+def cached(function):
+    """
+    Decorator that looks the result of function up in the active cache
+    before computing it. Arguments named filename or in_file are taken as
+    input files and keyed by their fingerprint; all other arguments are
+    keyed by value. Without an active cache the function is called
+    directly.
+    """
+    signature = inspect.signature(function)
+    name = '{}.{}'.format(function.__module__, function.__qualname__)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        cache = active_cache()
+        if cache is None:
+            return function(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        key = [name]
+        for parameter, value in arguments.arguments.items():
+            if parameter in FILE_PARAMETERS:
+                value = cache.fingerprint(value)
+            key.append((parameter, _parameter(value)))
+        key = tuple(key)
+
+        result = cache.get(key, _missing)
+        if result is _missing:
+            result = function(*args, **kwargs)
+            cache.put(key, result)
+        return result
+    return wrapper
@@ -0,0 +1,206 @@
+"""
+Command line interface, for running the analyses without the notebook:
+
+    python -m bikeshare condense ./data/NYC-CitiBike-2016.csv ./data/NYC-2016-Summary.csv --city NYC
+    python -m bikeshare stats ./data/NYC-2016-Summary.csv
+    python -m bikeshare hist ./data/NYC-2016-Summary.csv --user-type Subscriber --out nyc.png
+    python -m bikeshare ridership ./data/Chicago-2016-Summary.csv
+    python -m bikeshare report --out ./report
+
+Importing this module only imports the standard library. Each subcommand
+imports what it needs when it runs, so a trip count over a Summary file
+never loads pandas, NumPy or matplotlib.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+
+CONDENSE_MODES = ('rows', 'vectorized', 'parallel', 'incremental', 'pipeline', 'sample')
+OUT_FORMATS = ('csv', 'store', 'partitioned')
+
+# labels of the tuples returned by the analysis functions
+STATS_LABELS = {
+    'number_of_trips': ('Subscribers', 'Customers', 'Total trips',
+                        'Subscriber proportion (%)', 'Customer proportion (%)'),
+    'len_of_trip': ('Trips', 'Trips longer than 30 minutes', 'Average trip length',
+                    'Proportion longer than 30 minutes (%)', 'Total duration'),
+    'Duration_RiderShip': ('Subscriber trips', 'Customer trips',
+                           'Average subscriber duration', 'Average customer duration'),
+}
+RIDERSHIP_LABELS = ('Average Customer Weekend duration', 'Average Subscriber Weekend duration',
+                    'Average Customer Weekday duration', 'Average Subscriber Weekday duration')
+
+
+def _print_json(value):
+    json.dump(value, sys.stdout, indent=2, default=float)
+    sys.stdout.write('\n')
+
+
+def _print_labelled(labels, values):
+    width = max(len(label) for label in labels)
+    for label, value in zip(labels, values):
+        print('  {:<{}}  {}'.format(label, width, value))
+
+
+def _condensed_rows(out_file, out_format):
+    """
+    Number of trips in a condensed output, read from its header or
+    manifest, or by counting the lines of a Summary csv file.
+    """
+    if out_format == 'store':
+        from bikeshare.store import read_store_meta
+        return read_store_meta(out_file)['rows']
+    if out_format == 'partitioned':
+        from bikeshare.partition import load_manifest
+        return load_manifest(out_file)['rows']
+    with open(out_file, 'rb') as f_in:
+        return sum(block.count(b'\n') for block in iter(lambda: f_in.read(1 << 20), b'')) - 1
+
+
+def run_condense(args):
+    from bikeshare.wrangling import condense_data
+
+    start = time.perf_counter()
+    result = condense_data(args.in_file, args.out_file, args.city, mode=args.mode,
+                           out_format=args.format, stations_file=args.stations)
+    if args.json:
+        # the modes return different things (None for rows), so every mode
+        # reports the same summary, with any report of its own under details
+        summary = {'city': args.city,
+                   'mode': args.mode,
+                   'format': args.format,
+                   'in_file': args.in_file,
+                   'out_file': args.out_file,
+                   'rows': _condensed_rows(args.out_file, args.format),
+                   'seconds': time.perf_counter() - start}
+        if args.stations:
+            summary['stations_file'] = args.stations
+        if isinstance(result, dict):
+            summary['details'] = result
+        _print_json(summary)
+
+
+def run_stats(args):
+    from bikeshare.aggregate import summarize
+
+    summaries = summarize(args.files, list(STATS_LABELS))
+    if args.json:
+        _print_json({filename: {name: list(values) for name, values in results.items()}
+                     for filename, results in summaries.items()})
+        return
+    for filename, results in summaries.items():
+        print(filename + ':')
+        for name, labels in STATS_LABELS.items():
+            _print_labelled(labels, results[name])
+
+
+def run_hist(args):
+    from bikeshare.analysis import duration_histograms
+
+    edges, histograms = duration_histograms(args.file, args.bin_width, args.cutoff)
+    group = args.user_type or 'all'
+    counts = histograms.get(group)
+    if counts is None:
+        raise SystemExit('no trips of user type {!r} in {}'.format(group, args.file))
+
+    if args.out:
+        from matplotlib.figure import Figure
+
+        from bikeshare.plots import plot_histogram
+
+        figure = Figure(figsize=(6, 4))
+        title = 'Trip Durations' + ('' if group == 'all' else ' for {}s'.format(group))
+        plot_histogram(edges, counts, title, ax=figure.subplots())
+        figure.savefig(args.out, bbox_inches='tight')
+    elif args.json:
+        _print_json({'edges': [float(edge) for edge in edges],
+                     'counts': [int(count) for count in counts]})
+    else:
+        for low, high, count in zip(edges[:-1], edges[1:], counts):
+            print('{:6g} - {:<6g} {:>10}'.format(low, high, count))
+
+
+def run_ridership(args):
+    from bikeshare.aggregate import run_aggregates
+    from bikeshare.analysis import is_condensed, rider_ship
+    from bikeshare.partition import is_partitioned
+    from bikeshare.store import is_trip_store
+
+    if is_trip_store(args.file) or is_partitioned(args.file):
+        averages = rider_ship(args.file, args.city)
+    elif is_condensed(args.file):
+        # a Summary file is read in pure Python, without NumPy or pandas
+        averages = run_aggregates(args.file, ['rider_ship'])['rider_ship']
+    elif args.city is None:
+        raise SystemExit('--city is needed for a raw city file')
+    else:
+        averages = rider_ship(args.file, args.city)
+    if args.json:
+        _print_json(dict(zip(RIDERSHIP_LABELS, averages)))
+    else:
+        _print_labelled(RIDERSHIP_LABELS, averages)
+
+
+def run_report(args):
+    from bikeshare import report
+
+    report.run(args, args.parser)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m bikeshare',
+                                     description='US bike share trip data analysis')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='keep analysis results in a persistent cache in DIR')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    condense = subparsers.add_parser('condense', help='condense a raw city file')
+    condense.add_argument('in_file')
+    condense.add_argument('out_file')
+    condense.add_argument('--city', required=True)
+    condense.add_argument('--mode', choices=CONDENSE_MODES, default='rows')
+    condense.add_argument('--format', choices=OUT_FORMATS, default='csv')
+    condense.add_argument('--stations', metavar='FILE',
+                          help='also write the station and route index to FILE')
+    condense.add_argument('--json', action='store_true',
+                          help='print a summary (rows written, output file) as JSON')
+    condense.set_defaults(run=run_condense)
+
+    stats = subparsers.add_parser('stats', help='trip counts and durations')
+    stats.add_argument('files', nargs='+', metavar='file')
+    stats.add_argument('--json', action='store_true')
+    stats.set_defaults(run=run_stats)
+
+    hist = subparsers.add_parser('hist', help='histogram of trip durations')
+    hist.add_argument('file')
+    hist.add_argument('--user-type')
+    hist.add_argument('--bin-width', type=float, default=5)
+    hist.add_argument('--cutoff', type=float, default=75)
+    hist.add_argument('--out', metavar='PNG', help='draw the histogram into this file')
+    hist.add_argument('--json', action='store_true')
+    hist.set_defaults(run=run_hist)
+
+    ridership = subparsers.add_parser('ridership', help='weekday and weekend durations')
+    ridership.add_argument('file')
+    ridership.add_argument('--city', help='city of a raw file')
+    ridership.add_argument('--json', action='store_true')
+    ridership.set_defaults(run=run_ridership)
+
+    report = subparsers.add_parser('report', help='HTML and JSON report of every city')
+    # bikeshare.report itself only imports the standard library
+    from bikeshare.report import add_arguments
+    add_arguments(report)
+    report.set_defaults(run=run_report, parser=report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.cache:
+        from bikeshare.cache import enable_cache
+        enable_cache(args.cache)
+    args.run(args)
@@ -0,0 +1,201 @@
+"""
+Vectorized condense path. The raw city file is read in chunks of rows,
+only the columns that are needed are loaded, and duration, month, hour,
+day_of_week and user_type are computed with NumPy operations on whole
+columns instead of one helper call per trip.
+
+Start times in the layouts of the three cities are taken apart as a
+matrix of bytes: the separators split every row into its fields, whose
+digits are summed up column by column; the rare value that does not fit
+that mould is left to strptime. The weekday is looked up once per
+distinct date. Start times in any other layout are parsed with strptime,
+once per distinct value.
+"""
+
+import csv
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from bikeshare.adapters import get_adapter
+from bikeshare.inputs import open_input, skip_first_trip
+from bikeshare.timeparse import DAY_NAMES, FAST_TIME_FORMATS, start_time_parser
+from bikeshare.wrangling import out_colnames
+
+
+# separators between the fields of each fast layout, and the fewest and
+# most digits strptime takes for each field
+START_LAYOUTS = {
+    '%m/%d/%Y %H:%M': (b'// :', ((1, 2), (1, 2), (4, 4), (1, 2), (1, 2))),
+    '%m/%d/%Y %H:%M:%S': (b'// ::', ((1, 2), (1, 2), (4, 4), (1, 2), (1, 2), (1, 2))),
+}
+assert set(START_LAYOUTS) == set(FAST_TIME_FORMATS)
+
+# upper bound of month, day, year, hour, minute and second; strptime
+# matches seconds up to 61, but datetime rejects them, so they are left
+# to strptime to raise
+FIELD_LIMITS = (12, 31, 9999, 23, 59, 59)
+
+DAY_NAME_ARRAY = np.array(DAY_NAMES, dtype=object)
+
+# durations are formatted per distinct value when each repeats this often
+DISTINCT_FORMAT_RATIO = 4
+
+
+def _distinct(column, function):
+    """
+    Applies function once to each distinct value of a pandas Series and
+    returns the results for every row, as a list.
+    """
+    codes, values = pd.factorize(column)
+    results = np.array([function(value) for value in values.tolist()], dtype=object)
+    return results[codes].tolist()
+
+
+def start_fields(values, time_format):
+    """
+    Splits an array of start times in one of the FAST_TIME_FORMATS layouts
+    into an (n, fields) integer array of month, day, year, hour, minute and,
+    if the layout has them, seconds. The few values the byte matrix does
+    not take apart cleanly are parsed with strptime, so a value strptime
+    rejects raises ValueError.
+    """
+    separators, digit_counts = START_LAYOUTS[time_format]
+    n_fields = len(separators) + 1
+    values = np.asarray(values, dtype=object)
+    fields = np.zeros((len(values), n_fields), dtype=np.int64)
+    try:
+        chars = values.astype(np.bytes_)
+    except UnicodeEncodeError:
+        chars = None
+    if chars is None or not len(chars):
+        odd = np.ones(len(values), dtype=bool)
+    else:
+        odd = _odd_start_times(chars, separators, digit_counts, fields)
+
+    for row in np.flatnonzero(odd):
+        t = datetime.strptime(values[row], time_format)
+        fields[row] = (t.month, t.day, t.year, t.hour, t.minute, t.second)[:n_fields]
+    return fields
+
+
+def _odd_start_times(chars, separators, digit_counts, fields):
+    """
+    Fills fields from the rows of chars that have exactly the separators
+    and digits of the layout, and returns the mask of the other rows.
+    """
+    n_fields = len(separators) + 1
+    matrix = chars.view(np.uint8).reshape(len(chars), chars.itemsize)
+    is_separator = np.zeros(matrix.shape, dtype=bool)
+    for separator in set(separators):
+        is_separator |= matrix == separator
+    is_digit = (matrix >= ord('0')) & (matrix <= ord('9'))
+    # bytes of 0 are the padding of the shorter values
+    odd = ((is_separator.sum(axis=1) != len(separators))
+           | (~(is_separator | is_digit) & (matrix != 0)).any(axis=1))
+    rows = np.flatnonzero(~odd)
+    matrix = matrix[rows]
+
+    # every remaining row has the same number of separators, so their
+    # positions come out of nonzero row by row
+    positions = np.nonzero(is_separator[rows])[1].reshape(len(rows), len(separators))
+    ends = np.hstack([positions, (matrix != 0).sum(axis=1)[:, None]])
+    counts = ends - np.hstack([np.zeros((len(rows), 1), dtype=np.intp), positions + 1])
+    low, high = np.array(digit_counts).T
+
+    # the fields are summed up from their last digit backwards; only the
+    # year has more than two
+    values = np.take_along_axis(matrix, np.maximum(ends - 1, 0), axis=1).astype(np.int64)
+    values -= ord('0')
+    tens = np.take_along_axis(matrix, np.maximum(ends - 2, 0), axis=1).astype(np.int64)
+    values += np.where(counts > 1, (tens - ord('0')) * 10, 0)
+    year_end = ends[:, 2]
+    for place in range(2, high.max()):
+        digit = matrix[np.arange(len(rows)), np.maximum(year_end - 1 - place, 0)]
+        values[:, 2] += (digit.astype(np.int64) - ord('0')) * 10 ** place
+
+    bad = ((np.take_along_axis(matrix, positions, axis=1) !=
+            np.frombuffer(separators, dtype=np.uint8)).any(axis=1)
+           | ((counts < low) | (counts > high)).any(axis=1)
+           | (values > np.array(FIELD_LIMITS[:n_fields])).any(axis=1))
+    fields[rows] = values
+    odd[rows[bad]] = True
+    return odd
+
+
+def weekdays(month, day, year):
+    """
+    Weekday number (Monday = 0) of every date, computed once per distinct
+    date. An impossible date raises ValueError.
+    """
+    codes, dates = pd.factorize(year * 10000 + month * 100 + day)
+    days = np.array([date(value // 10000, value // 100 % 100, value % 100).weekday()
+                     for value in dates.tolist()], dtype=np.intp)
+    return days[codes]
+
+
+def condense_chunk(chunk, city):
+    """
+    Takes a DataFrame of raw trips from the given city (durations read as
+    integers, the other columns as strings) and returns the condensed columns in the order of
+    out_colnames, as lists of the values condense_data writes.
+    """
+    adapter = get_adapter(city)
+
+    # same operation order as duration_in_mins so the floats match
+    codes, durations = pd.factorize(chunk[adapter.duration_column].to_numpy())
+    durations = durations.astype(np.float64)
+    if adapter.duration_unit != 1:
+        durations = durations / adapter.duration_unit
+    durations = durations / 60
+    if len(durations) * DISTINCT_FORMAT_RATIO <= len(codes):
+        # whole seconds repeat a lot: each distinct duration is formatted
+        # once, as the csv writer would, instead of once per trip
+        duration = np.array(list(map(repr, durations.tolist())), dtype=object)[codes].tolist()
+    else:
+        duration = durations[codes].tolist()
+
+    start = chunk[adapter.start_column]
+    if adapter.time_format in START_LAYOUTS:
+        fields = start_fields(start.to_numpy(), adapter.time_format)
+        month = fields[:, 0]
+        hour = fields[:, 3].tolist()
+        day_of_week = DAY_NAME_ARRAY[weekdays(month, fields[:, 1], fields[:, 2])].tolist()
+        month = month.tolist()
+    else:
+        parsed = _distinct(start, start_time_parser(adapter.time_format))
+        month, hour, day_of_week = zip(*parsed) if parsed else ((), (), ())
+
+    user_type = chunk[adapter.user_type_column]
+    if adapter.user_types is None:
+        user_type = user_type.tolist()
+    else:
+        lookup = adapter.user_types.get
+        default_user_type = adapter.default_user_type
+        user_type = _distinct(user_type, lambda value: lookup(value, default_user_type))
+
+    return duration, month, hour, day_of_week, user_type
+
+
+def condense_data_vectorized(in_file, out_file, city, chunksize=500000):
+    """
+    Writes the condensed data for in_file to out_file, processing chunksize
+    rows at a time. The output is byte for byte the same as the one written
+    by condense_data in 'rows' mode.
+    """
+    adapter = get_adapter(city)
+
+    with open(out_file, 'w') as f_out, open_input(in_file) as f_in:
+        trip_writer = csv.writer(f_out)
+        trip_writer.writerow(out_colnames)
+
+        header = next(csv.reader([f_in.readline()]))
+        skip_first_trip(f_in)
+        chunks = pd.read_csv(f_in, header=None, names=header, usecols=adapter.columns(),
+                             dtype={adapter.duration_column: np.int64,
+                                    adapter.start_column: str,
+                                    adapter.user_type_column: str},
+                             keep_default_na=False, chunksize=chunksize)
+        for chunk in chunks:
+            trip_writer.writerows(zip(*condense_chunk(chunk, city)))
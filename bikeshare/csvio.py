@@ -0,0 +1,67 @@
+"""
+Tuple based csv reading and writing for the hot loops.
+
+csv.DictReader builds a dictionary for every row and csv.DictWriter takes
+one apart again. Here the header is looked up once, rows stay the lists
+produced by csv.reader and only the wanted columns are picked out with an
+itemgetter, and rows are written with writerows so the loop over them runs
+inside the csv module.
+"""
+
+import csv
+from operator import itemgetter
+
+from bikeshare.inputs import open_input
+
+
+def column_getter(header, columns):
+    """
+    Returns a function that picks columns (a list of names) out of a row
+    laid out as header, as a tuple.
+    """
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise KeyError('columns {} not found in header {}'.format(missing, header))
+    positions = [header.index(column) for column in columns]
+    if len(positions) == 1:
+        # itemgetter returns a bare value for a single index
+        position = positions[0]
+        return lambda row: (row[position],)
+    return itemgetter(*positions)
+
+
+def iter_columns(filename, columns):
+    """
+    Yields a tuple of the requested columns for every row of a csv file
+    with a header row.
+    """
+    with open_input(filename) as f_in:
+        reader = csv.reader(f_in)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from map(column_getter(header, columns), reader)
+
+
+def first_row(filename):
+    """
+    Returns the first data row of a csv file as a dictionary keyed by the
+    header, or None if the file has no data rows.
+    """
+    with open_input(filename) as f_in:
+        reader = csv.reader(f_in)
+        header = next(reader, None)
+        row = next(reader, None)
+    if header is None or row is None:
+        return None
+    return dict(zip(header, row))
+
+
+def write_transformed(f_out, rows, transform):
+    """
+    Writes transform(row) for every row to the open file f_out with a
+    single writerows call. Returns the csv writer.
+    """
+    trip_writer = csv.writer(f_out)
+    trip_writer.writerows(map(transform, rows))
+    return trip_writer
@@ -0,0 +1,232 @@
+"""
+Precomputed rollup cube over the condensed trips.
+
+Every question in the notebook is a reduction over the same five condensed
+columns, so the trips of a city are rolled up once into a dense cube with
+one cell per user type x month x hour x day of week. Each cell holds the
+trip count, the sum and sum of squares of the durations and the number of
+trips longer than 30 minutes. Questions are then answered by summing cells
+instead of rescanning the trips; a cube is a few hundred kilobytes.
+"""
+
+import numpy as np
+
+from bikeshare.aggregate import WEEKEND_DAYS, Aggregate, WeekendSplit, register_aggregate
+from bikeshare.store import TripStore, USER_TYPES, is_trip_store
+from bikeshare.timeparse import DAY_NAMES
+
+
+# statistics kept per cell
+STATS = ('count', 'total', 'sum_squares', 'over')
+COUNT, TOTAL, SUM_SQUARES, OVER = range(len(STATS))
+
+# cells per user type: month x hour x day of week
+CELL_SHAPE = (12, 24, 7)
+
+
+class RollupCube(object):
+    """
+    Dense rollup of the trips of one city. data has the shape
+    (user types, 12 months, 24 hours, 7 days, 4 statistics), with days
+    numbered from Monday = 0 and the statistics ordered as in STATS.
+    """
+    def __init__(self, user_types, data, threshold=30, city=None):
+        self.user_types = list(user_types)
+        self.data = data
+        self.threshold = threshold
+        self.city = city
+
+    @classmethod
+    def empty(cls, user_types=USER_TYPES, threshold=30, city=None):
+        data = np.zeros((len(user_types),) + CELL_SHAPE + (len(STATS),))
+        return cls(user_types, data, threshold, city)
+
+    def save(self, filename):
+        """
+        Saves the cube to a .npz file.
+        """
+        np.savez(filename, data=self.data, user_types=np.array(self.user_types),
+                 threshold=self.threshold, city=np.array(self.city or ''))
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as saved:
+            return cls(saved['user_types'].tolist(), saved['data'],
+                       float(saved['threshold']), str(saved['city']) or None)
+
+    @staticmethod
+    def _select(values, offset=0):
+        if values is None:
+            return None
+        if isinstance(values, (int, np.integer)):
+            values = [values]
+        return [value - offset for value in values]
+
+    def cells(self, month=None, hour=None, day_of_week=None, user_type=None):
+        """
+        Returns the statistics of the cells matching the filters, summed
+        into one array ordered as STATS. Each filter is a single value or a
+        list of values: months 1-12, hours 0-23, days as names or numbers
+        (Monday = 0), user types as names. None means no filter.
+        """
+        if isinstance(day_of_week, str):
+            day_of_week = [day_of_week]
+        if day_of_week is not None:
+            day_of_week = [DAY_NAMES.index(day) if isinstance(day, str) else day
+                           for day in day_of_week]
+        if isinstance(user_type, str):
+            user_type = [user_type]
+        if user_type is not None:
+            user_type = [self.user_types.index(user) for user in user_type
+                         if user in self.user_types]
+
+        data = self.data
+        # index one dimension at a time so lists in several dimensions
+        # select their cross product
+        for axis, selection in enumerate([user_type,
+                                          self._select(month, offset=1),
+                                          self._select(hour),
+                                          day_of_week]):
+            if selection is None:
+                continue
+            data = np.take(data, selection, axis=axis)
+        return data.reshape(-1, len(STATS)).sum(axis=0)
+
+    def query(self, **filters):
+        """
+        Answers a question from the cube. Takes the same filters as cells
+        and returns a dictionary with the number of trips, the total, mean
+        and standard deviation of their duration, and the number and share
+        (in percent) of trips longer than the threshold.
+        """
+        count, total, sum_squares, over = self.cells(**filters)
+        result = {'count': int(count), 'total': float(total), 'over': int(over),
+                  'mean': float('nan'), 'std': float('nan'), 'over_share': float('nan')}
+        if count:
+            mean = float(total / count)
+            result['mean'] = mean
+            result['std'] = max(float(sum_squares / count) - mean * mean, 0) ** 0.5
+            result['over_share'] = float(over / count * 100)
+        return result
+
+    def number_of_trips(self):
+        """
+        Same result as analysis.number_of_trips.
+        """
+        n_total = int(self.cells()[COUNT])
+        n_subscribers = int(self.cells(user_type='Subscriber')[COUNT])
+        n_customers = n_total - n_subscribers
+        return (n_subscribers, n_customers, n_total,
+                n_subscribers / n_total * 100, n_customers / n_total * 100)
+
+    def len_of_trip(self):
+        """
+        Same result as analysis.len_of_trip.
+        """
+        result = self.query()
+        return (result['count'], result['over'], result['mean'],
+                result['over_share'], result['total'])
+
+    def Duration_RiderShip(self):
+        """
+        Same result as analysis.Duration_RiderShip.
+        """
+        sub = self.query(user_type='Subscriber')
+        cus = self.query(user_type='Customer')
+        return (sub['count'], cus['count'], sub['mean'], cus['mean'])
+
+    def rider_ship(self):
+        """
+        Same result as rider_ship: average durations of (weekend customer,
+        weekend subscriber, weekday customer, weekday subscriber), counting
+        every user type other than Subscriber as a customer.
+        """
+        split = WeekendSplit()
+        weekdays = [day for day in DAY_NAMES if day not in WEEKEND_DAYS]
+        for weekend, days in ((True, list(WEEKEND_DAYS)), (False, weekdays)):
+            for user_type in self.user_types:
+                cell = self.query(day_of_week=days, user_type=user_type)
+                split.add(weekend, user_type, cell['total'], cell['count'])
+        return split.result()
+
+
+@register_aggregate('rollup_cube')
+class CubeAggregate(Aggregate):
+    """
+    Builds a RollupCube during a run_aggregates pass.
+    """
+    default = False
+
+    def __init__(self, threshold=30):
+        self.threshold = threshold
+        self.weekdays = {day: code for code, day in enumerate(DAY_NAMES)}
+        self.user_types = list(USER_TYPES)
+        self.user_codes = {user: code for code, user in enumerate(self.user_types)}
+        # flat python lists are cheaper to update per trip than numpy arrays
+        self.cell_count = 12 * 24 * 7
+        self.stats = [[0.0] * (self.cell_count * len(self.user_types)) for _ in STATS]
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        code = self.user_codes.get(user_type)
+        if code is None:
+            code = self.user_codes[user_type] = len(self.user_types)
+            self.user_types.append(user_type)
+            for values in self.stats:
+                values.extend([0.0] * self.cell_count)
+        cell = ((code * 12 + month - 1) * 24 + hour) * 7 + self.weekdays[day_of_week]
+        stats = self.stats
+        stats[COUNT][cell] += 1
+        stats[TOTAL][cell] += duration
+        stats[SUM_SQUARES][cell] += duration * duration
+        if duration > self.threshold:
+            stats[OVER][cell] += 1
+
+    def result(self):
+        data = np.stack([np.array(values) for values in self.stats], axis=-1)
+        data = data.reshape((len(self.user_types),) + CELL_SHAPE + (len(STATS),))
+        return RollupCube(self.user_types, data, self.threshold)
+
+
+def build_cube_from_store(filename, threshold=30, chunk_rows=1 << 20):
+    """
+    Builds the cube of a trip store with vectorized bincounts over chunks of
+    the memory mapped columns.
+    """
+    with TripStore(filename) as store:
+        user_types = store.meta['user_types']
+        cube = RollupCube.empty(user_types, threshold, store.meta['city'])
+        n_cells = cube.data.shape[0] * 12 * 24 * 7
+        flat = cube.data.reshape(n_cells, len(STATS))
+        for chunk in store.iter_chunks(chunk_rows):
+            cell = (((chunk['user_type'].astype(np.intp) * 12 + chunk['month'] - 1) * 24
+                     + chunk['hour']) * 7 + chunk['day_of_week'])
+            duration = chunk['duration'].astype(np.float64)
+            flat[:, COUNT] += np.bincount(cell, minlength=n_cells)
+            flat[:, TOTAL] += np.bincount(cell, weights=duration, minlength=n_cells)
+            flat[:, SUM_SQUARES] += np.bincount(cell, weights=duration * duration,
+                                                minlength=n_cells)
+            flat[:, OVER] += np.bincount(cell[duration > threshold], minlength=n_cells)
+    return cube
+
+
+def build_cube(filename, city=None, threshold=30):
+    """
+    Builds the rollup cube of a condensed file, either a Summary csv file
+    (one streaming pass) or a trip store.
+    """
+    from bikeshare.aggregate import run_aggregates
+
+    if is_trip_store(filename):
+        cube = build_cube_from_store(filename, threshold)
+    else:
+        cube = run_aggregates(filename, [CubeAggregate(threshold)])['rollup_cube']
+    cube.city = city or cube.city
+    return cube
+
+
+def build_cubes(city_files, threshold=30):
+    """
+    Builds one cube per city from a {city: condensed file} dictionary.
+    """
+    return {city: build_cube(filename, city, threshold)
+            for city, filename in city_files.items()}
@@ -0,0 +1,162 @@
+"""
+Incremental condense for data that arrives in monthly or quarterly drops.
+
+A checkpoint file next to the Summary output records, for every raw input
+file, a fingerprint of the bytes already condensed, the byte offset that
+was reached and the number of rows written. On the next run only the rows
+added since then (a raw file that grew, or a new period file) are
+condensed and appended to the Summary file.
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+from bikeshare.adapters import compile_transformer
+from bikeshare.csvio import write_transformed
+from bikeshare.inputs import is_compressed, open_input, skip_first_trip
+from bikeshare.parallel import read_lines
+from bikeshare.wrangling import out_colnames
+
+
+# bytes hashed at the start of a file and just before the checkpoint offset
+FINGERPRINT_BYTES = 1 << 16
+
+
+def checkpoint_path(out_file):
+    """
+    Default location of the checkpoint for a Summary file.
+    """
+    return out_file + '.checkpoint.json'
+
+
+def fingerprint(in_file, offset):
+    """
+    Fingerprint of the first offset bytes of in_file: the hashes of the
+    head of the file and of the bytes just before offset. Appending rows to
+    the file leaves it unchanged, rewriting what was condensed does not.
+    """
+    with open(in_file, 'rb') as f_in:
+        head = f_in.read(min(offset, FINGERPRINT_BYTES))
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        f_in.seek(tail_start)
+        tail = f_in.read(offset - tail_start)
+    return {'head': hashlib.sha1(head).hexdigest(),
+            'tail': hashlib.sha1(tail).hexdigest()}
+
+
+def complete_lines_end(in_file):
+    """
+    Offset just after the last newline of in_file, so that a line that is
+    still being written is left for the next run.
+    """
+    size = os.path.getsize(in_file)
+    with open(in_file, 'rb') as f_in:
+        position = size
+        while position > 0:
+            start = max(0, position - 4096)
+            f_in.seek(start)
+            block = f_in.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f_in:
+        return json.load(f_in)
+
+
+def save_checkpoint(path, checkpoint):
+    # write to a temporary file first so a crash never leaves a partial
+    # checkpoint behind
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f_out:
+        json.dump(checkpoint, f_out, indent=2)
+    os.replace(temp_path, path)
+
+
+def condense_incremental(in_files, out_file, city, checkpoint_file=None):
+    """
+    Condenses the rows of in_files (one raw file or a list of period files,
+    in order) that have not been condensed into out_file yet, and appends
+    them. The first run writes out_file from scratch, exactly as
+    condense_data does for each file. Returns the number of rows appended.
+
+    A ValueError is raised if rows that were already condensed have
+    changed; remove the checkpoint to rebuild the Summary file.
+    """
+    if isinstance(in_files, str):
+        in_files = [in_files]
+    checkpoint_file = checkpoint_file or checkpoint_path(out_file)
+    checkpoint = load_checkpoint(checkpoint_file)
+
+    if checkpoint is None or not os.path.exists(out_file):
+        checkpoint = {'city': city, 'out_size': 0, 'files': {}}
+        with open(out_file, 'w') as f_out:
+            csv.writer(f_out).writerow(out_colnames)
+        checkpoint['out_size'] = os.path.getsize(out_file)
+    elif checkpoint['city'] != city:
+        raise ValueError('{} was condensed for {}, not {}'.format(
+            out_file, checkpoint['city'], city))
+    else:
+        # drop anything a previous run appended after its last checkpoint
+        with open(out_file, 'r+b') as f_out:
+            f_out.truncate(checkpoint['out_size'])
+
+    n_appended = 0
+    for in_file in in_files:
+        key = os.path.abspath(in_file)
+        entry = checkpoint['files'].get(key)
+        # a compressed file can only be condensed as a whole: its offsets
+        # are those of the compressed bytes, read_lines(None, None) streams
+        # the decompressed rows
+        compressed = is_compressed(in_file)
+        end = os.path.getsize(in_file) if compressed else complete_lines_end(in_file)
+
+        if entry is None:
+            with open_input(in_file, 'rb') as f_in:
+                header_line = f_in.readline()
+            header = next(csv.reader([header_line.decode('utf-8')]))
+            start = 0 if compressed else len(header_line)
+            entry = {'header': header, 'offset': start, 'rows': 0, 'skipped_first': False}
+        else:
+            if (end < entry['offset'] or
+                    fingerprint(in_file, entry['offset']) != entry['fingerprint'] or
+                    (compressed and end != entry['offset'])):
+                raise ValueError('{} changed before offset {}; remove {} to rebuild'.format(
+                    in_file, entry['offset'], checkpoint_file))
+            start = entry['offset']
+
+        if end > start:
+            if compressed:
+                lines = read_lines(in_file, None, None)
+            else:
+                lines = read_lines(in_file, start, end)
+            with open(out_file, 'a') as f_out:
+                trip_reader = csv.reader(lines)
+                transform = compile_transformer(city, entry['header'])
+                skipped = 0
+                if not entry['skipped_first']:
+                    skipped = skip_first_trip(trip_reader)
+                    entry['skipped_first'] = bool(skipped)
+                write_transformed(f_out, trip_reader, transform)
+                f_out.flush()
+                os.fsync(f_out.fileno())
+            # a trip is one line of the raw file
+            n_rows = trip_reader.line_num - skipped
+            entry['offset'] = end
+            entry['rows'] += n_rows
+            n_appended += n_rows
+
+        entry['fingerprint'] = fingerprint(in_file, entry['offset'])
+        checkpoint['files'][key] = entry
+        checkpoint['out_size'] = os.path.getsize(out_file)
+        save_checkpoint(checkpoint_file, checkpoint)
+
+    return n_appended
@@ -0,0 +1,180 @@
+"""
+Transparent reading of compressed trip files.
+
+The full-year feeds are archived as gzip, bzip2, xz, zip or zstd files.
+open_input recognises the format from the first bytes of the file and
+returns a text stream of the decompressed csv, so every reader in the
+package can take compressed files wherever it takes plain ones.
+
+Decompression runs in a background thread that keeps a few chunks ahead
+of the reader (zlib, bz2 and lzma release the GIL while inflating), so
+parsing and decompression overlap.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+import zipfile
+
+
+# leading bytes of each supported compression format
+MAGIC_BYTES = [(b'\x1f\x8b', 'gzip'),
+               (b'BZh', 'bz2'),
+               (b'\xfd7zXZ\x00', 'xz'),
+               (b'PK\x03\x04', 'zip'),
+               (b'\x28\xb5\x2f\xfd', 'zstd')]
+
+CHUNK_SIZE = 1 << 20
+
+
+def compression_of(filename):
+    """
+    Returns the compression format of filename ('gzip', 'bz2', 'xz', 'zip'
+    or 'zstd'), or None for an uncompressed file.
+    """
+    with open(filename, 'rb') as f_in:
+        head = f_in.read(8)
+    for magic, compression in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def is_compressed(filename):
+    return compression_of(filename) is not None
+
+
+def _open_zip_member(filename, member=None):
+    archive = zipfile.ZipFile(filename)
+    if member is None:
+        names = [info.filename for info in archive.infolist() if not info.is_dir()]
+        csv_names = [name for name in names if name.lower().endswith('.csv')]
+        if len(csv_names) == 1 or (not csv_names and len(names) == 1):
+            member = (csv_names or names)[0]
+        else:
+            archive.close()
+            raise ValueError('{} holds several files, give the member to read'.format(filename))
+    stream = archive.open(member)
+    # the member keeps the archive file open by itself
+    archive.close()
+    return stream
+
+
+def _open_binary(filename, compression, member=None):
+    if compression == 'gzip':
+        return gzip.open(filename, 'rb')
+    if compression == 'bz2':
+        return bz2.open(filename, 'rb')
+    if compression == 'xz':
+        return lzma.open(filename, 'rb')
+    if compression == 'zip':
+        return _open_zip_member(filename, member)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('reading {} needs the zstandard package'.format(filename))
+        return zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'),
+                                                          closefd=True)
+    raise ValueError('unknown compression {!r}'.format(compression))
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Raw binary stream that reads ahead from another stream in a background
+    thread. At most depth chunks of chunk_size bytes are buffered.
+    """
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, depth=4):
+        super().__init__()
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._chunk = b''
+        self._position = 0
+        self._finished = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fill(self):
+        try:
+            while True:
+                chunk = self._stream.read(self._chunk_size)
+                if not self._put(chunk) or not chunk:
+                    return
+        except Exception as exc:
+            # handed to the reading thread, which raises it
+            self._put(exc)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._position == len(self._chunk):
+            if self._finished:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._finished = True
+                raise item
+            if not item:
+                self._finished = True
+                return 0
+            self._chunk = item
+            self._position = 0
+        n = min(len(buffer), len(self._chunk) - self._position)
+        buffer[:n] = self._chunk[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+def open_input(filename, mode='r', member=None, threaded=True):
+    """
+    Opens a possibly compressed input file for reading. mode is 'r' for a
+    text stream (as open(filename, 'r') gives for a plain file) or 'rb'
+    for bytes. member selects the file to read from a zip archive that
+    holds more than one. With threaded=True decompression runs in a
+    background thread.
+    """
+    if mode not in ('r', 'rb'):
+        raise ValueError("open_input only reads, mode must be 'r' or 'rb'")
+    compression = compression_of(filename)
+    if compression is None:
+        return open(filename, mode)
+
+    stream = _open_binary(filename, compression, member)
+    if threaded:
+        stream = io.BufferedReader(ThreadedReader(stream), CHUNK_SIZE)
+    if mode == 'rb':
+        return stream
+    return io.TextIOWrapper(stream)
+
+
+def skip_first_trip(trips):
+    """
+    Drops the first trip from an iterator over the trips of a raw file
+    (csv rows or lines, after the header) and returns the number dropped,
+    1 or 0 for a file without trips. condense_data reads that trip ahead
+    and never writes it, so every condense path has to leave it out to
+    write the same rows.
+    """
+    return 0 if next(trips, None) is None else 1
@@ -0,0 +1,272 @@
+"""
+Opt-in instrumentation of the condense and analysis functions.
+
+Nothing is wrapped until instrumentation is enabled, so the functions cost
+exactly what they did before when it is off. enable() replaces the
+functions listed in TARGETS, wherever they have been imported (the
+package modules and the notebook script), with wrappers that count calls
+and time, and wraps the compiled row transformers to count the rows
+they take and return. disable() puts the originals back and returns the run
+report. Optionally a sampling profiler records which functions the
+process is executing every few milliseconds.
+
+    with instrumented('run-report.json'):
+        condense_data(in_file, out_file, city)
+
+The counters are kept per city; a function without a city argument is
+attributed to the city prefix of its file name ('./data/NYC-2016-...').
+Work done in the worker processes of the parallel and pipeline modes is
+not counted.
+"""
+
+import functools
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# (module, function) pairs wrapped while instrumentation is enabled
+TARGETS = [('bikeshare.wrangling', 'condense_data'),
+           ('bikeshare.wrangling', 'duration_in_mins'),
+           ('bikeshare.wrangling', 'time_of_trip'),
+           ('bikeshare.wrangling', 'type_of_user'),
+           ('bikeshare.aggregate', 'run_aggregates'),
+           ('bikeshare.analysis', 'number_of_trips'),
+           ('bikeshare.analysis', 'len_of_trip'),
+           ('bikeshare.analysis', 'Duration_RiderShip'),
+           ('bikeshare.analysis', 'rider_ship'),
+           ('bikeshare.analysis', 'duration_histograms'),
+           ('bikeshare.analysis', 'segment_durations'),
+           ('bikeshare.analysis', 'weekend_durations')]
+
+# the active run, None while instrumentation is disabled
+_active = None
+
+
+def city_of(filename):
+    """
+    City prefix of a data file name, as print_first_point derives it.
+    """
+    return os.path.basename(str(filename)).split('-')[0]
+
+
+class CityStats(object):
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.rows_in = 0
+        self.rows_out = 0
+        # size of the input files, each counted once however often it is read
+        self.input_bytes = 0
+        self.files = set()
+
+    def report(self):
+        return {'rows_in': self.rows_in,
+                'rows_out': self.rows_out,
+                'input_bytes': self.input_bytes,
+                'functions': {name: {'calls': self.calls[name],
+                                     'seconds': self.seconds[name]}
+                              for name in sorted(self.calls)}}
+
+
+class Run(object):
+    """
+    Counters of one instrumented run.
+    """
+    def __init__(self, profile_interval=None):
+        self.cities = {}
+        self.samples = Counter()
+        self.profile_interval = profile_interval
+        self.profiling = False
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def city(self, city):
+        stats = self.cities.get(city)
+        if stats is None:
+            stats = self.cities[city] = CityStats()
+        return stats
+
+    def add_input(self, city, filename):
+        """
+        Records that filename is an input of city; each file is counted
+        once.
+        """
+        stats = self.city(city)
+        if os.path.isfile(filename) and filename not in stats.files:
+            stats.files.add(filename)
+            stats.input_bytes += os.path.getsize(filename)
+
+    def report(self, top=20):
+        report = {'seconds': self.seconds,
+                  'cities': {city: stats.report() for city, stats in sorted(self.cities.items())}}
+        if self.profile_interval:
+            total = sum(self.samples.values())
+            report['profile'] = {'interval': self.profile_interval,
+                                 'samples': total,
+                                 'top': [{'function': name, 'samples': count,
+                                          'share': count / total}
+                                         for name, count in self.samples.most_common(top)]}
+        return report
+
+
+def _city_argument(function, args, kwargs):
+    """
+    Returns the city a call works for, and the file it reads if any.
+    """
+    try:
+        bound = inspect.signature(function).bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        return None, None
+    filename = bound.get('in_file', bound.get('filename'))
+    city = bound.get('city')
+    if not isinstance(city, str):
+        city = city_of(filename) if isinstance(filename, str) else 'unknown'
+    return city, filename if isinstance(filename, str) else None
+
+
+def _wrap(function):
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        run = _active
+        if run is None:
+            return function(*args, **kwargs)
+        city, filename = _city_argument(function, args, kwargs)
+        stats = run.city(city)
+        if filename:
+            run.add_input(city, filename)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.calls[name] += 1
+            stats.seconds[name] += time.perf_counter() - start
+    wrapper.__wrapped_original__ = function
+    return wrapper
+
+
+def _wrap_compile_transformer(compile_transformer):
+    @functools.wraps(compile_transformer)
+    def wrapper(city, header):
+        transform = compile_transformer(city, header)
+        run = _active
+        if run is None:
+            return transform
+        stats = run.city(city)
+
+        def counting_transform(row):
+            stats.rows_in += 1
+            result = transform(row)
+            stats.rows_out += 1
+            return result
+        return counting_transform
+    wrapper.__wrapped_original__ = compile_transformer
+    return wrapper
+
+
+def _replace_everywhere(original, replacement):
+    """
+    Rebinds every module level name in the package modules and the main
+    script that refers to original.
+    """
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not (module_name == 'bikeshare' or
+                                  module_name.startswith('bikeshare.') or
+                                  module_name == '__main__'):
+            continue
+        for name, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, name, replacement)
+
+
+def _originals():
+    import importlib
+    originals = []
+    for module_name, name in TARGETS + [('bikeshare.adapters', 'compile_transformer')]:
+        module = importlib.import_module(module_name)
+        originals.append(getattr(module, name))
+    return originals
+
+
+def _sample(signum, frame):
+    run = _active
+    # the wrappers of this module are not where the time goes; a sample
+    # belongs to the nearest frame outside of them
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+    if run is not None and frame is not None:
+        code = frame.f_code
+        run.samples['{}:{}'.format(os.path.basename(code.co_filename), code.co_name)] += 1
+
+
+def enable(profile_interval=None):
+    """
+    Turns instrumentation on and returns the new Run. profile_interval (in
+    seconds, e.g. 0.005) also starts the sampling profiler, which needs
+    SIGPROF and so only works on Unix in the main thread. If any step
+    fails, whatever was already installed is undone before the error is
+    raised.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError('instrumentation is already enabled')
+    run = _active = Run(profile_interval)
+    try:
+        for original in _originals():
+            if original.__name__ == 'compile_transformer':
+                _replace_everywhere(original, _wrap_compile_transformer(original))
+            else:
+                _replace_everywhere(original, _wrap(original))
+        if profile_interval:
+            signal.signal(signal.SIGPROF, _sample)
+            run.profiling = True
+            signal.setitimer(signal.ITIMER_PROF, profile_interval, profile_interval)
+    except BaseException:
+        disable()
+        raise
+    return run
+
+
+def disable():
+    """
+    Turns instrumentation off, restores the original functions and returns
+    the report of the run.
+    """
+    global _active
+    run = _active
+    if run is None:
+        raise RuntimeError('instrumentation is not enabled')
+    _active = None
+    if run.profiling:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+    for wrapper in _originals():
+        original = getattr(wrapper, '__wrapped_original__', None)
+        if original is not None:
+            _replace_everywhere(wrapper, original)
+    run.seconds = time.perf_counter() - run.started
+    return run.report()
+
+
+@contextmanager
+def instrumented(report_file=None, profile_interval=None):
+    """
+    Context manager that enables instrumentation for its body and writes
+    the JSON report to report_file afterwards. Yields the Run, whose
+    report is also available as run.final_report after the block.
+    """
+    run = enable(profile_interval)
+    try:
+        yield run
+    finally:
+        run.final_report = disable()
+        if report_file:
+            with open(report_file, 'w') as f_out:
+                json.dump(run.final_report, f_out, indent=2)
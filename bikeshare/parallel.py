@@ -0,0 +1,159 @@
+"""
+Parallel condense driver.
+
+Each raw city file is split into byte ranges that start and end on line
+boundaries. The shards of all cities are condensed in one process pool and
+the shard outputs of each city are then concatenated in order, so the
+result is the same file condense_data writes serially.
+
+The raw files have one trip per line (no quoted field spans a line break),
+which is what makes splitting on line boundaries safe.
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from bikeshare.adapters import compile_transformer
+from bikeshare.csvio import write_transformed
+from bikeshare.inputs import is_compressed, open_input, skip_first_trip
+from bikeshare.wrangling import out_colnames
+
+
+# shards smaller than this are not worth the overhead of a worker task
+MIN_SHARD_BYTES = 1 << 20
+
+
+def shard_ranges(in_file, n_shards, min_shard_bytes=None):
+    """
+    Splits the data rows of in_file into at most n_shards byte ranges.
+    Returns the header fields and a list of (start, end) offsets; every
+    range starts at the beginning of a line and the first one starts right
+    after the header row.
+
+    A compressed file cannot be entered at an arbitrary offset, so it is
+    returned as a single (None, None) range covering the whole file.
+    """
+    if is_compressed(in_file):
+        with open_input(in_file) as f_in:
+            header = next(csv.reader(f_in))
+        return header, [(None, None)]
+
+    min_shard_bytes = min_shard_bytes or MIN_SHARD_BYTES
+    size = os.path.getsize(in_file)
+    with open(in_file, 'rb') as f_in:
+        header = next(csv.reader([f_in.readline().decode('utf-8')]))
+        data_start = f_in.tell()
+
+        n_shards = max(1, min(n_shards, (size - data_start) // min_shard_bytes))
+        boundaries = [data_start]
+        for k in range(1, n_shards):
+            target = data_start + (size - data_start) * k // n_shards
+            # step back one byte so a target that is already a line start
+            # stays where it is
+            f_in.seek(target - 1)
+            f_in.readline()
+            position = f_in.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+        boundaries.append(size)
+
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def read_lines(in_file, start, end):
+    """
+    Yields the decoded lines of in_file between the byte offsets start and
+    end. start must be the beginning of a line. If start is None all data
+    lines after the header are read, decompressing the file if needed.
+    """
+    if start is None:
+        with open_input(in_file) as f_in:
+            next(f_in, None)
+            yield from f_in
+        return
+
+    with open(in_file, 'rb') as f_in:
+        f_in.seek(start)
+        position = start
+        while position < end:
+            line = f_in.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def condense_shard(in_file, shard_file, city, header, start, end, skip_first):
+    """
+    Condenses the rows of one byte range of in_file into shard_file, without
+    a header row. Returns the number of trips written.
+    """
+    with open(shard_file, 'w') as f_out:
+        trip_reader = csv.reader(read_lines(in_file, start, end))
+        transform = compile_transformer(city, header)
+        skipped = skip_first_trip(trip_reader) if skip_first else 0
+        write_transformed(f_out, trip_reader, transform)
+    # a trip is one line of the raw file
+    return trip_reader.line_num - skipped
+
+
+def _run_shard(task):
+    return condense_shard(*task)
+
+
+def condense_cities(city_info, processes=None, shards_per_city=None):
+    """
+    Condenses every city in city_info (the same {city: {'in_file': ...,
+    'out_file': ...}} layout the notebook uses) in a single process pool.
+    Large files are split into shards so that one city can use several
+    cores. Returns a dictionary with the number of trips written per city.
+    """
+    processes = processes or os.cpu_count() or 1
+    shards_per_city = shards_per_city or processes
+
+    plans = {}
+    tasks = []
+    for city, filenames in city_info.items():
+        header, ranges = shard_ranges(filenames['in_file'], shards_per_city)
+        shard_dir = tempfile.mkdtemp(prefix='.{}-shards-'.format(city),
+                                     dir=os.path.dirname(os.path.abspath(filenames['out_file'])))
+        shard_files = []
+        for i, (start, end) in enumerate(ranges):
+            shard_file = os.path.join(shard_dir, '{:05d}.csv'.format(i))
+            shard_files.append(shard_file)
+            tasks.append((filenames['in_file'], shard_file, city, header, start, end, i == 0))
+        plans[city] = (shard_dir, shard_files)
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            counts = list(pool.map(_run_shard, tasks))
+
+        n_trips = {}
+        first = 0
+        for city, (shard_dir, shard_files) in plans.items():
+            out_file = city_info[city]['out_file']
+            with open(out_file, 'w') as f_out:
+                csv.writer(f_out).writerow(out_colnames)
+            # the shards are copied as bytes so the csv line endings are kept
+            with open(out_file, 'ab') as f_out:
+                for shard_file in shard_files:
+                    with open(shard_file, 'rb') as f_shard:
+                        shutil.copyfileobj(f_shard, f_out)
+            n_trips[city] = sum(counts[first:first + len(shard_files)])
+            first += len(shard_files)
+    finally:
+        for shard_dir, _ in plans.values():
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+    return n_trips
+
+
+def condense_data_parallel(in_file, out_file, city, processes=None):
+    """
+    Parallel version of condense_data for a single file.
+    """
+    return condense_cities({city: {'in_file': in_file, 'out_file': out_file}},
+                           processes=processes)[city]
@@ -0,0 +1,202 @@
+"""
+Condensed trips partitioned by year and month.
+
+Instead of one Summary file per city, condense_partitioned writes a
+directory per city holding one trip store per month of data:
+
+    NYC/
+        manifest.json
+        2016/01.trips
+        2016/02.trips
+        ...
+
+The manifest lists every partition with its year, month, number of rows,
+the minimum and maximum of each numeric column and the user types it
+contains. Readers given filters (the where of bikeshare.query.query) use
+these statistics to skip the partitions no trip of which can pass, so a
+question about one season only reads that season's months:
+
+    query('./data/NYC', by=['user_type'], where=[('month', 'in', [6, 7, 8])])
+
+All partitions of a city share the same user type codes.
+"""
+
+import json
+import os
+
+from bikeshare.store import (USER_TYPES, TripStore, iter_dated_trips, iter_trips,
+                             read_trip_store, store_columns, store_row_appender,
+                             write_trip_store)
+from bikeshare.timeparse import DAY_NAMES
+
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# columns whose minimum and maximum are kept for pruning
+STATS_COLUMNS = ('duration', 'month', 'hour', 'day_of_week', 'day')
+
+
+def manifest_path(dataset):
+    return os.path.join(dataset, MANIFEST)
+
+
+def is_partitioned(path):
+    """
+    Returns True if path is a partitioned dataset directory.
+    """
+    return os.path.isdir(path) and os.path.exists(manifest_path(path))
+
+
+def load_manifest(dataset):
+    with open(manifest_path(dataset), 'r') as f_in:
+        manifest = json.load(f_in)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError('unsupported manifest version {!r} in {}'.format(
+            manifest.get('version'), dataset))
+    return manifest
+
+
+def _partition_name(year, month):
+    return os.path.join(str(year), '{:02d}.trips'.format(month))
+
+
+def _write_partition(dataset, city, key, columns, user_types):
+    """
+    Writes the columns of the partition of key, a (year, month) pair, and
+    returns its manifest entry.
+    """
+    year, month = key
+    name = _partition_name(year, month)
+    os.makedirs(os.path.join(dataset, str(year)), exist_ok=True)
+    write_trip_store(os.path.join(dataset, name), city, columns, user_types)
+    return {'path': name,
+            'year': year,
+            'month': month,
+            'rows': len(columns['duration']),
+            'min': {column: min(columns[column]) for column in STATS_COLUMNS},
+            'max': {column: max(columns[column]) for column in STATS_COLUMNS},
+            'user_types': sorted({user_types[code] for code in set(columns['user_type'])})}
+
+
+def condense_partitioned(in_file, dataset, city):
+    """
+    Condenses the raw trip file for city into a partitioned dataset
+    directory, with the same rows condense_data writes to a Summary file,
+    split by the year and month the trips started in. Returns the
+    manifest.
+
+    Raw files are ordered by start time, so only the month being read is
+    held in memory and each partition is written once, when the trips
+    move on to the next month. A trip that goes back to a month already
+    written reads that partition in again and has it rewritten.
+    """
+    user_types = list(USER_TYPES)
+    partitions = {}
+    current = columns = append = None
+
+    for trip, (year, month, day) in iter_dated_trips(in_file, city):
+        if (year, month) != current:
+            if current is not None:
+                partitions[current] = _write_partition(dataset, city, current, columns,
+                                                       user_types)
+            current = (year, month)
+            if current in partitions:
+                columns = read_trip_store(
+                    os.path.join(dataset, partitions[current]['path']))[1]
+            else:
+                columns = store_columns()
+            append = store_row_appender(columns, user_types)
+        append(trip, day)
+    if current is not None:
+        partitions[current] = _write_partition(dataset, city, current, columns, user_types)
+
+    # user types are only ever appended, so a partition written before a
+    # new one turned up still decodes with the full list of the manifest
+    manifest = {'version': MANIFEST_VERSION,
+                'city': city,
+                'source': os.path.basename(in_file),
+                'rows': sum(partition['rows'] for partition in partitions.values()),
+                'user_types': user_types,
+                'partitions': [partitions[key] for key in sorted(partitions)]}
+
+    # the manifest is replaced last, so readers never see partitions it
+    # does not describe yet
+    temp_path = manifest_path(dataset) + '.tmp'
+    with open(temp_path, 'w') as f_out:
+        json.dump(manifest, f_out, indent=2)
+    os.replace(temp_path, manifest_path(dataset))
+    return manifest
+
+
+def _may_match(partition, column, op, value):
+    """
+    False if the statistics of a partition show that no trip in it passes
+    the filter (column, op, value); True if some trip might.
+    """
+    if column == 'user_type':
+        present = partition['user_types']
+        if op == '==':
+            return value in present
+        if op == 'in':
+            return any(item in present for item in value)
+        return True
+    if column not in partition['min']:
+        return True
+
+    low = partition['min'][column]
+    high = partition['max'][column]
+    if column == 'day_of_week':
+        # filters may give days by name, the statistics hold their codes
+        if isinstance(value, str):
+            value = DAY_NAMES.index(value)
+        elif op in ('in', 'not in'):
+            value = [DAY_NAMES.index(item) if isinstance(item, str) else item
+                     for item in value]
+    if op == '<':
+        return low < value
+    if op == '<=':
+        return low <= value
+    if op == '>':
+        return high > value
+    if op == '>=':
+        return high >= value
+    if op == '==':
+        return low <= value <= high
+    if op == '!=':
+        return not low == high == value
+    if op == 'in':
+        return any(low <= item <= high for item in value)
+    return True
+
+
+def prune(manifest, where=()):
+    """
+    The partitions of a manifest that the filters in where do not rule
+    out.
+    """
+    return [partition for partition in manifest['partitions']
+            if all(_may_match(partition, column, op, value) for column, op, value in where)]
+
+
+def iter_dataset_chunks(dataset, where=(), chunk_rows=1 << 20):
+    """
+    Yields (columns, user_types) chunks, as bikeshare.query's
+    iter_column_chunks does, from the partitions of a dataset that the
+    filters in where do not rule out.
+    """
+    manifest = load_manifest(dataset)
+    user_types = manifest['user_types']
+    for partition in prune(manifest, where):
+        with TripStore(os.path.join(dataset, partition['path'])) as store:
+            for chunk in store.iter_chunks(chunk_rows):
+                yield chunk, user_types
+
+
+def iter_dataset_trips(dataset):
+    """
+    Yields the trips of every partition of a dataset as (duration, month,
+    hour, day_of_week, user_type) tuples, in partition order.
+    """
+    for partition in load_manifest(dataset)['partitions']:
+        yield from iter_trips(os.path.join(dataset, partition['path']))
@@ -0,0 +1,202 @@
+"""
+Staged condense pipeline built on asyncio.
+
+    reader -> read queue -> transform workers -> write queue -> ordered writer
+
+The reader pulls batches of raw lines off the (possibly compressed) input
+in a thread, the transform workers condense batches in a process pool and
+the writer puts the results back in input order before writing them. The
+queues are bounded, and a worker does not start a batch too far ahead of
+the next one to write, so a slow stage or batch holds the others back
+instead of letting batches pile up in memory, and reading, parsing and writing of
+different batches overlap. This helps most when the input sits on slow or
+network mounted storage.
+
+Every stage records how many batches and rows it handled and how long it
+was busy, and every queue how full it was, so the report returned by
+condense_pipeline shows which stage the pipeline waits on.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bikeshare.adapters import compile_transformer
+from bikeshare.csvio import write_transformed
+from bikeshare.inputs import open_input, skip_first_trip
+from bikeshare.wrangling import out_colnames
+
+
+class StageStats(object):
+    """
+    Batches, rows and busy time of one pipeline stage.
+    """
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.busy = 0.0
+
+    def add(self, rows, seconds):
+        self.batches += 1
+        self.rows += rows
+        self.busy += seconds
+
+    def report(self):
+        return {'batches': self.batches,
+                'rows': self.rows,
+                'busy_seconds': self.busy,
+                'rows_per_sec': self.rows / self.busy if self.busy else None}
+
+
+class MonitoredQueue(asyncio.Queue):
+    """
+    Bounded asyncio queue that samples its size on every put.
+    """
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.samples = 0
+        self.total_size = 0
+        self.max_size = 0
+
+    async def put(self, item):
+        size = self.qsize()
+        self.samples += 1
+        self.total_size += size
+        self.max_size = max(self.max_size, size)
+        await super().put(item)
+
+    def report(self):
+        return {'capacity': self.maxsize,
+                'max_occupancy': self.max_size,
+                'mean_occupancy': self.total_size / self.samples if self.samples else 0.0}
+
+
+def transform_batch(city, header, lines):
+    """
+    Condenses a batch of raw csv lines and returns them as csv text in the
+    Summary format. Runs in a worker process.
+    """
+    f_out = io.StringIO(newline='')
+    write_transformed(f_out, csv.reader(lines), compile_transformer(city, header))
+    return f_out.getvalue()
+
+
+def _read_batch(f_in, batch_lines):
+    batch = []
+    for line in f_in:
+        batch.append(line)
+        if len(batch) == batch_lines:
+            break
+    return batch
+
+
+async def run_pipeline(in_file, out_file, city, workers=None, batch_lines=20000,
+                       queue_size=8, executor=None):
+    """
+    Runs the pipeline and returns its report. executor is the
+    concurrent.futures executor the transforms run in; by default a
+    process pool with workers processes.
+    """
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    # file reads and writes block, so they get their own threads
+    io_threads = ThreadPoolExecutor(max_workers=2)
+
+    read_queue = MonitoredQueue(queue_size)
+    write_queue = MonitoredQueue(queue_size)
+    stats = {'read': StageStats(), 'transform': StageStats(), 'write': StageStats()}
+    # a worker only starts a batch this close to the next one to write, so
+    # the batches waiting for a slow one stay few
+    window = workers + queue_size
+    written = asyncio.Condition()
+    expected = 0
+    max_pending = 0
+    started = time.perf_counter()
+
+    f_in = open_input(in_file)
+    f_out = open(out_file, 'w')
+    try:
+        header = next(csv.reader([f_in.readline()]))
+        skip_first_trip(f_in)
+        csv.writer(f_out).writerow(out_colnames)
+
+        async def reader():
+            sequence = 0
+            while True:
+                start = time.perf_counter()
+                batch = await loop.run_in_executor(io_threads, _read_batch, f_in, batch_lines)
+                if not batch:
+                    break
+                stats['read'].add(len(batch), time.perf_counter() - start)
+                await read_queue.put((sequence, batch))
+                sequence += 1
+            for _ in range(workers):
+                await read_queue.put(None)
+
+        async def transformer():
+            while True:
+                item = await read_queue.get()
+                if item is None:
+                    await write_queue.put(None)
+                    return
+                sequence, batch = item
+                async with written:
+                    await written.wait_for(lambda: sequence < expected + window)
+                start = time.perf_counter()
+                text = await loop.run_in_executor(executor, transform_batch, city, header, batch)
+                stats['transform'].add(len(batch), time.perf_counter() - start)
+                await write_queue.put((sequence, len(batch), text))
+
+        async def writer():
+            nonlocal expected, max_pending
+            pending = {}
+            finished = 0
+            while finished < workers:
+                item = await write_queue.get()
+                if item is None:
+                    finished += 1
+                    continue
+                pending[item[0]] = item[1:]
+                max_pending = max(max_pending, len(pending))
+                # write every batch that is next in input order
+                while expected in pending:
+                    n_rows, text = pending.pop(expected)
+                    start = time.perf_counter()
+                    await loop.run_in_executor(io_threads, f_out.write, text)
+                    stats['write'].add(n_rows, time.perf_counter() - start)
+                    async with written:
+                        expected += 1
+                        written.notify_all()
+
+        await asyncio.gather(reader(), writer(),
+                             *[transformer() for _ in range(workers)])
+    finally:
+        f_in.close()
+        f_out.close()
+        io_threads.shutdown()
+        if own_executor:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    return {'city': city,
+            'rows': stats['write'].rows,
+            'seconds': elapsed,
+            'rows_per_sec': stats['write'].rows / elapsed if elapsed else None,
+            'stages': {name: stage.report() for name, stage in stats.items()},
+            'queues': {'read': read_queue.report(), 'write': write_queue.report()},
+            'reorder': {'window': window, 'max_pending': max_pending}}
+
+
+def condense_pipeline(in_file, out_file, city, **options):
+    """
+    Condenses in_file into out_file with the staged pipeline; the output is
+    the same as condense_data's. Returns the pipeline report. options are
+    passed on to run_pipeline.
+    """
+    return asyncio.run(run_pipeline(in_file, out_file, city, **options))
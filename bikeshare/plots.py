@@ -0,0 +1,50 @@
+"""
+Plotting of precomputed duration histograms.
+
+The bin counts come from bikeshare.analysis.duration_histograms, which
+reads the condensed data in chunks, so drawing a full year of trips only
+needs the few dozen counts and never the duration column itself.
+matplotlib is imported when a plot is drawn, not with this module.
+"""
+
+
+def plot_histogram(edges, counts, title=None, xlabel='Duration (m)', ax=None, **style):
+    """
+    Draws one histogram from its bin edges and counts on ax (the current
+    axes by default) and returns the axes. Extra keyword arguments are
+    passed on to matplotlib.
+    """
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+
+    if hasattr(ax, 'stairs'):
+        ax.stairs(counts, edges, fill=True, **style)
+    else:
+        # matplotlib before 3.4 has no stairs
+        widths = [right - left for left, right in zip(edges[:-1], edges[1:])]
+        ax.bar(edges[:-1], counts, width=widths, align='edge', **style)
+    ax.set_xlim(edges[0], edges[-1])
+    if title is not None:
+        ax.set_title(title)
+    if xlabel is not None:
+        ax.set_xlabel(xlabel)
+    return ax
+
+
+def plot_user_type_histograms(edges, histograms, city, user_types=('Subscriber', 'Customer'),
+                              figure=None):
+    """
+    Draws the histogram of each user type of one city side by side and
+    returns the figure. histograms is the dictionary returned by
+    duration_histograms.
+    """
+    if figure is None:
+        import matplotlib.pyplot as plt
+        figure = plt.figure(figsize=(5 * len(user_types), 4))
+
+    axes = figure.subplots(1, len(user_types), squeeze=False)[0]
+    for ax, user_type in zip(axes, user_types):
+        plot_histogram(edges, histograms.get(user_type, [0] * (len(edges) - 1)),
+                       'Trip Durations for {}s in {}'.format(user_type, city), ax=ax)
+    return figure
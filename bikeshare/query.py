@@ -0,0 +1,232 @@
+"""
+Group-by queries over condensed trips.
+
+Instead of writing a new loop with its own counters for every question,
+describe it: which columns to group by (any of month, hour, day_of_week
+and user_type), which trips to keep, and which aggregates of the duration
+to compute. The trips are processed in chunks of NumPy columns, and the
+grouping is a single bincount over a combined group key per chunk.
+
+    # busiest hour of the day for each user type
+    rows = query('./data/NYC-2016-Summary1.csv', by=['user_type', 'hour'])
+
+    # average duration of short weekend trips by month
+    query(store_file, by=['month'], aggregates=['count', 'mean'],
+          where=[('duration', '<', 75), ('day_of_week', 'in', ['Saturday', 'Sunday'])])
+
+With hourly weather joined in (see bikeshare.weather), the weather
+columns and their bands can be filtered and grouped on as well.
+"""
+
+import operator
+
+import numpy as np
+
+from bikeshare.inputs import open_input
+from bikeshare.partition import is_partitioned, iter_dataset_chunks
+from bikeshare.store import TripStore, is_trip_store
+from bikeshare.timeparse import DAY_NAMES
+from bikeshare.wrangling import out_colnames
+
+
+GROUP_COLUMNS = ('month', 'hour', 'day_of_week', 'user_type')
+
+# size of each group column's key range; user types are stored as uint8
+GROUP_SIZES = {'month': 13, 'hour': 24, 'day_of_week': 7, 'user_type': 256}
+
+AGGREGATES = ('count', 'sum', 'mean', 'std', 'share')
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt,
+             '>=': operator.ge, '==': operator.eq, '!=': operator.ne}
+
+CHUNK_ROWS = 1 << 20
+
+
+def iter_column_chunks(filename, chunk_rows=CHUNK_ROWS, where=()):
+    """
+    Yields (columns, user_types) for chunks of the trips in a condensed
+    file. columns maps each condensed column to a NumPy array, with
+    day_of_week as numbers (Monday = 0) and user_type as codes into the
+    user_types list. Trip stores are memory mapped, and from version 2 on
+    also have a day column (day of the month); Summary csv files are
+    parsed chunk by chunk with pandas, and the user type codes stay the
+    same from one chunk to the next.
+
+    filename may also be a partitioned dataset directory (see
+    bikeshare.partition), in which case the partitions the filters in where
+    rule out are skipped; the filters are not applied to the trips.
+    """
+    if is_partitioned(filename):
+        yield from iter_dataset_chunks(filename, where, chunk_rows)
+        return
+
+    if is_trip_store(filename):
+        with TripStore(filename) as store:
+            for chunk in store.iter_chunks(chunk_rows):
+                yield chunk, store.meta['user_types']
+        return
+
+    import pandas as pd
+
+    user_types = []
+    with open_input(filename) as f_in:
+        # the two text columns are read as categoricals, so only their few
+        # distinct values have to be translated into codes
+        chunks = pd.read_csv(f_in, usecols=out_colnames, chunksize=chunk_rows,
+                             dtype={'duration': np.float64, 'month': np.uint8,
+                                    'hour': np.uint8, 'user_type': 'category',
+                                    'day_of_week': 'category'},
+                             keep_default_na=False)
+        for chunk in chunks:
+            days = chunk['day_of_week'].cat
+            weekday_codes = np.array([DAY_NAMES.index(day) for day in days.categories],
+                                     dtype=np.uint8)
+            users = chunk['user_type'].cat
+            for user_type in users.categories:
+                if user_type not in user_types:
+                    user_types.append(user_type)
+            user_codes = np.array([user_types.index(user_type) for user_type in users.categories],
+                                  dtype=np.uint8)
+            yield ({'duration': chunk['duration'].to_numpy(),
+                    'month': chunk['month'].to_numpy(),
+                    'hour': chunk['hour'].to_numpy(),
+                    'day_of_week': weekday_codes[days.codes.to_numpy()],
+                    'user_type': user_codes[users.codes.to_numpy()]},
+                   user_types)
+
+
+def _encode(column, value, user_types, labels):
+    """
+    Translates day names, user types and band labels in a filter to their
+    codes.
+    """
+    if column == 'day_of_week' and isinstance(value, str):
+        return DAY_NAMES.index(value)
+    if column in labels and isinstance(value, str):
+        return labels[column].index(value)
+    if column == 'user_type':
+        # a user type missing from the data matches no trip
+        return user_types.index(value) if value in user_types else -1
+    return value
+
+
+def _mask(columns, where, user_types, labels):
+    mask = np.ones(len(columns['duration']), dtype=bool)
+    for column, op, value in where:
+        values = columns[column]
+        if op == 'in':
+            codes = [_encode(column, item, user_types, labels) for item in value]
+            mask &= np.isin(values, codes)
+        elif op == 'not in':
+            codes = [_encode(column, item, user_types, labels) for item in value]
+            mask &= ~np.isin(values, codes)
+        elif op in OPERATORS:
+            mask &= OPERATORS[op](values, _encode(column, value, user_types, labels))
+        else:
+            raise ValueError('unknown operator {!r}'.format(op))
+    return mask
+
+
+def query(filename, by=(), where=(), aggregates=('count', 'mean'), chunk_rows=CHUNK_ROWS,
+          weather=None):
+    """
+    Groups the trips of a condensed file (Summary csv, trip store or
+    partitioned dataset, whose partitions are pruned by where) that
+    pass every (column, operator, value) filter in where by the columns in
+    by, and computes the aggregates of the trip duration for each group:
+    count, sum, mean, std (population) and share (the percent of the filtered trips
+    that fall in the group). Operators are <, <=, >, >=, ==, !=, in and
+    not in; days and user types are given by name.
+
+    weather, an HourlyWeather, joins its columns and bands to every trip
+    by start hour; this needs a trip store with a day column.
+
+    Returns one dictionary per non-empty group, in key order, holding the
+    group values and the aggregates.
+    """
+    group_sizes = dict(GROUP_SIZES)
+    # labels of the codes of the joined band columns
+    labels = {}
+    chunks = iter_column_chunks(filename, chunk_rows, where)
+    if weather is not None:
+        chunks = weather.join(chunks)
+        for column, column_labels in weather.band_labels().items():
+            group_sizes[column] = len(column_labels)
+            labels[column] = column_labels
+
+    by = list(by)
+    for column in by:
+        if column not in group_sizes:
+            raise ValueError('cannot group by {!r}'.format(column))
+    for aggregate in aggregates:
+        if aggregate not in AGGREGATES:
+            raise ValueError('unknown aggregate {!r}'.format(aggregate))
+
+    sizes = [group_sizes[column] for column in by]
+    n_groups = int(np.prod(sizes)) if sizes else 1
+    counts = np.zeros(n_groups, dtype=np.int64)
+    totals = np.zeros(n_groups)
+    squares = np.zeros(n_groups)
+    user_types = []
+
+    for columns, user_types in chunks:
+        mask = _mask(columns, where, user_types, labels) if where else None
+        key = np.zeros(len(columns['duration']), dtype=np.intp)
+        for column, size in zip(by, sizes):
+            key = key * size + columns[column]
+        duration = columns['duration'].astype(np.float64)
+        if mask is not None:
+            key = key[mask]
+            duration = duration[mask]
+        counts += np.bincount(key, minlength=n_groups)
+        totals += np.bincount(key, weights=duration, minlength=n_groups)
+        if 'std' in aggregates:
+            squares += np.bincount(key, weights=duration * duration, minlength=n_groups)
+
+    n_total = counts.sum()
+    rows = []
+    for group in np.flatnonzero(counts):
+        values = []
+        remainder = int(group)
+        for size in reversed(sizes):
+            remainder, value = divmod(remainder, size)
+            values.append(value)
+        row = {}
+        for column, value in zip(by, reversed(values)):
+            if column == 'day_of_week':
+                value = DAY_NAMES[value]
+            elif column == 'user_type':
+                value = user_types[value]
+            elif column in labels:
+                value = labels[column][value]
+            row[column] = value
+
+        count = int(counts[group])
+        mean = totals[group] / count
+        for aggregate in aggregates:
+            if aggregate == 'count':
+                row['count'] = count
+            elif aggregate == 'sum':
+                row['sum'] = float(totals[group])
+            elif aggregate == 'mean':
+                row['mean'] = float(mean)
+            elif aggregate == 'std':
+                row['std'] = float(max(squares[group] / count - mean * mean, 0) ** 0.5)
+            elif aggregate == 'share':
+                row['share'] = float(count/n_total*100)
+        rows.append(row)
+    return rows
+
+
+def top(rows, within, key='count'):
+    """
+    Picks, for every value of the column within, the row of a query result
+    with the largest key. For example the busiest hour per user type is
+    top(query(filename, by=['user_type', 'hour']), 'user_type').
+    """
+    best = {}
+    for row in rows:
+        group = row[within]
+        if group not in best or row[key] > best[group][key]:
+            best[group] = row
+    return list(best.values())
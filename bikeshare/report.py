@@ -0,0 +1,216 @@
+"""
+Headless report of the condensed trip data of every city.
+
+Each city is handled by its own worker process, which computes the
+metrics of the notebook (trip counts, trip lengths, duration by user type,
+weekday against weekend durations, busiest hours) from the Summary file or
+trip store and renders the figures with matplotlib's Agg renderer. The
+results are written as report.json and report.html, with the figures as
+PNG files next to them. No Jupyter or display is needed, so it can run
+from cron:
+
+    python -m bikeshare.report --out ./report \
+        NYC=./data/NYC-2016-Summary.csv Chicago=./data/Chicago-2016-Summary.csv
+"""
+
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# the Summary files the notebook writes
+DEFAULT_CITY_FILES = {'NYC': './data/NYC-2016-Summary.csv',
+                      'Chicago': './data/Chicago-2016-Summary.csv',
+                      'Washington': './data/Washington-2016-Summary.csv'}
+
+# field names of the tuples returned by the notebook's analysis functions
+METRIC_FIELDS = {
+    'number_of_trips': ('subscribers', 'customers', 'total',
+                        'subscriber_percent', 'customer_percent'),
+    'len_of_trip': ('trips', 'over_30_minutes', 'average_minutes',
+                    'over_30_minutes_percent', 'total_minutes'),
+    'Duration_RiderShip': ('subscriber_trips', 'customer_trips',
+                           'subscriber_average_minutes', 'customer_average_minutes'),
+    'rider_ship': ('weekend_customer_minutes', 'weekend_subscriber_minutes',
+                   'weekday_customer_minutes', 'weekday_subscriber_minutes'),
+}
+
+
+def render_figures(city, metrics, edges, histograms, figure_dir):
+    """
+    Draws the figures of one city into PNG files in figure_dir and returns
+    their file names. Figures are built without pyplot, so nothing depends
+    on an interactive backend.
+    """
+    from matplotlib.figure import Figure
+
+    from bikeshare.plots import plot_user_type_histograms
+
+    figures = {}
+
+    figure = Figure(figsize=(10, 4))
+    plot_user_type_histograms(edges, histograms, city, figure=figure)
+    figures['durations'] = '{}-durations.png'.format(city)
+    figure.savefig(os.path.join(figure_dir, figures['durations']), bbox_inches='tight')
+
+    weekend = metrics['rider_ship']
+    figure = Figure(figsize=(6, 4))
+    ax = figure.subplots()
+    positions = range(2)
+    ax.bar([p - 0.2 for p in positions],
+           [weekend['weekday_subscriber_minutes'], weekend['weekend_subscriber_minutes']],
+           width=0.4, label='Subscribers')
+    ax.bar([p + 0.2 for p in positions],
+           [weekend['weekday_customer_minutes'], weekend['weekend_customer_minutes']],
+           width=0.4, label='Customers')
+    ax.set_xticks(list(positions))
+    ax.set_xticklabels(['Weekdays', 'Weekends'])
+    ax.set_ylabel('Average trip Duration')
+    ax.set_title('Average Trip Duration in {}'.format(city))
+    ax.legend()
+    figures['weekend'] = '{}-weekend.png'.format(city)
+    figure.savefig(os.path.join(figure_dir, figures['weekend']), bbox_inches='tight')
+
+    return figures
+
+
+def city_report(city, filename, figure_dir, bin_width=5, cutoff=75):
+    """
+    Computes the metrics and renders the figures of one city. Runs in a
+    worker process and returns a JSON-ready dictionary.
+    """
+    from bikeshare.aggregate import run_aggregates
+    from bikeshare.analysis import duration_histograms
+    from bikeshare.query import query, top
+
+    start = time.perf_counter()
+    results = run_aggregates(filename, list(METRIC_FIELDS))
+    # counts stay integers, the store's float32 averages become floats
+    metrics = {name: dict(zip(fields, (value if isinstance(value, int) else float(value)
+                                       for value in results[name])))
+               for name, fields in METRIC_FIELDS.items()}
+    metrics['busiest_hours'] = {
+        row['user_type']: {'hour': row['hour'], 'trips': row['count'], 'percent': row['share']}
+        for row in top(query(filename, by=['user_type', 'hour'],
+                             aggregates=['count', 'share']), 'user_type')}
+
+    edges, histograms = duration_histograms(filename, bin_width, cutoff)
+    figures = render_figures(city, metrics, edges, histograms, figure_dir)
+
+    return {'city': city,
+            'file': filename,
+            'metrics': metrics,
+            'histogram': {'edges': [float(edge) for edge in edges],
+                          'counts': {user_type: [int(count) for count in counts]
+                                     for user_type, counts in histograms.items()}},
+            'figures': figures,
+            'seconds': time.perf_counter() - start}
+
+
+def _run_city(task):
+    return city_report(*task)
+
+
+def _metrics_table(metrics):
+    rows = []
+    for name, fields in METRIC_FIELDS.items():
+        for field in fields:
+            rows.append('<tr><td>{}</td><td>{}</td><td>{:,.2f}</td></tr>'.format(
+                html.escape(name), html.escape(field), metrics[name][field]))
+    for user_type, busiest in metrics['busiest_hours'].items():
+        rows.append('<tr><td>busiest_hour</td><td>{}</td>'
+                    '<td>{}:00 ({:.1f}% of trips)</td></tr>'.format(
+                        html.escape(user_type), busiest['hour'], busiest['percent']))
+    return '<table>\n<tr><th>metric</th><th>field</th><th>value</th></tr>\n{}\n</table>'.format(
+        '\n'.join(rows))
+
+
+def write_html(report, filename):
+    sections = []
+    for city, city_report in report['cities'].items():
+        images = ''.join('<img src="{}" alt="{}">'.format(html.escape(path), html.escape(name))
+                         for name, path in city_report['figures'].items())
+        sections.append('<h2>{}</h2>\n<p>{}</p>\n{}\n<div>{}</div>'.format(
+            html.escape(city), html.escape(city_report['file']),
+            _metrics_table(city_report['metrics']), images))
+
+    with open(filename, 'w') as f_out:
+        f_out.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+                    '<title>US Bike Share Report</title>\n'
+                    '<style>body {{font-family: sans-serif}} td, th {{padding: 2px 8px}}'
+                    ' img {{max-width: 48%}}</style>\n'
+                    '</head>\n<body>\n<h1>US Bike Share Report</h1>\n<p>Generated {}</p>\n'
+                    '{}\n</body>\n</html>\n'.format(html.escape(report['generated']),
+                                                    '\n'.join(sections)))
+
+
+def build_report(city_files, out_dir, processes=None, bin_width=5, cutoff=75):
+    """
+    Builds the report of every city in city_files ({city: condensed file})
+    in out_dir, one worker process per city. Returns the report dictionary
+    that is also written to report.json.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(city, filename, out_dir, bin_width, cutoff)
+             for city, filename in city_files.items()]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes or len(tasks) or 1) as pool:
+        city_reports = list(pool.map(_run_city, tasks))
+
+    report = {'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'seconds': time.perf_counter() - start,
+              'cities': {city_report['city']: city_report for city_report in city_reports}}
+    with open(os.path.join(out_dir, 'report.json'), 'w') as f_out:
+        json.dump(report, f_out, indent=2)
+    write_html(report, os.path.join(out_dir, 'report.html'))
+    return report
+
+
+def parse_city_files(values):
+    """
+    Turns CITY=FILE arguments into a {city: file} dictionary.
+    """
+    city_files = {}
+    for value in values:
+        city, separator, filename = value.partition('=')
+        if not separator or not city or not filename:
+            raise ValueError('expected CITY=FILE, got {!r}'.format(value))
+        city_files[city] = filename
+    return city_files
+
+
+def add_arguments(parser):
+    """
+    Adds the report options to an argparse parser; shared with the report
+    subcommand of python -m bikeshare.
+    """
+    parser.add_argument('city_files', nargs='*', metavar='CITY=FILE',
+                        help='condensed file of each city (default: the notebook Summary files)')
+    parser.add_argument('--out', default='./report', help='output directory')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--bin-width', type=float, default=5)
+    parser.add_argument('--cutoff', type=float, default=75)
+
+
+def run(args, parser):
+    try:
+        city_files = parse_city_files(args.city_files) if args.city_files else DEFAULT_CITY_FILES
+    except ValueError as error:
+        parser.error(str(error))
+    report = build_report(city_files, args.out, args.processes, args.bin_width, args.cutoff)
+    print('wrote {} ({} cities, {:.2f} s)'.format(
+        os.path.join(args.out, 'report.html'), len(report['cities']), report['seconds']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    run(parser.parse_args(argv), parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Stratified samples of the raw trip data, with confidence intervals.
+
+The course data is a random 2% sample of each city's trips. condense_sample
+draws such a sample while condensing, in one pass over the raw file, and
+groups it by user type and month: either every trip is kept with the
+same probability (Bernoulli sampling, which is only stratified after
+the fact, so the number of trips drawn from a stratum varies) or a fixed
+number of trips is kept per stratum (stratified reservoir sampling).
+Bernoulli samples are written as they are drawn, and the reservoirs only
+hold condensed trips, so memory does not grow with the size of the raw
+file. The sample is written as an ordinary
+Summary file, and the number of trips in every stratum of the full file
+is written next to it (out_file + '.sample.json'), so that
+
+    estimates = estimate_sample('./data/NYC-2016-Sample.csv')
+
+can weight each stratum correctly and report every figure of
+number_of_trips, len_of_trip and Duration_RiderShip with a confidence
+interval. The seed makes the sample reproducible.
+"""
+
+import csv
+import json
+import math
+import random
+from collections import namedtuple
+from statistics import NormalDist
+
+from bikeshare.adapters import compile_transformer, get_adapter
+from bikeshare.aggregate import iter_condensed
+from bikeshare.inputs import open_input, skip_first_trip
+from bikeshare.timeparse import start_date_parser
+from bikeshare.wrangling import out_colnames
+
+
+# an estimate and the bounds of its confidence interval
+Estimate = namedtuple('Estimate', ['value', 'low', 'high'])
+
+SAMPLE_METHODS = ('bernoulli', 'reservoir')
+
+
+def sample_info_path(out_file):
+    return out_file + '.sample.json'
+
+
+def condense_sample(in_file, out_file, city, fraction=0.02, seed=2016, method='bernoulli',
+                    per_stratum=None):
+    """
+    Condenses a sample of the raw trip file for city into a Summary file.
+    method 'bernoulli' keeps every trip with probability fraction;
+    'reservoir' keeps per_stratum trips (or all of them, if fewer) of every
+    user type and month, chosen uniformly. As condense_data does, the
+    first trip of the file is left out. Returns the sample description
+    that is also written to the sample info file.
+    """
+    if method not in SAMPLE_METHODS:
+        raise ValueError('unknown sample method {!r}'.format(method))
+    if method == 'reservoir' and not per_stratum:
+        raise ValueError('reservoir sampling needs per_stratum')
+
+    adapter = get_adapter(city)
+    parse_date = start_date_parser(adapter.time_format)
+    rng = random.Random(seed)
+    draw = rng.random
+    # trips of the full file, and the reservoirs of condensed trips with
+    # their position in the file, by (user type, month)
+    population = {}
+    reservoirs = {}
+    n_kept = 0
+
+    with open_input(in_file) as f_in, open(out_file, 'w') as f_out:
+        trip_reader = csv.reader(f_in)
+        header = next(trip_reader)
+        transform = compile_transformer(city, header)
+        start_index = header.index(adapter.start_column)
+        user_index = header.index(adapter.user_type_column)
+        user_types = adapter.user_types
+        default_user_type = adapter.default_user_type
+        trip_writer = csv.writer(f_out)
+        trip_writer.writerow(out_colnames)
+        skip_first_trip(trip_reader)
+
+        # only the stratum of a trip is parsed here; a trip is condensed
+        # once it is drawn
+        for position, row in enumerate(trip_reader):
+            user_type = row[user_index]
+            if user_types is not None:
+                user_type = user_types.get(user_type, default_user_type)
+            stratum = (user_type, parse_date(row[start_index])[1])
+            seen = population.get(stratum, 0) + 1
+            population[stratum] = seen
+
+            if method == 'bernoulli':
+                if draw() < fraction:
+                    trip_writer.writerow(transform(row))
+                    n_kept += 1
+            else:
+                reservoir = reservoirs.setdefault(stratum, [])
+                if seen <= per_stratum:
+                    reservoir.append((position, transform(row)))
+                else:
+                    slot = rng.randrange(seen)
+                    if slot < per_stratum:
+                        reservoir[slot] = (position, transform(row))
+
+        if method == 'reservoir':
+            # the reservoirs are written in file order
+            kept = sorted(entry for reservoir in reservoirs.values() for entry in reservoir)
+            trip_writer.writerows(trip for _, trip in kept)
+            n_kept = len(kept)
+
+    info = {'city': city,
+            'source': in_file,
+            'method': method,
+            'fraction': fraction if method == 'bernoulli' else None,
+            'per_stratum': per_stratum if method == 'reservoir' else None,
+            'seed': seed,
+            'rows': n_kept,
+            'strata': [{'user_type': user_type, 'month': month, 'population': count}
+                       for (user_type, month), count in sorted(population.items())]}
+    with open(sample_info_path(out_file), 'w') as f_out:
+        json.dump(info, f_out, indent=2)
+    return info
+
+
+class StratumStats(object):
+    """
+    Sums of one stratum of the sample.
+    """
+    def __init__(self, population):
+        self.population = population
+        self.n = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.over = 0
+
+    def add(self, duration, threshold):
+        self.n += 1
+        self.total += duration
+        self.squares += duration * duration
+        if duration > threshold:
+            self.over += 1
+
+    def mean_and_variance(self, indicator=False):
+        """
+        Sample mean and sample variance of the duration (or of the
+        indicator of a trip longer than the threshold).
+        """
+        if indicator:
+            mean = self.over / self.n
+            squares = self.over
+        else:
+            mean = self.total / self.n
+            squares = self.squares
+        if self.n < 2:
+            return mean, 0.0
+        return mean, max(squares - self.n * mean * mean, 0.0) / (self.n - 1)
+
+
+def _stratified_mean(strata, z, indicator=False):
+    """
+    Stratified estimate of a population mean with its confidence interval.
+    Strata without any sampled trip are left out of the estimate.
+    """
+    sampled = [stats for stats in strata if stats.n]
+    population = sum(stats.population for stats in sampled)
+    if not population:
+        return Estimate(math.nan, math.nan, math.nan)
+    mean = 0.0
+    variance = 0.0
+    for stats in sampled:
+        weight = stats.population / population
+        stratum_mean, stratum_variance = stats.mean_and_variance(indicator)
+        mean += weight * stratum_mean
+        # with the finite population correction
+        variance += (weight * weight * (1 - stats.n / stats.population)
+                     * stratum_variance / stats.n)
+    half_width = z * math.sqrt(variance)
+    return Estimate(mean, mean - half_width, mean + half_width)
+
+
+def _scaled(estimate, factor):
+    return Estimate(*(value * factor for value in estimate))
+
+
+def _exact(value):
+    return Estimate(value, value, value)
+
+
+def estimate_sample(sample_file, confidence=0.95, threshold=30):
+    """
+    Estimates the figures of number_of_trips, len_of_trip and
+    Duration_RiderShip for the full file a sample was drawn from, in the
+    same order, each as an Estimate (value, low, high) with a confidence
+    interval at the given level. The trip counts per user type are known
+    exactly from the stratum sizes, so their intervals have no width.
+    """
+    with open(sample_info_path(sample_file), 'r') as f_in:
+        info = json.load(f_in)
+    strata = {(stratum['user_type'], stratum['month']): StratumStats(stratum['population'])
+              for stratum in info['strata']}
+    for duration, month, hour, day_of_week, user_type in iter_condensed(sample_file):
+        strata[(user_type, month)].add(duration, threshold)
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    everyone = list(strata.values())
+    by_user = {}
+    for (user_type, month), stats in strata.items():
+        by_user.setdefault(user_type, []).append(stats)
+
+    n_total = sum(stats.population for stats in everyone)
+    n_subscribers = sum(stats.population for stats in by_user.get('Subscriber', []))
+    n_customers = n_total - n_subscribers
+    number_of_trips = (_exact(n_subscribers), _exact(n_customers), _exact(n_total),
+                       _exact(n_subscribers / n_total * 100),
+                       _exact(n_customers / n_total * 100))
+
+    mean = _stratified_mean(everyone, z)
+    over_share = _stratified_mean(everyone, z, indicator=True)
+    len_of_trip = (_exact(n_total), _scaled(over_share, n_total), mean,
+                   _scaled(over_share, 100), _scaled(mean, n_total))
+
+    # Duration_RiderShip only counts Customer trips as customers
+    n_listed_customers = sum(stats.population for stats in by_user.get('Customer', []))
+    duration_ridership = (_exact(n_subscribers), _exact(n_listed_customers),
+                          _stratified_mean(by_user.get('Subscriber', []), z),
+                          _stratified_mean(by_user.get('Customer', []), z))
+
+    return {'number_of_trips': number_of_trips,
+            'len_of_trip': len_of_trip,
+            'Duration_RiderShip': duration_ridership,
+            'confidence': confidence,
+            'sample_rows': info['rows']}
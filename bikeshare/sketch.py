@@ -0,0 +1,175 @@
+"""
+Streaming summaries of the trip durations.
+
+DurationHistogram counts trips in fixed width duration bins and
+QuantileSketch estimates quantiles with a bounded relative error (it is a
+DDSketch: durations are counted in logarithmically sized buckets). Both
+are updated one trip at a time, use memory independent of the number of
+trips, and can be merged, so the summaries of shards or cities computed
+in parallel combine cheaply.
+"""
+
+import math
+
+from bikeshare.aggregate import Aggregate, register_aggregate
+
+
+class DurationHistogram(object):
+    """
+    Counts of durations in bins of bin_width minutes from 0 up to cutoff.
+    Longer trips are counted in overflow.
+    """
+    def __init__(self, bin_width=5, cutoff=75):
+        self.bin_width = bin_width
+        self.cutoff = cutoff
+        self.counts = [0] * int(math.ceil(cutoff / bin_width))
+        self.overflow = 0
+
+    def add(self, duration):
+        if 0 <= duration < self.cutoff:
+            self.counts[int(duration // self.bin_width)] += 1
+        else:
+            self.overflow += 1
+
+    def merge(self, other):
+        if (other.bin_width, other.cutoff) != (self.bin_width, self.cutoff):
+            raise ValueError('cannot merge histograms with different bins')
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.overflow += other.overflow
+        return self
+
+    def edges(self):
+        """
+        The bin edges, one more than the number of bins.
+        """
+        return [min(i * self.bin_width, self.cutoff) for i in range(len(self.counts) + 1)]
+
+    def mode_bin(self):
+        """
+        Returns the (low, high) edges of the bin with the most trips, or
+        None if the histogram is empty.
+        """
+        if not any(self.counts):
+            return None
+        i = max(range(len(self.counts)), key=self.counts.__getitem__)
+        edges = self.edges()
+        return (edges[i], edges[i + 1])
+
+
+class QuantileSketch(object):
+    """
+    Mergeable quantile sketch with relative accuracy alpha: every quantile
+    returned is within a factor (1 +/- alpha) of the exact one. Durations
+    between a second and a year need fewer than a thousand buckets at the
+    default accuracy of 1%.
+    """
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = int(math.ceil(math.log(value) / self.log_gamma))
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError('cannot merge sketches with different accuracy')
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """
+        Estimated q-quantile (0 <= q <= 1), or None for an empty sketch.
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class DurationSummary(object):
+    """
+    Histogram and quantile sketch of the durations of one group of trips.
+    """
+    def __init__(self, bin_width=5, cutoff=75, alpha=0.01):
+        self.histogram = DurationHistogram(bin_width, cutoff)
+        self.quantiles = QuantileSketch(alpha)
+
+    def add(self, duration):
+        self.histogram.add(duration)
+        self.quantiles.add(duration)
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.quantiles.merge(other.quantiles)
+        return self
+
+    def report(self):
+        """
+        Returns the number of trips, the median, p90 and p99 durations and
+        the mode bin.
+        """
+        return {'count': self.quantiles.count,
+                'median': self.quantiles.quantile(0.5),
+                'p90': self.quantiles.quantile(0.9),
+                'p99': self.quantiles.quantile(0.99),
+                'mode_bin': self.histogram.mode_bin()}
+
+
+@register_aggregate('duration_sketch')
+class DurationSketch(Aggregate):
+    """
+    Duration histogram and quantile sketch for all trips ('all') and for
+    each user type, kept during a run_aggregates pass. The result maps each
+    group to a DurationSummary; merge results from different passes with
+    merge_summaries.
+    """
+    default = False
+
+    def __init__(self, bin_width=5, cutoff=75, alpha=0.01):
+        self.settings = (bin_width, cutoff, alpha)
+        self.summaries = {'all': DurationSummary(*self.settings)}
+
+    def update(self, duration, month, hour, day_of_week, user_type):
+        self.summaries['all'].add(duration)
+        summary = self.summaries.get(user_type)
+        if summary is None:
+            summary = self.summaries[user_type] = DurationSummary(*self.settings)
+        summary.add(duration)
+
+    def result(self):
+        return self.summaries
+
+
+def merge_summaries(*results):
+    """
+    Merges duration_sketch results (e.g. from shards or from several
+    cities) into a new result.
+    """
+    merged = {}
+    for summaries in results:
+        for group, summary in summaries.items():
+            if group not in merged:
+                settings = (summary.histogram.bin_width, summary.histogram.cutoff,
+                            summary.quantiles.alpha)
+                merged[group] = DurationSummary(*settings)
+            merged[group].merge(summary)
+    return merged
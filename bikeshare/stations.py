@@ -0,0 +1,175 @@
+"""
+Station and route index, built while condensing.
+
+The condensed Summary files drop the station columns, so the closing
+questions of the notebook (where are the most used docks, what are the
+most common routes) cannot be answered from them. StationIndex is updated
+from the raw rows during condense_data (pass a stations_file) and keeps:
+
+- the station names, interned into integer codes in order of appearance;
+- the number of departures from and arrivals at every station;
+- the most frequent origin -> destination routes, tracked by a
+  Space-Saving sketch of fixed capacity. A city has a few hundred stations
+  but hundreds of thousands of distinct routes, and the sketch keeps the
+  memory bounded whatever their number.
+
+The index is written as JSON next to the Summary file.
+"""
+
+import heapq
+import json
+
+from bikeshare.adapters import get_adapter
+
+
+class SpaceSaving(object):
+    """
+    Space-Saving heavy hitter sketch over at most capacity items. Every
+    item whose true count is above n/capacity (n the number of items
+    added) is monitored, and the count reported for a monitored item
+    overestimates its true count by at most its recorded error.
+    """
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # (count, item) for every monitored item; a count may be stale
+        # (lower than the current one) and is refreshed when it surfaces
+        self.heap = []
+        self.n = 0
+
+    def add(self, item, count=1):
+        self.n += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self.heap, (count, item))
+            return
+
+        # replace the item with the smallest count
+        heap = self.heap
+        while True:
+            low, victim = heap[0]
+            current = counts[victim]
+            if current == low:
+                break
+            heapq.heapreplace(heap, (current, victim))
+        del counts[victim]
+        del self.errors[victim]
+        counts[item] = low + count
+        self.errors[item] = low
+        heapq.heapreplace(heap, (low + count, item))
+
+    def top(self, k):
+        """
+        The k items with the largest counts, as (item, count, error)
+        tuples, largest first.
+        """
+        items = heapq.nlargest(k, self.counts.items(), key=lambda entry: entry[1])
+        return [(item, count, self.errors[item]) for item, count in items]
+
+
+class StationIndex(object):
+    """
+    Interned station names with departure and arrival counts, and the
+    heavy hitter routes between them, for one city.
+    """
+    def __init__(self, city, route_capacity=1000):
+        self.city = city
+        self.names = []
+        self.codes = {}
+        self.departures = []
+        self.arrivals = []
+        self.routes = SpaceSaving(route_capacity)
+
+    def code(self, name):
+        """
+        Integer code of a station name, assigning the next free code to a
+        name not seen before.
+        """
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+            self.departures.append(0)
+            self.arrivals.append(0)
+        return code
+
+    def add(self, start_station, end_station):
+        origin = self.code(start_station)
+        destination = self.code(end_station)
+        self.departures[origin] += 1
+        self.arrivals[destination] += 1
+        self.routes.add((origin, destination))
+
+    def observe(self, rows, header):
+        """
+        Passes the raw csv rows (laid out as in header) through unchanged,
+        adding the stations of each one to the index on the way.
+        """
+        adapter = get_adapter(self.city)
+        if adapter.start_station_column is None or adapter.end_station_column is None:
+            raise ValueError('no station columns declared for city {!r}'.format(self.city))
+        start_index = header.index(adapter.start_station_column)
+        end_index = header.index(adapter.end_station_column)
+        # add() inlined, this runs once per trip
+        codes = self.codes
+        code = self.code
+        departures = self.departures
+        arrivals = self.arrivals
+        add_route = self.routes.add
+        for row in rows:
+            origin = codes.get(row[start_index])
+            if origin is None:
+                origin = code(row[start_index])
+            destination = codes.get(row[end_index])
+            if destination is None:
+                destination = code(row[end_index])
+            departures[origin] += 1
+            arrivals[destination] += 1
+            add_route((origin, destination))
+            yield row
+
+    def top_stations(self, k=10, counts=None):
+        """
+        The k stations with the most departures (or the given counts, e.g.
+        self.arrivals), as (name, count) pairs.
+        """
+        counts = self.departures if counts is None else counts
+        codes = heapq.nlargest(k, range(len(counts)), key=counts.__getitem__)
+        return [(self.names[code], counts[code]) for code in codes]
+
+    def top_routes(self, k=10):
+        """
+        The k most common routes as (origin, destination, trips, error)
+        tuples; trips may overestimate the true count by at most error.
+        """
+        return [(self.names[origin], self.names[destination], count, error)
+                for (origin, destination), count, error in self.routes.top(k)]
+
+    def report(self, top_k=100):
+        return {'city': self.city,
+                'stations': self.names,
+                'departures': self.departures,
+                'arrivals': self.arrivals,
+                'trips': self.routes.n,
+                'route_capacity': self.routes.capacity,
+                'top_routes': [{'from': origin, 'to': destination, 'trips': count,
+                                'error': error}
+                               for origin, destination, count, error in self.top_routes(top_k)]}
+
+    def save(self, filename, top_k=100):
+        with open(filename, 'w') as f_out:
+            json.dump(self.report(top_k), f_out, indent=2)
+
+
+def load_station_report(filename):
+    """
+    Reads a station index written by StationIndex.save.
+    """
+    with open(filename, 'r') as f_in:
+        return json.load(f_in)
@@ -0,0 +1,332 @@
+"""
+Compact binary trip store, an alternative to the Summary CSV format.
+
+A store file holds the same five condensed fields as a Summary file, but
+as typed columns instead of text, plus the day of the month so that
+analyses can single out particular dates such as holidays:
+
+    duration     float32  minutes
+    month        uint8    1-12
+    hour         uint8    0-23
+    day_of_week  uint8    0 = Monday ... 6 = Sunday
+    user_type    uint8    index into the user_types list of the header
+    day          uint8    1-31 (version 2 and later)
+
+The file starts with the magic bytes b'BIKETRIP', a little-endian uint32
+giving the length of a JSON metadata header, and the header itself. The
+columns follow one after the other, each starting on an 8 byte boundary,
+at the offsets listed in the header.
+"""
+
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import mmap
+except ImportError:
+    # some platforms (WebAssembly builds of Python) have no mmap
+    mmap = None
+
+from bikeshare.adapters import compile_transformer, get_adapter
+from bikeshare.inputs import open_input, skip_first_trip
+from bikeshare.timeparse import DAY_NAMES, start_date_parser
+
+
+MAGIC = b'BIKETRIP'
+VERSION = 2
+
+# versions read_store_meta accepts; version 1 stores have no day column
+READABLE_VERSIONS = (1, 2)
+
+# name, array typecode, numpy dtype name
+STORE_COLUMNS = [('duration', 'f', 'float32'),
+                 ('month', 'B', 'uint8'),
+                 ('hour', 'B', 'uint8'),
+                 ('day_of_week', 'B', 'uint8'),
+                 ('user_type', 'B', 'uint8'),
+                 ('day', 'B', 'uint8')]
+
+# the codes of these user types are fixed, any other value found in the
+# data is appended to the list in the header
+USER_TYPES = ['Subscriber', 'Customer']
+
+ALIGNMENT = 8
+
+
+def _padding(position):
+    return -position % ALIGNMENT
+
+
+def is_trip_store(filename):
+    """
+    Returns True if filename is a binary trip store rather than a csv file.
+    """
+    if os.path.isdir(filename):
+        return False
+    with open(filename, 'rb') as f_in:
+        return f_in.read(len(MAGIC)) == MAGIC
+
+
+def _relative_offsets(n_rows):
+    """
+    Offsets of the columns relative to the start of the column data.
+    """
+    offsets = []
+    relative = 0
+    for name, typecode, dtype in STORE_COLUMNS:
+        offsets.append(relative)
+        relative += array(typecode).itemsize * n_rows
+        relative += _padding(relative)
+    return offsets
+
+
+def write_trip_store(out_file, city, columns, user_types):
+    """
+    Writes a trip store. columns maps each name in STORE_COLUMNS to an
+    array of the matching typecode, all of the same length.
+    """
+    n_rows = len(columns['duration'])
+    meta = {'version': VERSION,
+            'city': city,
+            'rows': n_rows,
+            'user_types': list(user_types),
+            'day_names': list(DAY_NAMES),
+            'byteorder': 'little',
+            'columns': [{'name': name, 'dtype': dtype, 'offset': 0}
+                        for name, typecode, dtype in STORE_COLUMNS]}
+
+    # the header holds the absolute column offsets, which depend on the
+    # header size, so grow the reserved size until the header fits in it
+    header_size = 0
+    while True:
+        data_start = len(MAGIC) + 4 + header_size
+        data_start += _padding(data_start)
+        for column, offset in zip(meta['columns'], _relative_offsets(n_rows)):
+            column['offset'] = data_start + offset
+        header = json.dumps(meta).encode('utf-8')
+        if len(header) <= header_size:
+            break
+        header_size = len(header)
+    header = header.ljust(header_size)
+
+    with open(out_file, 'wb') as f_out:
+        f_out.write(MAGIC)
+        f_out.write(struct.pack('<I', len(header)))
+        f_out.write(header)
+        for column, (name, typecode, dtype) in zip(meta['columns'], STORE_COLUMNS):
+            f_out.write(b'\0' * (column['offset'] - f_out.tell()))
+            values = columns[name]
+            if sys.byteorder != 'little':
+                values = array(typecode, values)
+                values.byteswap()
+            values.tofile(f_out)
+
+
+def read_store_meta(filename):
+    """
+    Reads and returns the metadata header of a trip store.
+    """
+    with open(filename, 'rb') as f_in:
+        if f_in.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a trip store'.format(filename))
+        header_size, = struct.unpack('<I', f_in.read(4))
+        meta = json.loads(f_in.read(header_size).decode('utf-8'))
+    if meta['version'] not in READABLE_VERSIONS:
+        raise ValueError('unsupported trip store version {}'.format(meta['version']))
+    return meta
+
+
+def read_trip_store(filename):
+    """
+    Reads a trip store into memory. Returns the metadata header and a
+    dictionary mapping each column name to an array.
+    """
+    meta = read_store_meta(filename)
+    typecodes = {name: typecode for name, typecode, dtype in STORE_COLUMNS}
+    columns = {}
+    with open(filename, 'rb') as f_in:
+        for column in meta['columns']:
+            values = array(typecodes[column['name']])
+            f_in.seek(column['offset'])
+            values.fromfile(f_in, meta['rows'])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            columns[column['name']] = values
+    return meta, columns
+
+
+class TripStore(object):
+    """
+    Read-only memory mapped view of a trip store. Each column is exposed as
+    a NumPy array that points straight into the mapped file, so nothing is
+    copied or read until it is used and the operating system can drop the
+    pages again under memory pressure. On a platform without mmap the
+    columns are read into memory with read_trip_store instead. Use it as a
+    context manager:
+
+        with TripStore('./data/NYC-2016.trips') as store:
+            for chunk in store.iter_chunks():
+                ...
+    """
+    def __init__(self, filename):
+        import numpy as np
+
+        self.filename = filename
+        self.meta = read_store_meta(filename)
+        self.rows = self.meta['rows']
+        self.columns = {}
+        self._file = self._mmap = None
+        if mmap is None:
+            for name, values in read_trip_store(filename)[1].items():
+                self.columns[name] = np.frombuffer(values, dtype=values.typecode)
+                self.columns[name].flags.writeable = False
+            return
+
+        self._file = open(filename, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mmap, 'madvise'):
+            # the analyses scan the columns front to back
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+        for column in self.meta['columns']:
+            dtype = np.dtype(column['dtype']).newbyteorder('<')
+            self.columns[column['name']] = np.frombuffer(
+                self._mmap, dtype=dtype, count=self.rows, offset=column['offset'])
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.columns = {}
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:
+            # a caller still holds a view of a column; the mapping is
+            # released when that view is garbage collected
+            pass
+        self._file.close()
+
+    def user_type_code(self, user_type):
+        """
+        Returns the code user_type is stored as, or None if the store does
+        not contain any trip of that user type.
+        """
+        user_types = self.meta['user_types']
+        return user_types.index(user_type) if user_type in user_types else None
+
+    def iter_chunks(self, chunk_rows=1 << 20):
+        """
+        Yields dictionaries of column views covering chunk_rows trips at a
+        time, so that temporary arrays computed from them stay small.
+        """
+        for start in range(0, self.rows, chunk_rows):
+            yield {name: values[start:start + chunk_rows]
+                   for name, values in self.columns.items()}
+
+
+def iter_trips(filename, chunk_rows=1 << 16):
+    """
+    Yields the trips of a store as (duration, month, hour, day_of_week,
+    user_type) tuples, with the day and user type decoded back to the
+    strings used in the Summary files. The store is memory mapped and
+    decoded chunk_rows trips at a time, so memory use does not grow with
+    the size of the store.
+    """
+    with TripStore(filename) as store:
+        day_names = store.meta['day_names']
+        user_types = store.meta['user_types']
+        for chunk in store.iter_chunks(chunk_rows):
+            yield from zip(chunk['duration'].tolist(), chunk['month'].tolist(),
+                           chunk['hour'].tolist(),
+                           map(day_names.__getitem__, chunk['day_of_week'].tolist()),
+                           map(user_types.__getitem__, chunk['user_type'].tolist()))
+
+
+def store_columns():
+    """
+    Empty columns for write_trip_store, one array per name in
+    STORE_COLUMNS.
+    """
+    return {name: array(typecode) for name, typecode, dtype in STORE_COLUMNS}
+
+
+def store_row_appender(columns, user_types):
+    """
+    Returns a function that appends one condensed trip (the tuple returned
+    by compile_transformer) and the day of the month it started on to
+    columns. User types are stored as their position in the list
+    user_types, to which new ones are added; several sets of columns may
+    share the list, as the partitions of a dataset do.
+    """
+    user_codes = {user_type: code for code, user_type in enumerate(user_types)}
+    weekdays = {day: code for code, day in enumerate(DAY_NAMES)}
+    append_duration = columns['duration'].append
+    append_month = columns['month'].append
+    append_hour = columns['hour'].append
+    append_weekday = columns['day_of_week'].append
+    append_user = columns['user_type'].append
+    append_day = columns['day'].append
+
+    def append(trip, day):
+        duration, month, hour, day_of_week, user_type = trip
+        code = user_codes.get(user_type)
+        if code is None:
+            if user_type not in user_types:
+                user_types.append(user_type)
+            code = user_codes[user_type] = user_types.index(user_type)
+        append_duration(duration)
+        append_month(month)
+        append_hour(hour)
+        append_weekday(weekdays[day_of_week])
+        append_user(code)
+        append_day(day)
+    return append
+
+
+def iter_dated_trips(in_file, city):
+    """
+    Yields the trips condense_data writes for the raw trip file of city,
+    each as the tuple returned by compile_transformer together with the
+    (year, month, day) it started on.
+    """
+    adapter = get_adapter(city)
+    parse_date = start_date_parser(adapter.time_format)
+
+    with open_input(in_file) as f_in:
+        trip_reader = csv.reader(f_in)
+        header = next(trip_reader)
+        transform = compile_transformer(city, header)
+        start_index = header.index(adapter.start_column)
+        skip_first_trip(trip_reader)
+        for row in trip_reader:
+            yield transform(row), parse_date(row[start_index])
+
+
+def condense_to_store(in_file, out_file, city):
+    """
+    Condenses the raw trip file for city into a trip store, with the same
+    rows condense_data writes to a Summary csv file. Durations are stored
+    as float32, which keeps about seven significant digits.
+    """
+    columns = store_columns()
+    user_types = list(USER_TYPES)
+    append = store_row_appender(columns, user_types)
+    for trip, (year, month, day) in iter_dated_trips(in_file, city):
+        append(trip, day)
+
+    write_trip_store(out_file, city, columns, user_types)
@@ -0,0 +1,150 @@
+"""
+Fast parser for the trip start times.
+
+All three cities write their start times as 'month/day/year hour:minute',
+with NYC adding ':second'. Rather than calling datetime.strptime for every
+trip, the fields are split out of the string directly and checked, and
+the month and weekday are looked up once per calendar day since a year
+of trips only covers a few hundred distinct dates. Values that do not
+split cleanly, and start times in any other layout, are parsed with
+strptime (see start_time_parser).
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+             'Saturday', 'Sunday')
+
+# the strptime layouts parse_start_time reads
+FAST_TIME_FORMATS = ('%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S')
+
+# fewest and most digits strptime takes for the month, day and year
+DATE_DIGITS = ((1, 2), (1, 2), (4, 4))
+
+# the clock part of each layout as strptime reads it, the hour captured
+CLOCK_PATTERNS = {
+    '%m/%d/%Y %H:%M': re.compile(r'(2[0-3]|[01]?\d):[0-5]?\d', re.ASCII),
+    '%m/%d/%Y %H:%M:%S': re.compile(r'(2[0-3]|[01]?\d):[0-5]?\d:[0-5]?\d', re.ASCII),
+}
+assert set(CLOCK_PATTERNS) == set(FAST_TIME_FORMATS)
+
+
+def _is_number(field, fewest, most):
+    return fewest <= len(field) <= most and field.isascii() and field.isdigit()
+
+
+def _date_fields(day_string):
+    """
+    Splits the date part of a start time into month, day and year, or
+    raises ValueError unless it is laid out exactly as '%m/%d/%Y'.
+    """
+    fields = day_string.split('/')
+    if len(fields) != 3 or not all(_is_number(field, fewest, most)
+                                   for field, (fewest, most) in zip(fields, DATE_DIGITS)):
+        raise ValueError('malformed date {!r}'.format(day_string))
+    month, day, year = map(int, fields)
+    # raises ValueError for an impossible date
+    date(year, month, day)
+    return month, day, year
+
+
+@lru_cache(maxsize=4096)
+def calendar_day(day_string):
+    """
+    Takes the date part of a start time ('3/31/2016') and returns the month
+    and the full weekday name of that date.
+    """
+    month, day, year = _date_fields(day_string)
+    weekday = date(year, month, day).weekday()
+    return (month, DAY_NAMES[weekday])
+
+
+@lru_cache(maxsize=4096)
+def calendar_date(day_string):
+    """
+    Takes the date part of a start time ('3/31/2016') and returns its year,
+    month and day of the month.
+    """
+    month, day, year = _date_fields(day_string)
+    return (year, month, day)
+
+
+def _strptime_start_time(time_format):
+    def parse(start_time):
+        t = datetime.strptime(start_time, time_format)
+        return (t.month, t.hour, DAY_NAMES[t.weekday()])
+    return parse
+
+
+def _strptime_start_date(time_format):
+    def parse(start_time):
+        t = datetime.strptime(start_time, time_format)
+        return (t.year, t.month, t.day)
+    return parse
+
+
+def parse_start_time(start_time, time_format):
+    """
+    Takes a start time in the layout time_format, one of FAST_TIME_FORMATS
+    ('%m/%d/%Y %H:%M' or '%m/%d/%Y %H:%M:%S'), and returns the month, hour,
+    and day of the week, the same tuple that time_of_trip builds with
+    strptime and strftime('%A').
+
+    Values whose fields do not split cleanly (a clock with the wrong
+    number of fields, a minute of 99, letters, a run of spaces) are handed
+    to strptime, so a malformed value raises ValueError exactly when
+    strptime would.
+    """
+    return start_time_parser(time_format)(start_time)
+
+
+@lru_cache(maxsize=None)
+def start_time_parser(time_format):
+    """
+    Returns a function that takes a start time in the strptime layout
+    time_format and returns the month, hour, and day of the week: the
+    parser of parse_start_time for the layouts of the three cities, and a
+    strptime call for any other layout.
+    """
+    slow_parse = _strptime_start_time(time_format)
+    if time_format not in FAST_TIME_FORMATS:
+        return slow_parse
+    match_clock = CLOCK_PATTERNS[time_format].fullmatch
+
+    def parse(start_time):
+        day_string, _, clock = start_time.partition(' ')
+        match = match_clock(clock)
+        if match is None:
+            return slow_parse(start_time)
+        try:
+            month, day_of_week = calendar_day(day_string)
+        except ValueError:
+            return slow_parse(start_time)
+        return (month, int(match[1]), day_of_week)
+    return parse
+
+
+@lru_cache(maxsize=None)
+def start_date_parser(time_format):
+    """
+    Returns a function that takes a start time in the strptime layout
+    time_format and returns the year, month and day of the month it falls
+    on.
+    """
+    slow_parse = _strptime_start_date(time_format)
+    if time_format not in FAST_TIME_FORMATS:
+        return slow_parse
+    match_clock = CLOCK_PATTERNS[time_format].fullmatch
+
+    def parse(start_time):
+        day_string, _, clock = start_time.partition(' ')
+        if match_clock(clock) is None:
+            return slow_parse(start_time)
+        try:
+            return calendar_date(day_string)
+        except ValueError:
+            return slow_parse(start_time)
+    return parse
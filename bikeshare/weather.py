@@ -0,0 +1,144 @@
+"""
+Hourly weather joined to the trips by start hour.
+
+An hourly weather file of a city is a csv file with one row per hour, a
+timestamp column and one column per measurement, for example
+
+    time,temperature,precipitation
+    2016-01-01 00:00,-2.1,0.0
+    2016-01-01 01:00,-2.4,0.3
+
+It is loaded into one array per measurement indexed by the hour of the
+year, so the join is a single array lookup for a whole chunk of trips,
+from their month, day and hour columns. Hours missing from the file are
+NaN. The measurements are also cut into bands (dry, light, moderate or
+heavy precipitation, temperature ranges) that can be grouped on with
+bikeshare.query:
+
+    weather = load_hourly_weather('./data/NYC-2016-Weather.csv')
+    query(store_file, by=['precipitation_band', 'user_type'], weather=weather)
+
+The day of the month is needed for the join, so the trips have to come
+from a trip store (version 2 or later) rather than a Summary csv file.
+"""
+
+import csv
+import math
+from datetime import date, datetime
+
+import numpy as np
+
+
+# (upper edge, label) bands of each measurement; a value falls in the first
+# band whose upper edge it does not exceed. Precipitation is in mm per
+# hour, temperature in degrees Celsius.
+PRECIPITATION_BANDS = [(0.0, 'dry'), (2.5, 'light'), (7.6, 'moderate'), (math.inf, 'heavy')]
+TEMPERATURE_BANDS = [(0.0, '0 and below'), (10.0, '0-10'), (20.0, '10-20'),
+                     (30.0, '20-30'), (math.inf, 'above 30')]
+
+# label of the band of trips without a weather value
+UNKNOWN_BAND = 'unknown'
+
+
+def _parse_time(value, time_format):
+    if time_format is None:
+        return datetime.fromisoformat(value.strip())
+    return datetime.strptime(value.strip(), time_format)
+
+
+class HourlyWeather(object):
+    """
+    Hourly measurements of one year, one array per measurement indexed by
+    the hour of the year. bands maps a measurement name to its (upper
+    edge, label) bands.
+    """
+    def __init__(self, year, values, bands=None):
+        self.year = year
+        self.values = values
+        if bands is None:
+            bands = {'precipitation': PRECIPITATION_BANDS, 'temperature': TEMPERATURE_BANDS}
+        self.bands = {name: band for name, band in bands.items() if name in values}
+
+        # hours elapsed before the first day of each month (index 1-12)
+        self.month_start = np.zeros(14, dtype=np.intp)
+        for month in range(1, 13):
+            self.month_start[month] = (date(year, month, 1) - date(year, 1, 1)).days * 24
+
+    def band_labels(self):
+        """
+        Labels of the codes of each band column, unknown last.
+        """
+        return {name + '_band': [label for _, label in band] + [UNKNOWN_BAND]
+                for name, band in self.bands.items()}
+
+    def hour_index(self, month, day, hour):
+        return self.month_start[month] + (day.astype(np.intp) - 1) * 24 + hour
+
+    def lookup(self, month, day, hour):
+        """
+        The measurements at the given start hours (arrays of month, day of
+        the month and hour), as a dictionary of arrays.
+        """
+        index = self.hour_index(month, day, hour)
+        return {name: values[index] for name, values in self.values.items()}
+
+    def join(self, chunks):
+        """
+        Adds the measurements and their band codes to every chunk of an
+        iter_column_chunks stream.
+        """
+        for columns, user_types in chunks:
+            if 'day' not in columns:
+                raise ValueError('the weather join needs the day column of a trip store')
+            columns = dict(columns)
+            measurements = self.lookup(columns['month'], columns['day'], columns['hour'])
+            columns.update(measurements)
+            for name, band in self.bands.items():
+                values = measurements[name]
+                edges = np.array([edge for edge, _ in band[:-1]])
+                codes = np.searchsorted(edges, values, side='left')
+                codes[np.isnan(values)] = len(band)
+                columns[name + '_band'] = codes.astype(np.uint8)
+            yield columns, user_types
+
+
+def load_hourly_weather(filename, time_column='time', columns=('temperature', 'precipitation'),
+                        time_format=None, bands=None):
+    """
+    Reads an hourly weather csv file into an HourlyWeather. time_format is
+    the strptime layout of time_column, ISO 8601 by default. Empty values
+    and hours without a row are NaN. All rows must be of the same year.
+    """
+    rows = []
+    with open(filename, 'r', newline='') as f_in:
+        for row in csv.DictReader(f_in):
+            rows.append((_parse_time(row[time_column], time_format), row))
+    if not rows:
+        raise ValueError('{} has no weather rows'.format(filename))
+
+    year = rows[0][0].year
+    n_hours = (date(year + 1, 1, 1) - date(year, 1, 1)).days * 24
+    values = {name: np.full(n_hours, np.nan) for name in columns}
+    for timestamp, row in rows:
+        if timestamp.year != year:
+            raise ValueError('{} covers more than one year ({} and {})'.format(
+                filename, year, timestamp.year))
+        hour = (timestamp.timetuple().tm_yday - 1) * 24 + timestamp.hour
+        for name in columns:
+            if row[name] != '':
+                values[name][hour] = float(row[name])
+    return HourlyWeather(year, values, bands)
+
+
+def ridership_by_weather(filename, weather, measurement='precipitation', by=('user_type',),
+                         chunk_rows=1 << 20):
+    """
+    Number of trips, share and average duration for each band of a weather
+    measurement and each group of the columns in by, from one pass over a
+    trip store. Returns the rows of bikeshare.query.query.
+    """
+    from bikeshare.query import query
+
+    return query(filename, by=[measurement + '_band'] + list(by),
+                 aggregates=['count', 'share', 'mean'], chunk_rows=chunk_rows,
+                 weather=weather)
@@ -0,0 +1,144 @@
+"""
+Functions that clean the raw city trip files (Question 3 of the notebook)
+and condense them into the Summary format used by the analysis.
+"""
+
+import csv
+
+from bikeshare.adapters import compile_transformer, get_adapter
+from bikeshare.csvio import write_transformed
+from bikeshare.inputs import open_input, skip_first_trip
+from bikeshare.timeparse import start_time_parser
+
+
+# columns of the condensed Summary files
+out_colnames = ['duration', 'month', 'hour', 'day_of_week', 'user_type']
+
+
+def duration_in_mins(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the trip duration in units of minutes.
+
+    Remember that Washington is in terms of milliseconds while Chicago and NYC
+    are in terms of seconds; the column and unit of each city are declared
+    by its adapter (see bikeshare.adapters).
+    """
+    adapter = get_adapter(city)
+    duration = int(datum[adapter.duration_column])
+    if adapter.duration_unit != 1:
+        duration = duration/adapter.duration_unit
+
+    return duration/60
+
+
+def time_of_trip(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the month, hour, and day of the week in
+    which the trip was made.
+
+    Remember that NYC includes seconds, while Washington and Chicago do not.
+    The timestamps are parsed in the layout declared by the city's adapter
+    (see bikeshare.timeparse.start_time_parser).
+    """
+    adapter = get_adapter(city)
+    return start_time_parser(adapter.time_format)(datum[adapter.start_column])
+
+
+def type_of_user(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the type of system user that made the
+    trip.
+
+    Remember that Washington has different category names compared to Chicago
+    and NYC.
+    """
+    adapter = get_adapter(city)
+    user_type = datum[adapter.user_type_column]
+    if adapter.user_types is not None:
+        user_type = adapter.user_types.get(user_type, adapter.default_user_type)
+
+    return user_type
+
+
+def condense_data(in_file, out_file, city, mode='rows', out_format='csv', stations_file=None):
+    """
+    This function takes full data from the specified input file
+    and writes the condensed data to a specified output file. The city
+    argument determines how the input file will be parsed. The input file
+    may be compressed (see bikeshare.inputs).
+
+    mode selects how the rows are processed: 'rows' runs the helper
+    functions above on one trip at a time, 'vectorized' processes the file
+    in column chunks with pandas (see bikeshare.columnar) and 'parallel'
+    splits the file into shards condensed in a process pool (see
+    bikeshare.parallel). All of them write the same output.
+    'incremental' only condenses the rows added to in_file since the last
+    run and appends them (see bikeshare.incremental). 'pipeline' overlaps
+    reading, condensing and writing in a staged asyncio pipeline and
+    returns its throughput report (see bikeshare.pipeline). 'sample'
+    writes a 2% Bernoulli sample stratified by user type and month (see
+    bikeshare.sampling.condense_sample for the other sampling options).
+
+    out_format='store' writes a binary trip store (see bikeshare.store)
+    instead of a Summary csv file, and out_format='partitioned' a directory
+    of trip stores, one per month (see bikeshare.partition), at out_file;
+    both are only available in 'rows' mode.
+
+    If stations_file is given, the station and route index of the trips
+    (see bikeshare.stations) is built in the same pass and written there
+    as JSON; this is also only available in 'rows' mode.
+    """
+    if stations_file is not None and (mode != 'rows' or out_format != 'csv'):
+        raise ValueError("stations_file is only supported in 'rows' mode with csv output")
+    if out_format == 'store':
+        if mode != 'rows':
+            raise ValueError("out_format='store' is only supported in 'rows' mode")
+        from bikeshare.store import condense_to_store
+        return condense_to_store(in_file, out_file, city)
+    if out_format == 'partitioned':
+        if mode != 'rows':
+            raise ValueError("out_format='partitioned' is only supported in 'rows' mode")
+        from bikeshare.partition import condense_partitioned
+        return condense_partitioned(in_file, out_file, city)
+    if out_format != 'csv':
+        raise ValueError('unknown output format {!r}'.format(out_format))
+    if mode == 'vectorized':
+        from bikeshare.columnar import condense_data_vectorized
+        return condense_data_vectorized(in_file, out_file, city)
+    if mode == 'parallel':
+        from bikeshare.parallel import condense_data_parallel
+        return condense_data_parallel(in_file, out_file, city)
+    if mode == 'incremental':
+        from bikeshare.incremental import condense_incremental
+        return condense_incremental(in_file, out_file, city)
+    if mode == 'pipeline':
+        from bikeshare.pipeline import condense_pipeline
+        return condense_pipeline(in_file, out_file, city)
+    if mode == 'sample':
+        from bikeshare.sampling import condense_sample
+        return condense_sample(in_file, out_file, city)
+    if mode != 'rows':
+        raise ValueError('unknown condense mode {!r}'.format(mode))
+
+    with open(out_file, 'w') as f_out, open_input(in_file) as f_in:
+        csv.writer(f_out).writerow(out_colnames)
+
+        trip_reader = csv.reader(f_in)
+        # resolve the column positions once from the header
+        header = next(trip_reader)
+        transform = compile_transformer(city, header)
+
+        skip_first_trip(trip_reader)
+        rows = trip_reader
+        if stations_file is not None:
+            from bikeshare.stations import StationIndex
+            stations = StationIndex(city)
+            rows = stations.observe(trip_reader, header)
+        # condense every remaining row
+        write_transformed(f_out, rows, transform)
+
+    if stations_file is not None:
+        stations.save(stations_file)
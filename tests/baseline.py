@@ -0,0 +1,279 @@
+"""
+The wrangling and analysis functions as the notebook first wrote them
+(Bike_Share_Analysis.py before the bikeshare package existed), kept
+unchanged as the reference the package is tested against.
+"""
+
+import csv # read and write csv files
+from datetime import datetime # operations to parse dates
+
+def duration_in_mins(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the trip duration in units of minutes.
+    
+    Remember that Washington is in terms of milliseconds while Chicago and NYC
+    are in terms of seconds. 
+    
+    HINT: The csv module reads in all of the data as strings, including numeric
+    values. You will need a function to convert the strings into an appropriate
+    numeric type when making your transformations.
+    see https://docs.python.org/3/library/functions.html
+    """
+    # YOUR CODE HERE
+    
+    if (city == 'NYC') or (city == 'Chicago'):
+        duration = int(datum['tripduration']) #We want time in terms of seconds for 'NYC' and 'Chicago'
+    else: 
+        duration = int(datum['Duration (ms)'])/1000 #We want time in terms of milliseconds for 'Washington' and 1 ms = 1/1000 
+    
+    return duration/60
+
+def time_of_trip(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the month, hour, and day of the week in
+    which the trip was made.
+    
+    Remember that NYC includes seconds, while Washington and Chicago do not.
+    
+    HINT: You should use the datetime module to parse the original date
+    strings into a format that is useful for extracting the desired information.
+    see https://docs.python.org/3/library/datetime.html#strftime-and-strptime-behavior
+    """
+    from datetime import datetime
+    
+    # YOUR CODE HERE
+    if city == 'NYC':
+        start_time = datum['starttime'] #Getting starttime from NewYork Data
+        
+        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string 
+        
+        t1 = datetime.strptime(start_time, '%m/%d/%Y %H:%M:%S') #Newyork includes seconds, So we used %S.
+        
+        #We are converting a local time to the String format we need by using strftime module
+        
+        day_of_week = t1.strftime('%A') #For getting full weekday name in solution
+        
+        return (t1.month, t1.hour, day_of_week)
+    elif city == 'Chicago':
+        start_time = datum['starttime']
+        
+        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string
+        
+        t2 = datetime.strptime(start_time, '%m/%d/%Y %H:%M') #Here we are not including seconds  
+        
+        #We are converting a local time to the String format we need by using strftime module
+        day_of_week = t2.strftime('%A')
+        
+        return (t2.month, t2.hour, day_of_week)
+    else:
+        starttime = datum['Start date']
+        
+        # we are calling one of the method 'strptime' for creating datetime object and creating formatted string
+        t3 = datetime.strptime(starttime, '%m/%d/%Y %H:%M')
+        
+        #We are converting a local time to the String format we need by using strftime module
+        
+        day_of_week = t3.strftime('%A')
+        return (t3.month, t3.hour, day_of_week)
+
+def type_of_user(datum, city):
+    """
+    Takes as input a dictionary containing info about a single trip (datum) and
+    its origin city (city) and returns the type of system user that made the
+    trip.
+    
+    Remember that Washington has different category names compared to Chicago
+    and NYC. 
+    """
+    
+    # YOUR CODE HERE
+    
+    if city == 'NYC' :
+        
+        user_type = datum['usertype']
+        
+    elif city == 'Chicago':
+        
+        user_type = datum['usertype']
+        
+    elif city == 'Washington':
+        
+        if datum['Member Type'] == 'Registered':
+            
+            user_type = 'Subscriber'
+            
+        else:
+            
+            user_type = 'Customer'
+    
+    return user_type
+
+def condense_data(in_file, out_file, city):
+    """
+    This function takes full data from the specified input file
+    and writes the condensed data to a specified output file. The city
+    argument determines how the input file will be parsed.
+    
+    HINT: See the cell below to see how the arguments are structured!
+    """
+    
+    with open(out_file, 'w') as f_out, open(in_file, 'r') as f_in:
+        # set up csv DictWriter object - writer requires column names for the
+        # first row as the "fieldnames" argument
+        out_colnames = ['duration', 'month', 'hour', 'day_of_week', 'user_type']        
+        trip_writer = csv.DictWriter(f_out, fieldnames = out_colnames)
+        trip_writer.writeheader()
+        
+        ## TODO: set up csv DictReader object ##
+        trip_reader = csv.DictReader(f_in)
+
+        first_trip = next(trip_reader)
+        # collect data from and process each row
+        for row in trip_reader:
+            # set up a dictionary to hold the values for the cleaned and trimmed
+            # data point
+            new_point = {}
+
+            ## TODO: use the helper functions to get the cleaned data from  ##
+            ## the original data dictionaries.                              ##
+            ## Note that the keys for the new_point dictionary should match ##
+            ## the column names set in the DictWriter object above.         ##
+            month, hour, day_of_week = time_of_trip(row, city)
+            new_point[out_colnames[0]] = duration_in_mins(row, city)
+            new_point[out_colnames[1]] = month
+            new_point[out_colnames[2]] = hour
+            new_point[out_colnames[3]] = day_of_week
+            new_point[out_colnames[4]] = type_of_user(row, city)
+            
+
+            ## TODO: write the processed information to the output file.     ##
+            ## see https://docs.python.org/3/library/csv.html#writer-objects ##
+            trip_writer.writerow(new_point)
+            
+
+def number_of_trips(filename):
+    """
+    This function reads in a file with trip data and reports the number of
+    trips made by subscribers, customers, and total overall.
+    """
+    with open(filename, 'r') as f_in:
+        # set up csv reader object
+        reader = csv.DictReader(f_in)
+        
+        # initialize count variables
+        n_subscribers = 0
+        n_customers = 0
+        
+        # tally up ride types
+        for row in reader:
+            if row['user_type'] == 'Subscriber':
+                n_subscribers += 1 #Counting the no of trips made by Subscribers and Customers.
+            else:
+                n_customers += 1
+        
+        # compute total number of rides
+        n_total = n_subscribers + n_customers
+        
+        #Calculating proportion of the Subscribers and Customers using formula proportion = (count/total)*100
+        
+        sub_proportion = (n_subscribers/n_total)*100  #Here we used (count of ridership of subscribers/total)*100
+        
+        cus_proportion = (n_customers/n_total)*100 #Here we used (count of ridership of customers/total)*100
+        # return tallies as a tuple
+        return(n_subscribers, n_customers, n_total, sub_proportion, cus_proportion )
+
+def len_of_trip(filename):
+    
+    with open(filename, 'r') as f_in:
+        
+        reader = csv.DictReader(f_in)
+        
+        s = 0 #Users taking time less than 30 min
+        t = 0 #Users taking time more than 30 min
+        total = 0 #Total duration
+        for row in reader:
+            s+=1
+            duration=float(row['duration'])
+            total=total + duration
+            if duration > 30:
+                t += 1
+        avg_length = (total/s) # calculating average trip length
+        
+        #Calculating proportion of total users taking time more than 30 minutes to the users taking time less than 30 minutes
+        prop = (t/s)*100 
+        
+        return (s, t, avg_length, prop, total)
+
+def Duration_RiderShip(filename):
+    
+    with open(filename, 'r') as f_in:
+        
+        reader = csv.DictReader(f_in)
+        
+        #Here we are counting the subscribers and customers and finding there total duration of each city
+        sub = 0
+        cus = 0
+        sub_total = 0
+        cus_total = 0
+        for row in reader:
+            user_type = row['user_type']
+            duration=float(row['duration'])
+            if user_type == 'Subscriber':
+                
+                sub += 1
+                
+                sub_total += duration
+            elif user_type == 'Customer':
+                
+                cus += 1
+                
+                cus_total += duration
+        average_sub = sub_total / sub
+        average_cus = cus_total / cus
+        
+        return (sub, cus, average_sub, average_cus)
+
+def rider_ship(filename,city): #making a function to calculate ridership
+    #Subscriber count for weekdays and duration of subscribers for weekends and weekdays
+    dur_wkend_Sub=0
+    sub_wkend_count=0
+    dur_wkday_Sub=0
+    sub_wkday_count=0
+    
+    #Customer count for weekdays and duration of subscribers for weekends and weekdays
+    dur_wkend_Cus=0
+    Cus_wkend_count=0
+    dur_wkday_Cus=0
+    Cus_wkday_count=0
+    
+    
+    with open(filename, 'r') as f_in:
+        tripreader = csv.DictReader(f_in)
+        
+        for row in tripreader:
+            day = time_of_trip(row,city)[2] # For Getting day
+            user = type_of_user(row,city) # For Getting user_type
+            dur = duration_in_mins(row, city) # For Getting Duration
+            if user == 'Subscriber':
+                if (day =='Saturday') or (day == 'Sunday'):
+                    dur_wkend_Sub += dur
+                    sub_wkend_count += 1
+                else:
+                    dur_wkday_Sub += dur
+                    sub_wkday_count += 1
+            else:
+                if (day =='Saturday') or (day == 'Sunday'):
+                    dur_wkend_Cus += dur
+                    Cus_wkend_count += 1
+                else:
+                    dur_wkday_Cus += dur
+                    Cus_wkday_count += 1
+        
+        avg_wkend_sub = dur_wkend_Sub/sub_wkend_count #Average weekend duration of Subscribers
+        avg_wkday_sub = dur_wkday_Sub/sub_wkday_count #Average weekday duration of Subscribers
+        avg_wkend_Cus = dur_wkend_Cus/Cus_wkend_count #Average weekend duration of Customers
+        avg_wkday_Cus = dur_wkday_Cus/Cus_wkday_count #Average weekday duration of Customers
+        
+        return avg_wkend_Cus, avg_wkend_sub, avg_wkday_Cus, avg_wkday_sub
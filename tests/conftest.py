@@ -0,0 +1,179 @@
+"""
+Shared fixtures: a few raw trips of each city, written the way the real
+files are, and their Summary files as condensed by the baseline
+condense_data (tests/baseline.py).
+
+The trips cover the cases the condensed output is sensitive to: start
+dates with and without zero padding, NYC's seconds, a blank NYC usertype,
+Chicago's Dependent riders, Washington's Registered and Casual members,
+station names with a comma (quoted in the csv file) and weekend and
+weekday trips of both user types, which rider_ship needs. The first trip
+of each file is the one condense_data leaves out.
+"""
+
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import baseline
+
+
+CITIES = ['NYC', 'Chicago', 'Washington']
+
+RAW_HEADERS = {
+    'NYC': ['tripduration', 'starttime', 'stoptime', 'start station id',
+            'start station name', 'start station latitude', 'start station longitude',
+            'end station id', 'end station name', 'end station latitude',
+            'end station longitude', 'bikeid', 'usertype', 'birth year', 'gender'],
+    'Chicago': ['trip_id', 'starttime', 'stoptime', 'bikeid', 'tripduration',
+                'from_station_id', 'from_station_name', 'to_station_id',
+                'to_station_name', 'usertype', 'gender', 'birthyear'],
+    'Washington': ['Duration (ms)', 'Start date', 'End date', 'Start station number',
+                   'Start station', 'End station number', 'End station',
+                   'Bike number', 'Member Type'],
+}
+
+RAW_TRIPS = {
+    'NYC': [
+        ['839', '1/1/2016 00:09:55', '1/1/2016 00:23:54', '532', 'S 5 Pl & S 4 St',
+         '40.710451', '-73.960876', '401', 'Allen St & Rivington St', '40.720196',
+         '-73.989978', '17109', 'Customer', '', '0'],
+        ['686', '01/02/2016 00:12:34', '01/02/2016 00:24:00', '3164',
+         'Broadway & W 60 St, North', '40.769', '-73.981', '520', 'W 52 St & 5 Ave',
+         '40.759', '-73.976', '24122', 'Subscriber', '1984', '1'],
+        ['2815', '01/03/2016 13:45:00', '01/03/2016 14:31:55', '520', 'W 52 St & 5 Ave',
+         '40.759', '-73.976', '3164', 'Broadway & W 60 St, North', '40.769', '-73.981',
+         '19123', 'Customer', '', '0'],
+        ['1920', '2/29/2016 23:59:59', '3/1/2016 00:31:59', '401', 'Allen St & Rivington St',
+         '40.720', '-73.989', '532', 'S 5 Pl & S 4 St', '40.710', '-73.960',
+         '17109', '', '', '0'],
+        ['412', '3/5/2016 08:00:01', '3/5/2016 08:06:53', '3164', 'Broadway & W 60 St, North',
+         '40.769', '-73.981', '3164', 'Broadway & W 60 St, North', '40.769', '-73.981',
+         '22341', 'Subscriber', '1975', '2'],
+        ['5321', '7/4/2016 17:30:00', '7/4/2016 18:58:41', '520', 'W 52 St & 5 Ave',
+         '40.759', '-73.976', '401', 'Allen St & Rivington St', '40.720', '-73.989',
+         '19123', 'Customer', '', '0'],
+        ['1204', '11/15/2016 07:45:30', '11/15/2016 08:05:34', '532', 'S 5 Pl & S 4 St',
+         '40.710', '-73.960', '520', 'W 52 St & 5 Ave', '40.759', '-73.976',
+         '24122', 'Subscriber', '1990', '1'],
+        ['95', '12/31/2016 23:05:10', '12/31/2016 23:06:45', '401', 'Allen St & Rivington St',
+         '40.720', '-73.989', '401', 'Allen St & Rivington St', '40.720', '-73.989',
+         '22341', 'Customer', '', '0'],
+        ['2000', '06/10/2016 09:00:00', '06/10/2016 09:33:20', '3164',
+         'Broadway & W 60 St, North', '40.769', '-73.981', '532', 'S 5 Pl & S 4 St',
+         '40.710', '-73.960', '17109', 'Subscriber', '1969', '2'],
+    ],
+    'Chicago': [
+        ['9080545', '3/31/2016 23:30', '3/31/2016 23:46', '2295', '926', '156',
+         'Clark St & Wellington Ave', '166', 'Ashland Ave & Wrightwood Ave',
+         'Subscriber', 'Male', '1990'],
+        ['9080551', '04/02/2016 08:05', '04/02/2016 08:40', '3102', '2118', '85',
+         'Michigan Ave & Oak St', '35', 'Streeter Dr & Grand Ave', 'Customer', '', ''],
+        ['9080552', '4/3/2016 14:00', '4/3/2016 14:09', '4380', '541', '35',
+         'Streeter Dr & Grand Ave', '85', 'Michigan Ave & Oak St', 'Subscriber',
+         'Female', '1981'],
+        ['9080560', '05/09/2016 17:45', '05/09/2016 18:01', '1422', '964', '156',
+         'Clark St & Wellington Ave', '85', 'Michigan Ave & Oak St', 'Dependent',
+         'Female', '2004'],
+        ['9080571', '6/14/2016 06:30', '6/14/2016 06:42', '2295', '733', '166',
+         'Ashland Ave & Wrightwood Ave', '156', 'Clark St & Wellington Ave',
+         'Subscriber', 'Male', '1978'],
+        ['9080577', '9/17/2016 12:10', '9/17/2016 13:25', '3102', '4507', '35',
+         'Streeter Dr & Grand Ave', '90', 'Millennium Park, Michigan Ave', 'Customer', '', ''],
+        ['9080580', '10/21/2016 19:00', '10/21/2016 19:27', '4380', '1631', '90',
+         'Millennium Park, Michigan Ave', '35', 'Streeter Dr & Grand Ave', 'Customer', '', ''],
+        ['9080590', '1/9/2016 00:00', '1/9/2016 00:14', '1422', '853', '85',
+         'Michigan Ave & Oak St', '166', 'Ashland Ave & Wrightwood Ave', 'Subscriber',
+         'Male', '1988'],
+    ],
+    'Washington': [
+        ['427387', '3/31/2016 22:57', '3/31/2016 23:04', '31602', 'Park Rd & Holmead Pl NW',
+         '31207', 'Georgia Ave and Fairmont St NW', 'W20842', 'Registered'],
+        ['1893651', '01/02/2016 11:02', '01/02/2016 11:33', '31258', 'Lincoln Memorial',
+         '31602', 'Park Rd & Holmead Pl NW', 'W01045', 'Casual'],
+        ['300123', '1/4/2016 08:15', '1/4/2016 08:20', '31124', '14th & V St NW, East',
+         '31258', 'Lincoln Memorial', 'W21733', 'Registered'],
+        ['2520000', '5/28/2016 15:20', '5/28/2016 16:02', '31207',
+         'Georgia Ave and Fairmont St NW', '31124', '14th & V St NW, East', 'W20842',
+         'Registered'],
+        ['612789', '8/8/2016 18:40', '8/8/2016 18:50', '31258', 'Lincoln Memorial',
+         '31258', 'Lincoln Memorial', 'W01045', 'Casual'],
+        ['1001', '11/26/2016 10:00', '11/26/2016 10:00', '31602', 'Park Rd & Holmead Pl NW',
+         '31602', 'Park Rd & Holmead Pl NW', 'W21733', 'Casual'],
+        ['905432', '12/7/2016 07:05', '12/7/2016 07:20', '31124', '14th & V St NW, East',
+         '31207', 'Georgia Ave and Fairmont St NW', 'W00771', 'Registered'],
+    ],
+}
+
+
+def write_raw_file(filename, city, trips):
+    with open(filename, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(RAW_HEADERS[city])
+        writer.writerows(trips)
+
+
+def read_bytes(filename):
+    with open(filename, 'rb') as f_in:
+        return f_in.read()
+
+
+@pytest.fixture(scope='session')
+def data_dir(tmp_path_factory):
+    """
+    The raw file and baseline Summary file of every city, and the raw file
+    without its first trip.
+    """
+    directory = tmp_path_factory.mktemp('data')
+    for city in CITIES:
+        raw_file = str(directory / '{}-raw.csv'.format(city))
+        write_raw_file(raw_file, city, RAW_TRIPS[city])
+        write_raw_file(str(directory / '{}-trimmed.csv'.format(city)), city, RAW_TRIPS[city][1:])
+        baseline.condense_data(raw_file, str(directory / '{}-Summary.csv'.format(city)), city)
+    return directory
+
+
+@pytest.fixture(params=CITIES)
+def city(request):
+    return request.param
+
+
+@pytest.fixture
+def raw_file(data_dir, city):
+    return str(data_dir / '{}-raw.csv'.format(city))
+
+
+@pytest.fixture
+def summary_file(data_dir, city):
+    return str(data_dir / '{}-Summary.csv'.format(city))
+
+
+@pytest.fixture
+def trimmed_raw_file(data_dir, city):
+    """
+    The raw file without its first trip, which holds the same trips as the
+    Summary file, for baseline functions that read raw files.
+    """
+    return str(data_dir / '{}-trimmed.csv'.format(city))
+
+
+def summary_durations(summary_file, user_type=None):
+    """
+    The durations of a Summary file, optionally of one user type only.
+    """
+    with open(summary_file, 'r') as f_in:
+        return [float(row['duration']) for row in csv.DictReader(f_in)
+                if user_type is None or row['user_type'] == user_type]
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    # a BIKESHARE_CACHE_DIR of the environment must not answer the tests
+    from bikeshare import cache
+
+    monkeypatch.setattr(cache, '_cache', None)
+    monkeypatch.setattr(cache, '_checked_environment', True)
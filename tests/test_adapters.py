@@ -0,0 +1,110 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+import baseline
+from conftest import RAW_HEADERS, RAW_TRIPS, read_bytes, write_raw_file
+from bikeshare import parallel
+from bikeshare.adapters import CITY_ADAPTERS, CityAdapter, compile_transformer, get_adapter
+from bikeshare.aggregate import iter_condensed
+from bikeshare.sampling import condense_sample
+from bikeshare.store import TripStore
+from bikeshare.wrangling import condense_data, duration_in_mins, time_of_trip, type_of_user
+
+
+def test_transformer_matches_helpers(raw_file, city):
+    with open(raw_file, 'r') as f_in:
+        header = next(csv.reader(f_in))
+    transform = compile_transformer(city, header)
+    with open(raw_file, 'r') as f_in:
+        rows = list(csv.reader(f_in))[1:]
+    with open(raw_file, 'r') as f_in:
+        data = list(csv.DictReader(f_in))
+
+    for row, datum in zip(rows, data):
+        month, hour, day_of_week = baseline.time_of_trip(datum, city)
+        assert transform(row) == (baseline.duration_in_mins(datum, city), month, hour,
+                                  day_of_week, baseline.type_of_user(datum, city))
+
+
+def test_unknown_city():
+    with pytest.raises(KeyError):
+        get_adapter('Boston')
+
+
+@pytest.fixture
+def iso_city(monkeypatch, tmp_path):
+    """
+    The NYC trips with ISO 8601 start times, under an adapter declaring
+    that layout. Returns the raw file.
+    """
+    nyc = get_adapter('NYC')
+    monkeypatch.setitem(CITY_ADAPTERS, 'NYC-ISO', CityAdapter(
+        'NYC-ISO', nyc.duration_column, nyc.duration_unit, nyc.start_column,
+        '%Y-%m-%d %H:%M:%S', nyc.user_type_column))
+    start_index = RAW_HEADERS['NYC'].index(nyc.start_column)
+    trips = []
+    for trip in RAW_TRIPS['NYC']:
+        trip = list(trip)
+        start = datetime.strptime(trip[start_index], '%m/%d/%Y %H:%M:%S')
+        trip[start_index] = start.strftime('%Y-%m-%d %H:%M:%S')
+        trips.append(trip)
+    raw_file = str(tmp_path / 'NYC-ISO-raw.csv')
+    write_raw_file(raw_file, 'NYC', trips)
+    return raw_file
+
+
+def test_helpers_use_the_declared_layout(iso_city, data_dir):
+    with open(iso_city, 'r') as f_in:
+        iso_data = list(csv.DictReader(f_in))
+    with open(str(data_dir / 'NYC-raw.csv'), 'r') as f_in:
+        data = list(csv.DictReader(f_in))
+
+    for iso_datum, datum in zip(iso_data, data):
+        assert time_of_trip(iso_datum, 'NYC-ISO') == baseline.time_of_trip(datum, 'NYC')
+        assert duration_in_mins(iso_datum, 'NYC-ISO') == baseline.duration_in_mins(datum, 'NYC')
+        assert type_of_user(iso_datum, 'NYC-ISO') == baseline.type_of_user(datum, 'NYC')
+
+
+@pytest.mark.parametrize('mode', ['rows', 'vectorized', 'parallel', 'pipeline', 'incremental'])
+def test_condense_modes_use_the_declared_layout(iso_city, data_dir, tmp_path, monkeypatch, mode):
+    # small enough that the file is split into several shards
+    monkeypatch.setattr(parallel, 'MIN_SHARD_BYTES', 200)
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_data(iso_city, out_file, 'NYC-ISO', mode=mode)
+
+    assert read_bytes(out_file) == read_bytes(str(data_dir / 'NYC-Summary.csv'))
+
+
+def test_sample_uses_the_declared_layout(iso_city, data_dir, tmp_path):
+    out_file = str(tmp_path / 'sample.csv')
+
+    info = condense_sample(iso_city, out_file, 'NYC-ISO', fraction=1.0)
+
+    assert read_bytes(out_file) == read_bytes(str(data_dir / 'NYC-Summary.csv'))
+    assert sum(stratum['population'] for stratum in info['strata']) == len(RAW_TRIPS['NYC']) - 1
+
+
+@pytest.mark.parametrize('out_format', ['store', 'partitioned'])
+def test_stores_use_the_declared_layout(iso_city, data_dir, tmp_path, out_format):
+    out_file = str(tmp_path / 'out')
+
+    condense_data(iso_city, out_file, 'NYC-ISO', out_format=out_format)
+
+    expected = list(iter_condensed(str(data_dir / 'NYC-Summary.csv')))
+    trips = list(iter_condensed(out_file))
+    assert sorted(trip[1:] for trip in trips) == sorted(trip[1:] for trip in expected)
+    assert sorted(trip[0] for trip in trips) == pytest.approx(
+        sorted(trip[0] for trip in expected), rel=1e-6)
+
+
+def test_store_day_column_uses_the_declared_layout(iso_city, tmp_path):
+    out_file = str(tmp_path / 'out.trips')
+
+    condense_data(iso_city, out_file, 'NYC-ISO', out_format='store')
+
+    with TripStore(out_file) as store:
+        days = store['day'].tolist()
+    assert days == [2, 3, 29, 5, 4, 15, 31, 10]
@@ -0,0 +1,73 @@
+import csv
+import math
+
+import pytest
+
+import baseline
+from bikeshare.aggregate import (Aggregate, TripLength, register_aggregate, run_aggregates,
+                                 summarize)
+from bikeshare.analysis import Duration_RiderShip, len_of_trip, number_of_trips
+from bikeshare.wrangling import out_colnames
+
+
+def test_single_pass_matches_baseline(summary_file):
+    results = run_aggregates(summary_file)
+
+    assert results['number_of_trips'] == baseline.number_of_trips(summary_file)
+    assert results['len_of_trip'] == baseline.len_of_trip(summary_file)
+    assert results['Duration_RiderShip'] == baseline.Duration_RiderShip(summary_file)
+
+
+def test_wrappers_match_baseline(summary_file):
+    assert number_of_trips(summary_file) == baseline.number_of_trips(summary_file)
+    assert len_of_trip(summary_file) == baseline.len_of_trip(summary_file)
+    assert Duration_RiderShip(summary_file) == baseline.Duration_RiderShip(summary_file)
+
+
+def test_summarize_reads_every_file(data_dir):
+    filenames = [str(data_dir / '{}-Summary.csv'.format(city))
+                 for city in ('NYC', 'Chicago', 'Washington')]
+    summaries = summarize(filenames, ['number_of_trips'])
+
+    assert list(summaries) == filenames
+    for filename in filenames:
+        assert summaries[filename] == {'number_of_trips': baseline.number_of_trips(filename)}
+
+
+def test_aggregate_instances_take_parameters(data_dir):
+    summary_file = str(data_dir / 'NYC-Summary.csv')
+    count, over, average, proportion, total = baseline.len_of_trip(summary_file)
+
+    result = run_aggregates(summary_file, [TripLength(threshold=60)])['len_of_trip']
+
+    assert result[0] == count
+    assert result[1] == 1
+    assert result[2] == average
+
+
+def test_unknown_and_duplicate_aggregates(data_dir):
+    with pytest.raises(KeyError):
+        run_aggregates(str(data_dir / 'NYC-Summary.csv'), ['no_such_aggregate'])
+    with pytest.raises(ValueError):
+        register_aggregate('number_of_trips')(type('Again', (Aggregate,), {}))
+
+
+def test_defaults_leave_out_rider_ship(tmp_path):
+    # no weekend trips at all
+    summary_file = str(tmp_path / 'weekdays.csv')
+    with open(summary_file, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(out_colnames)
+        writer.writerows([[12.5, 1, 8, 'Monday', 'Subscriber'],
+                          [40.0, 1, 9, 'Tuesday', 'Customer']])
+
+    results = summarize([summary_file])[summary_file]
+
+    assert 'rider_ship' not in results
+    assert results['number_of_trips'] == baseline.number_of_trips(summary_file)
+    assert results['len_of_trip'] == baseline.len_of_trip(summary_file)
+    assert results['Duration_RiderShip'] == baseline.Duration_RiderShip(summary_file)
+    weekend_customer, weekend_subscriber, weekday_customer, weekday_subscriber = \
+        run_aggregates(summary_file, ['rider_ship'])['rider_ship']
+    assert math.isnan(weekend_customer) and math.isnan(weekend_subscriber)
+    assert (weekday_customer, weekday_subscriber) == (40.0, 12.5)
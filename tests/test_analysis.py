@@ -0,0 +1,91 @@
+import csv
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import baseline
+from conftest import summary_durations
+from bikeshare.analysis import duration_histograms, rider_ship, segment_durations
+from bikeshare.wrangling import condense_data, out_colnames
+
+
+def test_raw_file_matches_baseline(raw_file, city):
+    assert rider_ship(raw_file, city) == baseline.rider_ship(raw_file, city)
+
+
+def test_condensed_file_matches_baseline(raw_file, summary_file, trimmed_raw_file, city,
+                                         tmp_path):
+    store_file = str(tmp_path / 'out.trips')
+    condense_data(raw_file, store_file, city, out_format='store')
+    # the condensed files leave out the first trip, like the trimmed raw file
+    expected = baseline.rider_ship(trimmed_raw_file, city)
+
+    assert rider_ship(summary_file, city) == pytest.approx(expected)
+    assert rider_ship(summary_file, None) == pytest.approx(expected)
+    assert rider_ship(store_file, city) == pytest.approx(expected, rel=1e-6)
+
+
+def test_segments_match_summary(summary_file):
+    with open(summary_file, 'r') as f_in:
+        trips = list(csv.DictReader(f_in))
+    segments = {'morning rush': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
+                'saturday': ['Saturday']}
+    expected = Counter()
+    for trip in trips:
+        for name, days in segments.items():
+            if trip['day_of_week'] in days:
+                expected[(name, trip['user_type'])] += 1
+
+    cells = segment_durations(summary_file, segments, chunk_rows=2)
+
+    assert {key: cell['count'] for key, cell in cells.items()} == expected
+    for cell in cells.values():
+        assert cell['mean'] == pytest.approx(cell['total'] / cell['count'])
+
+
+def test_holidays_need_a_day_column(data_dir, tmp_path):
+    summary_file = str(data_dir / 'NYC-Summary.csv')
+    store_file = str(tmp_path / 'out.trips')
+    condense_data(str(data_dir / 'NYC-raw.csv'), store_file, 'NYC', out_format='store')
+
+    # 7/4/2016 was a Monday, a Customer trip
+    cells = segment_durations(store_file, holidays=[(7, 4)])
+    assert cells[('holiday', 'Customer')]['count'] == 1
+    assert ('weekday', 'Customer') not in cells
+    with pytest.raises(ValueError):
+        segment_durations(summary_file, holidays=[(7, 4)])
+
+
+@pytest.mark.parametrize('bin_width', [4, 5])
+def test_histograms_with_the_notebook_bins(summary_file, bin_width):
+    bins = np.arange(0, 75, bin_width)
+
+    edges, histograms = duration_histograms(summary_file, bins=bins, chunk_rows=2)
+
+    assert edges.tolist() == bins.tolist()
+    assert histograms['all'].tolist() == \
+        np.histogram(summary_durations(summary_file), bins)[0].tolist()
+    for user_type in ('Subscriber', 'Customer'):
+        durations = [duration for duration in summary_durations(summary_file, user_type)
+                     if duration < 75]
+        expected = np.histogram(durations, bins)[0].tolist()
+        assert histograms.get(user_type, np.zeros(len(bins) - 1)).tolist() == expected
+
+
+def test_histogram_edges(tmp_path):
+    summary_file = str(tmp_path / 'summary.csv')
+    durations = [0, 3.5, 69.9, 70, 72, 74.9, 75, 80]
+    with open(summary_file, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(out_colnames)
+        writer.writerows([duration, 1, 0, 'Friday', 'Subscriber'] for duration in durations)
+
+    edges, histograms = duration_histograms(summary_file, bins=np.arange(0, 75, 5))
+    assert histograms['all'].tolist() == np.histogram(durations, edges)[0].tolist()
+    assert histograms['all'][-1] == 2
+
+    # without bins the last bin ends at the cutoff and leaves it out
+    edges, histograms = duration_histograms(summary_file, bin_width=5, cutoff=72)
+    assert edges.tolist() == list(range(0, 72, 5)) + [72]
+    assert histograms['all'].tolist() == [2] + [0] * 12 + [1, 1]
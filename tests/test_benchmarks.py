@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+import baseline
+from conftest import CITIES, read_bytes
+from bikeshare.analysis import rider_ship
+from bikeshare.wrangling import condense_data
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+import run_benchmarks
+from synthetic import write_raw_file
+
+
+@pytest.mark.parametrize('city', CITIES)
+def test_synthetic_trips_condense_like_baseline(city, tmp_path):
+    raw_file = str(tmp_path / 'raw.csv')
+    write_raw_file(city, 300, raw_file)
+    expected = str(tmp_path / 'expected.csv')
+    baseline.condense_data(raw_file, expected, city)
+
+    for mode in ('rows', 'vectorized'):
+        out_file = str(tmp_path / '{}.csv'.format(mode))
+        condense_data(raw_file, out_file, city, mode=mode)
+        assert read_bytes(out_file) == read_bytes(expected)
+    assert rider_ship(raw_file, city) == baseline.rider_ship(raw_file, city)
+
+
+def test_suite_runs_every_case(tmp_path):
+    results = run_benchmarks.run(50, ['Washington'], memory=False, work_dir=str(tmp_path))
+
+    cases = results['cities']['Washington']
+    assert {'condense_data', 'number_of_trips', 'rider_ship'} <= set(cases)
+    assert all(case['seconds'] > 0 for case in cases.values())
+
+
+def test_suite_runs_without_the_cache(tmp_path, monkeypatch):
+    from bikeshare import cache
+
+    monkeypatch.setenv('BIKESHARE_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(cache, '_checked_environment', False)
+
+    results = run_benchmarks.run(50, ['Washington'], memory=False, work_dir=str(tmp_path))
+
+    assert results['cache'] == 'disabled'
+    assert cache.active_cache() is None
+    assert not (tmp_path / 'cache').exists()
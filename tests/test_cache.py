@@ -0,0 +1,113 @@
+import os
+import pickle
+
+import pytest
+
+import baseline
+from bikeshare import cache
+from bikeshare.analysis import len_of_trip, rider_ship
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    # conftest's no_result_cache puts the disabled cache back afterwards
+    return cache.enable_cache(str(tmp_path / 'cache'))
+
+
+def counted(calls):
+    @cache.cached
+    def file_length(filename, scale=1):
+        calls.append(filename)
+        with open(filename, 'r') as f_in:
+            return len(f_in.read()) * scale
+    return file_length
+
+
+def test_unchanged_file_is_not_read_again(result_cache, tmp_path):
+    filename = str(tmp_path / 'trips.csv')
+    with open(filename, 'w') as f_out:
+        f_out.write('duration\n1.5\n')
+    calls = []
+    file_length = counted(calls)
+
+    assert file_length(filename) == file_length(filename) == 13
+    assert file_length(filename, scale=2) == 26
+    assert len(calls) == 2
+
+
+def test_changed_file_is_read_again(result_cache, tmp_path):
+    filename = str(tmp_path / 'trips.csv')
+    with open(filename, 'w') as f_out:
+        f_out.write('duration\n1.5\n')
+    calls = []
+    file_length = counted(calls)
+    file_length(filename)
+
+    with open(filename, 'a') as f_out:
+        f_out.write('2.5\n')
+
+    assert file_length(filename) == 17
+    assert len(calls) == 2
+
+
+def test_rewrite_with_same_size_and_mtime_is_not_noticed(result_cache, tmp_path):
+    filename = str(tmp_path / 'trips.csv')
+    with open(filename, 'w') as f_out:
+        f_out.write('duration\n1.5\n')
+    stat = os.stat(filename)
+    first = result_cache.fingerprint(filename)
+
+    with open(filename, 'w') as f_out:
+        f_out.write('duration\n2.5\n')
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    # the content hash is not recomputed for a size and mtime seen before
+    assert result_cache.fingerprint(filename) == first
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert result_cache.fingerprint(filename)[2] == cache.content_hash(filename) != first[2]
+
+
+def test_analysis_results_match_baseline(result_cache, data_dir):
+    summary_file = str(data_dir / 'Chicago-Summary.csv')
+    raw_file = str(data_dir / 'Chicago-raw.csv')
+
+    for _ in range(2):
+        assert len_of_trip(summary_file) == baseline.len_of_trip(summary_file)
+        assert rider_ship(raw_file, 'Chicago') == baseline.rider_ship(raw_file, 'Chicago')
+    assert result_cache.entries()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path / 'cache'), max_bytes=1000)
+    result_cache.put('first', b'x' * 400)
+    os.utime(result_cache._path(cache._digest('first')), (1, 1))
+    result_cache.put('second', b'x' * 400)
+    result_cache.put('third', b'x' * 400)
+
+    assert result_cache.get('first') is None
+    assert result_cache.get('third') == b'x' * 400
+    assert sum(size for _, size, _ in result_cache.entries()) <= 1000
+
+
+def test_only_the_outer_call_is_cached(result_cache, data_dir):
+    summary_file = str(data_dir / 'NYC-Summary.csv')
+    # the memoized content hash is an entry of its own
+    result_cache.fingerprint(summary_file)
+    n_entries = len(result_cache.entries())
+
+    rider_ship(summary_file, None)
+
+    assert len(result_cache.entries()) == n_entries + 1
+
+
+@pytest.mark.parametrize('content', [b'', b'\x80\x04garbage', pickle.dumps(('key',)),
+                                     b'\x80\x04cno_such_module\nThing\n.'])
+def test_unreadable_entry_is_removed(result_cache, content):
+    key = ('unreadable', 1)
+    result_cache.put(key, 'value')
+    [(_, _, path)] = result_cache.entries()
+    with open(path, 'wb') as f_out:
+        f_out.write(content)
+
+    assert result_cache.get(key, 'missing') == 'missing'
+    assert not os.path.exists(path)
@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import baseline
+from conftest import read_bytes
+from bikeshare import cli
+from bikeshare.analysis import rider_ship
+
+
+def run_json(capsys, argv):
+    cli.main(argv)
+    return json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.parametrize('mode', ['rows', 'vectorized', 'parallel', 'incremental', 'pipeline'])
+def test_condense_json_summary(raw_file, summary_file, city, tmp_path, capsys, mode):
+    out_file = str(tmp_path / 'out.csv')
+
+    summary = run_json(capsys, ['condense', raw_file, out_file, '--city', city,
+                                '--mode', mode, '--json'])
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+    assert summary['out_file'] == out_file
+    assert summary['mode'] == mode
+    assert summary['rows'] == baseline.number_of_trips(summary_file)[2]
+    assert ('details' in summary) == (mode == 'pipeline')
+
+
+@pytest.mark.parametrize('out_format', ['store', 'partitioned'])
+def test_condense_json_summary_of_stores(data_dir, tmp_path, capsys, out_format):
+    summary_file = str(data_dir / 'NYC-Summary.csv')
+
+    summary = run_json(capsys, ['condense', str(data_dir / 'NYC-raw.csv'), str(tmp_path / 'out'),
+                                '--city', 'NYC', '--format', out_format, '--json'])
+
+    assert summary['format'] == out_format
+    assert summary['rows'] == baseline.number_of_trips(summary_file)[2]
+
+
+def test_stats_json(data_dir, capsys):
+    filenames = [str(data_dir / '{}-Summary.csv'.format(city)) for city in ('NYC', 'Chicago')]
+
+    summaries = run_json(capsys, ['stats', '--json'] + filenames)
+
+    for filename in filenames:
+        assert summaries[filename]['number_of_trips'] == \
+            list(baseline.number_of_trips(filename))
+        assert summaries[filename]['len_of_trip'] == list(baseline.len_of_trip(filename))
+        assert summaries[filename]['Duration_RiderShip'] == \
+            list(baseline.Duration_RiderShip(filename))
+
+
+def test_ridership_json(raw_file, city, capsys):
+    averages = run_json(capsys, ['ridership', raw_file, '--city', city, '--json'])
+
+    assert tuple(averages[label] for label in cli.RIDERSHIP_LABELS) == \
+        baseline.rider_ship(raw_file, city)
+
+
+def test_ridership_of_a_summary_file_is_light(summary_file):
+    code = ('import sys, json; from bikeshare import cli; '
+            'cli.main(["ridership", sys.argv[1], "--json"]); '
+            'print(any(name in sys.modules for name in ("numpy", "pandas")))')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(cli.__file__)))
+    output = subprocess.check_output([sys.executable, '-c', code, summary_file], cwd=root)
+    averages, imported = output.decode().strip().rsplit('\n', 1)
+
+    assert imported == 'False'
+    assert tuple(json.loads(averages)[label] for label in cli.RIDERSHIP_LABELS) == \
+        pytest.approx(rider_ship(summary_file, None), nan_ok=True)
+
+
+def test_ridership_of_a_raw_file_needs_the_city(data_dir):
+    with pytest.raises(SystemExit):
+        cli.main(['ridership', str(data_dir / 'NYC-raw.csv')])
+
+
+def test_hist_json(data_dir, capsys):
+    result = run_json(capsys, ['hist', str(data_dir / 'NYC-Summary.csv'), '--user-type',
+                               'Subscriber', '--json'])
+
+    assert result['edges'][0] == 0 and result['edges'][-1] == 75
+    assert sum(result['counts']) == 4
+
+
+def test_import_is_light():
+    # only the standard library is imported until a subcommand runs
+    code = ('import sys, bikeshare.cli; '
+            'print(any(name in sys.modules for name in ("numpy", "pandas", "matplotlib")))')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(cli.__file__)))
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=root)
+    assert output.strip() == b'False'
@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from conftest import read_bytes
+from bikeshare.columnar import condense_data_vectorized, start_fields, weekdays
+from bikeshare.wrangling import condense_data
+
+
+def test_vectorized_matches_baseline(raw_file, summary_file, city, tmp_path):
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_data(raw_file, out_file, city, mode='vectorized')
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+@pytest.mark.parametrize('chunksize', [1, 3])
+def test_chunk_boundaries(raw_file, summary_file, city, tmp_path, chunksize):
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_data_vectorized(raw_file, out_file, city, chunksize=chunksize)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+@pytest.mark.parametrize('time_format', ['%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S'])
+def test_start_fields_match_strptime(time_format):
+    generator = random.Random(11)
+    starts = [datetime(2016, 1, 1) + timedelta(seconds=generator.randrange(366 * 86400))
+              for _ in range(2000)]
+    values = [start.strftime(time_format) for start in starts[:1000]]
+    # and without zero padding, as most raw files write them
+    values += ['{}/{}/{} {}'.format(start.month, start.day, start.year,
+                                    start.strftime(time_format.split(' ')[1]))
+               for start in starts[1000:]]
+
+    fields = start_fields(np.array(values, dtype=object), time_format)
+
+    for value, row in zip(values, fields.tolist()):
+        t = datetime.strptime(value, time_format)
+        assert row == [t.month, t.day, t.year, t.hour, t.minute, t.second][:len(row)]
+    assert weekdays(fields[:, 0], fields[:, 1], fields[:, 2]).tolist() == \
+        [datetime.strptime(value, time_format).weekday() for value in values]
+
+
+@pytest.mark.parametrize('value, time_format', [
+    ('1/1/2016 00:99', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:ab', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:00:00', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 24:00', '%m/%d/%Y %H:%M'),
+    ('13/1/2016 07:00', '%m/%d/%Y %H:%M'),
+    ('1/1/16 07:00', '%m/%d/%Y %H:%M'),
+    ('1-1-2016 07:00', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:00', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 00:09:55:77', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 07:001:00', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 23:59:60', '%m/%d/%Y %H:%M:%S'),
+    ('', '%m/%d/%Y %H:%M:%S'),
+])
+def test_start_fields_reject_what_strptime_rejects(value, time_format):
+    with pytest.raises(ValueError):
+        datetime.strptime(value, time_format)
+    valid = datetime(2016, 1, 1, 7).strftime(time_format)
+    with pytest.raises(ValueError):
+        start_fields(np.array([valid, value], dtype=object), time_format)
+
+
+def test_start_fields_take_what_strptime_takes():
+    # a space in the layout matches any run of whitespace
+    values = ['1/1/2016  07:05', '01/02/2016 7:5', 'é']
+    fields = start_fields(np.array(values[:2], dtype=object), '%m/%d/%Y %H:%M')
+
+    assert fields.tolist() == [[1, 1, 2016, 7, 5], [1, 2, 2016, 7, 5]]
+    with pytest.raises(ValueError):
+        start_fields(np.array(values, dtype=object), '%m/%d/%Y %H:%M')
+
+
+def test_impossible_dates():
+    fields = start_fields(np.array(['2/30/2016 07:00'], dtype=object), '%m/%d/%Y %H:%M')
+    with pytest.raises(ValueError):
+        weekdays(fields[:, 0], fields[:, 1], fields[:, 2])
@@ -0,0 +1,47 @@
+import csv
+import io
+
+import pytest
+
+from conftest import read_bytes
+from bikeshare.csvio import column_getter, first_row, iter_columns, write_transformed
+from bikeshare.wrangling import condense_data
+
+
+def test_rows_mode_matches_baseline(raw_file, summary_file, city, tmp_path):
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_data(raw_file, out_file, city)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+def test_iter_columns_matches_dict_reader(raw_file, city):
+    with open(raw_file, 'r') as f_in:
+        data = list(csv.DictReader(f_in))
+    columns = list(data[0])[::-1][:3]
+
+    rows = list(iter_columns(raw_file, columns))
+
+    assert rows == [tuple(datum[column] for column in columns) for datum in data]
+    assert first_row(raw_file) == data[0]
+
+
+def test_single_and_missing_columns():
+    header = ['a', 'b', 'c']
+
+    assert column_getter(header, ['b'])(['1', '2', '3']) == ('2',)
+    with pytest.raises(KeyError):
+        column_getter(header, ['d'])
+
+
+def test_write_transformed_quotes_like_dict_writer():
+    rows = [['1', 'Broadway & W 60 St, North'], ['2', 'Say "hi"']]
+    expected = io.StringIO()
+    writer = csv.DictWriter(expected, fieldnames=['n', 'name'])
+    writer.writerows({'n': int(n), 'name': name} for n, name in rows)
+
+    out = io.StringIO()
+    write_transformed(out, rows, lambda row: (int(row[0]), row[1]))
+
+    assert out.getvalue() == expected.getvalue()
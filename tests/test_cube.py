@@ -0,0 +1,42 @@
+import pytest
+
+import baseline
+from bikeshare.cube import RollupCube, build_cube, build_cubes
+from bikeshare.wrangling import condense_data
+
+
+def test_cube_answers_match_baseline(summary_file, trimmed_raw_file, city):
+    cube = build_cube(summary_file, city)
+
+    assert cube.number_of_trips() == baseline.number_of_trips(summary_file)
+    assert cube.len_of_trip() == pytest.approx(baseline.len_of_trip(summary_file))
+    assert cube.Duration_RiderShip() == pytest.approx(baseline.Duration_RiderShip(summary_file))
+    assert cube.rider_ship() == pytest.approx(baseline.rider_ship(trimmed_raw_file, city))
+
+
+def test_store_cube_matches_csv_cube(raw_file, summary_file, city, tmp_path):
+    store_file = str(tmp_path / 'trips.trips')
+    condense_data(raw_file, store_file, city, out_format='store')
+
+    from_store = build_cube(store_file)
+    from_csv = build_cube(summary_file, city)
+
+    assert from_store.city == city
+    assert from_store.user_types == from_csv.user_types
+    assert from_store.data == pytest.approx(from_csv.data, rel=1e-6)
+
+
+def test_filters_and_round_trip(data_dir, tmp_path):
+    summary_file = str(data_dir / 'NYC-Summary.csv')
+    cube = build_cubes({'NYC': summary_file})['NYC']
+    filename = str(tmp_path / 'nyc.npz')
+    cube.save(filename)
+
+    loaded = RollupCube.load(filename)
+
+    assert loaded.city == 'NYC'
+    assert loaded.query(day_of_week=['Saturday', 'Sunday'])['count'] == 4
+    assert loaded.query(month=[1, 2], user_type='Customer')['count'] == 1
+    assert loaded.query(month=[1, 2], user_type='')['count'] == 1
+    assert loaded.query(hour=23)['count'] == 2
+    assert loaded.query(user_type='Nobody')['count'] == 0
@@ -0,0 +1,72 @@
+import csv
+
+import pytest
+
+from conftest import RAW_TRIPS, read_bytes, write_raw_file
+from bikeshare.incremental import condense_incremental
+
+
+def append_trips(filename, trips):
+    with open(filename, 'a', newline='') as f_out:
+        csv.writer(f_out).writerows(trips)
+
+
+def test_appended_rows_match_baseline(city, summary_file, tmp_path):
+    raw_file = str(tmp_path / 'raw.csv')
+    out_file = str(tmp_path / 'out.csv')
+    trips = RAW_TRIPS[city]
+    write_raw_file(raw_file, city, trips[:4])
+
+    assert condense_incremental(raw_file, out_file, city) == 3
+    assert condense_incremental(raw_file, out_file, city) == 0
+    append_trips(raw_file, trips[4:])
+    assert condense_incremental(raw_file, out_file, city) == len(trips) - 4
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+def test_incomplete_last_line_waits(city, summary_file, tmp_path):
+    raw_file = str(tmp_path / 'raw.csv')
+    out_file = str(tmp_path / 'out.csv')
+    trips = RAW_TRIPS[city]
+    write_raw_file(raw_file, city, trips[:-1])
+    # the last trip is still being written, without its line break
+    with open(raw_file, 'a', newline='') as f_out:
+        f_out.write(','.join(trips[-1][:3]))
+
+    condense_incremental(raw_file, out_file, city)
+    write_raw_file(raw_file, city, trips)
+    condense_incremental(raw_file, out_file, city)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+def test_period_files_are_condensed_in_order(tmp_path):
+    trips = RAW_TRIPS['Washington']
+    first = str(tmp_path / 'q1.csv')
+    second = str(tmp_path / 'q2.csv')
+    out_file = str(tmp_path / 'out.csv')
+    write_raw_file(first, 'Washington', trips[:3])
+    write_raw_file(second, 'Washington', trips[3:])
+
+    condense_incremental([first, second], out_file, 'Washington')
+
+    with open(out_file, 'r') as f_in:
+        rows = list(csv.reader(f_in))
+    # the first trip of each file is left out, as condense_data does
+    assert len(rows) == 1 + len(trips) - 2
+
+
+def test_changed_rows_are_refused(city, tmp_path):
+    raw_file = str(tmp_path / 'raw.csv')
+    out_file = str(tmp_path / 'out.csv')
+    trips = [list(trip) for trip in RAW_TRIPS[city]]
+    write_raw_file(raw_file, city, trips)
+    condense_incremental(raw_file, out_file, city)
+
+    trips[2].reverse()
+    write_raw_file(raw_file, city, trips)
+    with pytest.raises(ValueError):
+        condense_incremental(raw_file, out_file, city)
+    with pytest.raises(ValueError):
+        condense_incremental(raw_file, out_file, 'Other')
@@ -0,0 +1,68 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pytest
+
+from conftest import read_bytes
+from bikeshare.inputs import ThreadedReader, compression_of, open_input
+from bikeshare.wrangling import condense_data
+
+
+def compress(raw_file, compression, filename):
+    data = read_bytes(raw_file)
+    if compression == 'zip':
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('trips.csv', data)
+        return
+    if compression == 'zstd':
+        zstandard = pytest.importorskip('zstandard')
+        data = zstandard.ZstdCompressor().compress(data)
+    else:
+        data = {'gzip': gzip, 'bz2': bz2, 'xz': lzma}[compression].compress(data)
+    with open(filename, 'wb') as f_out:
+        f_out.write(data)
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'bz2', 'xz', 'zip', 'zstd'])
+@pytest.mark.parametrize('mode', ['rows', 'vectorized', 'parallel', 'pipeline', 'incremental'])
+def test_compressed_input_matches_baseline(raw_file, summary_file, city, tmp_path,
+                                           compression, mode):
+    # no file name extension, the format is told by the leading bytes
+    compressed = str(tmp_path / 'raw')
+    compress(raw_file, compression, compressed)
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_data(compressed, out_file, city, mode=mode)
+
+    assert compression_of(compressed) == compression
+    assert read_bytes(out_file) == read_bytes(summary_file)
+
+
+def test_plain_file_is_opened_directly(raw_file):
+    assert compression_of(raw_file) is None
+    with open_input(raw_file, 'rb') as f_in:
+        assert f_in.read() == read_bytes(raw_file)
+    with pytest.raises(ValueError):
+        open_input(raw_file, 'w')
+
+
+def test_threaded_reader_in_small_chunks(raw_file, tmp_path):
+    compressed = str(tmp_path / 'raw.gz')
+    compress(raw_file, 'gzip', compressed)
+
+    with ThreadedReader(gzip.open(compressed, 'rb'), chunk_size=7, depth=2) as reader:
+        assert reader.read() == read_bytes(raw_file)
+
+
+def test_zip_with_several_members(raw_file, tmp_path):
+    archive_file = str(tmp_path / 'raw.zip')
+    with zipfile.ZipFile(archive_file, 'w') as archive:
+        archive.writestr('a.csv', read_bytes(raw_file))
+        archive.writestr('b.csv', b'')
+
+    with pytest.raises(ValueError):
+        open_input(archive_file)
+    with open_input(archive_file, 'rb', member='a.csv') as f_in:
+        assert f_in.read() == read_bytes(raw_file)
@@ -0,0 +1,75 @@
+import os
+import signal
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import RAW_TRIPS, read_bytes
+from bikeshare import instrument, wrangling
+
+
+def test_counters_and_unchanged_output(raw_file, summary_file, city, tmp_path):
+    out_file = str(tmp_path / 'out.csv')
+
+    with instrument.instrumented(str(tmp_path / 'report.json')) as run:
+        wrangling.condense_data(raw_file, out_file, city)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+    stats = run.final_report['cities'][city]
+    assert stats['functions']['condense_data']['calls'] == 1
+    # the first trip is skipped before it reaches the transformer
+    assert stats['rows_in'] == len(RAW_TRIPS[city]) - 1
+    assert stats['rows_out'] == len(RAW_TRIPS[city]) - 1
+    assert stats['input_bytes'] == os.path.getsize(raw_file)
+    # the originals are back afterwards
+    assert not hasattr(wrangling.condense_data, '__wrapped_original__')
+
+
+def test_samples_skip_the_wrappers():
+    def sampled(row):
+        # the frame of the caller is the instrument wrapper
+        instrument._sample(signal.SIGPROF, sys._getframe(1))
+        return row
+
+    run = instrument.enable()
+    try:
+        instrument._wrap(sampled)('row')
+    finally:
+        instrument.disable()
+
+    assert list(run.samples) == ['test_instrument.py:test_samples_skip_the_wrappers']
+
+
+def test_profile_attributes_no_samples_to_the_wrappers(data_dir, tmp_path):
+    raw_file = str(data_dir / 'NYC-raw.csv')
+    out_file = str(tmp_path / 'out.csv')
+
+    with instrument.instrumented(profile_interval=0.001) as run:
+        deadline = time.perf_counter() + 10
+        while sum(run.samples.values()) < 50 and time.perf_counter() < deadline:
+            wrangling.condense_data(raw_file, out_file, 'NYC')
+
+    assert run.samples
+    assert not [name for name in run.samples if name.startswith('instrument.py:')]
+
+
+def test_failed_enable_is_undone():
+    errors = []
+
+    def enable_in_thread():
+        # SIGPROF handlers can only be installed from the main thread
+        try:
+            instrument.enable(profile_interval=0.001)
+        except ValueError as error:
+            errors.append(error)
+    thread = threading.Thread(target=enable_in_thread)
+    thread.start()
+    thread.join()
+
+    assert errors
+    assert instrument._active is None
+    assert not hasattr(wrangling.condense_data, '__wrapped_original__')
+    with pytest.raises(RuntimeError):
+        instrument.disable()
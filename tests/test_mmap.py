@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import baseline
+from conftest import summary_durations
+from bikeshare import store as store_module
+from bikeshare.analysis import duration_histograms, weekend_durations
+from bikeshare.store import TripStore, read_trip_store
+from bikeshare.wrangling import condense_data
+
+
+@pytest.fixture
+def store_file(raw_file, city, tmp_path):
+    filename = str(tmp_path / '{}.trips'.format(city))
+    condense_data(raw_file, filename, city, out_format='store')
+    return filename
+
+
+def test_columns_are_views_of_the_file(store_file):
+    meta, columns = read_trip_store(store_file)
+
+    with TripStore(store_file) as store:
+        assert len(store) == meta['rows']
+        for name, values in columns.items():
+            assert store[name].tolist() == values.tolist()
+            assert not store[name].flags.owndata
+            assert not store[name].flags.writeable
+        chunks = list(store.iter_chunks(chunk_rows=3))
+        assert np.concatenate([chunk['hour'] for chunk in chunks]).tolist() == \
+            columns['hour'].tolist()
+        assert store.user_type_code('Subscriber') == 0
+        assert store.user_type_code('Nobody') is None
+        del chunks
+
+
+def test_columns_are_read_without_mmap(store_file, monkeypatch):
+    with TripStore(store_file) as store:
+        expected = {name: values.tolist() for name, values in store.columns.items()}
+    averages = weekend_durations(store_file)
+    monkeypatch.setattr(store_module, 'mmap', None)
+
+    with TripStore(store_file) as store:
+        assert {name: values.tolist() for name, values in store.columns.items()} == expected
+        assert not store['duration'].flags.writeable
+    assert weekend_durations(store_file, chunk_rows=2) == pytest.approx(averages, nan_ok=True)
+
+
+@pytest.mark.parametrize('user_type', [None, 'Subscriber', 'Customer'])
+def test_histogram_matches_numpy(store_file, summary_file, user_type):
+    bins = np.arange(0, 75, 5)
+    expected = np.histogram(summary_durations(summary_file, user_type), bins)[0]
+
+    edges, histograms = duration_histograms(store_file, bins=bins, chunk_rows=2)
+
+    assert edges.tolist() == bins.tolist()
+    assert histograms.get(user_type or 'all', np.zeros(len(expected))).tolist() == \
+        expected.tolist()
+
+
+def test_weekend_durations_match_baseline(store_file, trimmed_raw_file, city):
+    assert weekend_durations(store_file, chunk_rows=2) == pytest.approx(
+        baseline.rider_ship(trimmed_raw_file, city), rel=1e-6)
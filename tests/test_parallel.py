@@ -0,0 +1,43 @@
+import gzip
+import shutil
+
+from conftest import CITIES, RAW_TRIPS, read_bytes
+from bikeshare import parallel
+from bikeshare.parallel import condense_cities, shard_ranges
+
+
+def test_condense_cities_matches_baseline(data_dir, tmp_path, monkeypatch):
+    # small enough that every file is split into several shards
+    monkeypatch.setattr(parallel, 'MIN_SHARD_BYTES', 200)
+    city_info = {city: {'in_file': str(data_dir / '{}-raw.csv'.format(city)),
+                        'out_file': str(tmp_path / '{}-Summary.csv'.format(city))}
+                 for city in CITIES}
+
+    n_trips = condense_cities(city_info, processes=2, shards_per_city=3)
+
+    for city in CITIES:
+        assert n_trips[city] == len(RAW_TRIPS[city]) - 1
+        assert (read_bytes(city_info[city]['out_file'])
+                == read_bytes(str(data_dir / '{}-Summary.csv'.format(city))))
+
+
+def test_shards_cover_the_data_rows(raw_file):
+    header, ranges = shard_ranges(raw_file, 4, min_shard_bytes=100)
+    data = read_bytes(raw_file)
+
+    assert len(ranges) == 4
+    assert data[:ranges[0][0]].count(b'\n') == 1
+    assert ranges[-1][1] == len(data)
+    for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        assert data[start - 1:start] == b'\n'
+
+
+def test_compressed_file_is_one_shard(raw_file, tmp_path):
+    compressed = str(tmp_path / 'raw.csv.gz')
+    with open(raw_file, 'rb') as f_in, gzip.open(compressed, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+    header, ranges = shard_ranges(compressed, 4, min_shard_bytes=100)
+
+    assert ranges == [(None, None)]
@@ -0,0 +1,121 @@
+import csv
+from collections import Counter
+
+import pytest
+
+import baseline
+from conftest import RAW_TRIPS, write_raw_file
+from bikeshare import partition
+from bikeshare.aggregate import run_aggregates
+from bikeshare.partition import load_manifest, prune
+from bikeshare.store import iter_trips
+from bikeshare.query import query
+from bikeshare.wrangling import condense_data
+
+
+@pytest.fixture
+def dataset(raw_file, city, tmp_path):
+    dataset = str(tmp_path / city)
+    condense_data(raw_file, dataset, city, out_format='partitioned')
+    return dataset
+
+
+def summary_trips(summary_file):
+    with open(summary_file, 'r') as f_in:
+        return list(csv.DictReader(f_in))
+
+
+def test_aggregates_match_baseline(dataset, summary_file):
+    results = run_aggregates(dataset)
+
+    assert results['number_of_trips'] == baseline.number_of_trips(summary_file)
+    assert results['len_of_trip'] == pytest.approx(baseline.len_of_trip(summary_file), rel=1e-6)
+    assert results['Duration_RiderShip'] == pytest.approx(
+        baseline.Duration_RiderShip(summary_file), rel=1e-6)
+
+
+def test_one_partition_per_month(dataset, summary_file):
+    trips = summary_trips(summary_file)
+    manifest = load_manifest(dataset)
+
+    assert manifest['rows'] == len(trips)
+    assert {(part['year'], part['month']): part['rows'] for part in manifest['partitions']} == \
+        Counter((2016, int(trip['month'])) for trip in trips)
+    for part in manifest['partitions']:
+        assert part['min']['month'] == part['max']['month'] == part['month']
+        assert part['path'] == '2016/{:02d}.trips'.format(part['month'])
+
+
+def test_months_that_come_back_are_rewritten(tmp_path):
+    # a January trip of a new user type after the December one
+    trips = RAW_TRIPS['NYC'] + [
+        ['300', '1/20/2016 10:00:00', '1/20/2016 10:05:00', '532', 'S 5 Pl & S 4 St',
+         '40.710', '-73.960', '401', 'Allen St & Rivington St', '40.720', '-73.989',
+         '17109', 'Staff', '', '0']]
+    raw_file = str(tmp_path / 'raw.csv')
+    summary_file = str(tmp_path / 'Summary.csv')
+    write_raw_file(raw_file, 'NYC', trips)
+    baseline.condense_data(raw_file, summary_file, 'NYC')
+    dataset = str(tmp_path / 'NYC')
+
+    manifest = condense_data(raw_file, dataset, 'NYC', out_format='partitioned')
+
+    assert 'Staff' in manifest['user_types']
+    for part in manifest['partitions']:
+        expected = [(trip['month'], trip['hour'], trip['day_of_week'], trip['user_type'])
+                    for trip in summary_trips(summary_file)
+                    if int(trip['month']) == part['month']]
+        written = [(str(month), str(hour), day_of_week, user_type) for
+                   duration, month, hour, day_of_week, user_type in
+                   iter_trips(str(tmp_path / 'NYC' / part['path']))]
+        assert written == expected
+
+
+@pytest.mark.parametrize('where', [
+    [('month', 'in', [1, 2])],
+    [('month', '>=', 7), ('hour', '<', 12)],
+    [('user_type', '==', 'Subscriber')],
+    [('day_of_week', 'in', ['Saturday', 'Sunday'])],
+])
+def test_pruned_partitions_hold_no_matching_trip(dataset, summary_file, monkeypatch, where):
+    trips = summary_trips(summary_file)
+    manifest = load_manifest(dataset)
+    kept = prune(manifest, where)
+    opened = []
+    store = partition.TripStore
+
+    def tracking_store(filename):
+        opened.append(filename)
+        return store(filename)
+    monkeypatch.setattr(partition, 'TripStore', tracking_store)
+
+    rows = query(dataset, by=['month'], where=where)
+
+    assert len(opened) == len(kept) <= len(manifest['partitions'])
+    expected = Counter(int(row['month']) for row in trips if _matches(row, where))
+    assert {row['month']: row['count'] for row in rows} == expected
+    assert set(expected) <= {part['month'] for part in kept}
+
+
+def test_pruning_skips_months(dataset, summary_file):
+    months = {int(trip['month']) for trip in summary_trips(summary_file)}
+    month = min(months)
+
+    kept = prune(load_manifest(dataset), [('month', '==', month)])
+
+    assert [part['month'] for part in kept] == [month]
+    assert prune(load_manifest(dataset), [('month', '>', 12)]) == []
+
+
+def _matches(trip, where):
+    for column, op, value in where:
+        field = trip[column] if column in ('day_of_week', 'user_type') else int(trip[column])
+        if op == 'in' and field not in value:
+            return False
+        if op == '==' and field != value:
+            return False
+        if op == '>=' and not field >= value:
+            return False
+        if op == '<' and not field < value:
+            return False
+    return True
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import RAW_TRIPS, read_bytes
+from bikeshare import pipeline
+from bikeshare.pipeline import condense_pipeline
+
+
+@pytest.mark.parametrize('batch_lines', [1, 3, 20000])
+def test_pipeline_matches_baseline(raw_file, summary_file, city, tmp_path, batch_lines):
+    out_file = str(tmp_path / 'out.csv')
+    # more workers than the small queues hold, so batches finish out of order
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        report = condense_pipeline(raw_file, out_file, city, workers=3,
+                                   batch_lines=batch_lines, queue_size=1,
+                                   executor=executor)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+    assert report['rows'] == len(RAW_TRIPS[city]) - 1
+    for stage in report['stages'].values():
+        assert stage['rows'] == report['rows']
+
+
+def test_pipeline_in_process_pool(data_dir, tmp_path):
+    out_file = str(tmp_path / 'out.csv')
+
+    condense_pipeline(str(data_dir / 'NYC-raw.csv'), out_file, 'NYC', workers=2, batch_lines=2)
+
+    assert read_bytes(out_file) == read_bytes(str(data_dir / 'NYC-Summary.csv'))
+
+
+def test_slow_batch_holds_the_workers_back(data_dir, tmp_path, monkeypatch):
+    out_file = str(tmp_path / 'out.csv')
+    transform_batch = pipeline.transform_batch
+
+    def slow_first_batch(city, header, lines):
+        if lines[0].startswith('686,'):
+            time.sleep(0.2)
+        return transform_batch(city, header, lines)
+    monkeypatch.setattr(pipeline, 'transform_batch', slow_first_batch)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        report = condense_pipeline(str(data_dir / 'NYC-raw.csv'), out_file, 'NYC', workers=3,
+                                   batch_lines=1, queue_size=1, executor=executor)
+
+    assert read_bytes(out_file) == read_bytes(str(data_dir / 'NYC-Summary.csv'))
+    assert report['reorder']['window'] == 4
+    # every batch but the slow one would otherwise wait in the writer
+    assert report['reorder']['max_pending'] <= 4 < len(RAW_TRIPS['NYC']) - 2
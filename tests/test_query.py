@@ -0,0 +1,86 @@
+import csv
+from collections import Counter
+
+import pytest
+
+import baseline
+from bikeshare.query import query, top
+from bikeshare.wrangling import condense_data
+
+
+def summary_trips(summary_file):
+    with open(summary_file, 'r') as f_in:
+        return list(csv.DictReader(f_in))
+
+
+@pytest.mark.parametrize('chunk_rows', [2, 1 << 20])
+def test_user_types_match_baseline(summary_file, chunk_rows):
+    n_subscribers, n_customers, n_total, _, _ = baseline.number_of_trips(summary_file)
+    _, _, sub_average, cus_average = baseline.Duration_RiderShip(summary_file)
+
+    rows = {row['user_type']: row for row in query(summary_file, by=['user_type'],
+                                                   chunk_rows=chunk_rows)}
+
+    assert sum(row['count'] for row in rows.values()) == n_total
+    assert rows['Subscriber']['count'] == n_subscribers
+    assert n_total - rows['Subscriber']['count'] == n_customers
+    assert rows['Subscriber']['mean'] == pytest.approx(sub_average)
+    if 'Customer' in rows:
+        assert rows['Customer']['mean'] == pytest.approx(cus_average)
+
+
+def test_groups_match_summary(summary_file):
+    trips = summary_trips(summary_file)
+    expected = Counter((int(trip['month']), int(trip['hour'])) for trip in trips)
+
+    rows = query(summary_file, by=['month', 'hour'], aggregates=['count', 'share'])
+
+    assert {(row['month'], row['hour']): row['count'] for row in rows} == expected
+    assert [(row['month'], row['hour']) for row in rows] == sorted(expected)
+    assert sum(row['share'] for row in rows) == pytest.approx(100)
+
+
+def test_filters(summary_file):
+    trips = summary_trips(summary_file)
+    weekend = [float(trip['duration']) for trip in trips
+               if trip['day_of_week'] in ('Saturday', 'Sunday') and float(trip['duration']) < 75]
+
+    rows = query(summary_file, aggregates=['count', 'sum'],
+                 where=[('duration', '<', 75), ('day_of_week', 'in', ['Saturday', 'Sunday'])])
+
+    assert rows == ([{'count': len(weekend), 'sum': pytest.approx(sum(weekend))}]
+                    if weekend else [])
+    assert query(summary_file, where=[('user_type', '==', 'Nobody')]) == []
+    with pytest.raises(ValueError):
+        query(summary_file, where=[('duration', '~', 1)])
+    with pytest.raises(ValueError):
+        query(summary_file, by=['duration'])
+    with pytest.raises(ValueError):
+        query(summary_file, aggregates=['median'])
+
+
+def test_store_answers_like_summary(raw_file, summary_file, city, tmp_path):
+    store_file = str(tmp_path / 'out.trips')
+    condense_data(raw_file, store_file, city, out_format='store')
+
+    by = ['user_type', 'day_of_week']
+    # groups come in the order of the user type codes, which the two files
+    # assign differently
+    def group(row):
+        return row['user_type'], row['day_of_week']
+    expected = sorted(query(summary_file, by=by, aggregates=['count', 'mean', 'std']), key=group)
+    rows = sorted(query(store_file, by=by, aggregates=['count', 'mean', 'std']), key=group)
+
+    assert [group(row) + (row['count'],) for row in rows] == \
+        [group(row) + (row['count'],) for row in expected]
+    for row, expected_row in zip(rows, expected):
+        assert row['mean'] == pytest.approx(expected_row['mean'], rel=1e-6)
+        assert row['std'] == pytest.approx(expected_row['std'], rel=1e-5, abs=1e-6)
+
+
+def test_top(data_dir):
+    rows = query(str(data_dir / 'NYC-Summary.csv'), by=['user_type', 'month'])
+    busiest = {row['user_type']: row for row in top(rows, 'user_type')}
+
+    for row in rows:
+        assert row['count'] <= busiest[row['user_type']]['count']
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+import baseline
+from conftest import CITIES
+from bikeshare import report
+
+
+def test_report_metrics_match_baseline(data_dir, tmp_path):
+    city_files = {city: str(data_dir / '{}-Summary.csv'.format(city)) for city in CITIES}
+    out_dir = str(tmp_path / 'report')
+
+    result = report.build_report(city_files, out_dir, processes=1)
+
+    with open(os.path.join(out_dir, 'report.json'), 'r') as f_in:
+        assert json.load(f_in)['cities'].keys() == set(CITIES)
+    assert os.path.isfile(os.path.join(out_dir, 'report.html'))
+    for city, filename in city_files.items():
+        city_report = result['cities'][city]
+        metrics = city_report['metrics']
+        expected = {'number_of_trips': baseline.number_of_trips(filename),
+                    'len_of_trip': baseline.len_of_trip(filename),
+                    'Duration_RiderShip': baseline.Duration_RiderShip(filename),
+                    'rider_ship': baseline.rider_ship(
+                        str(data_dir / '{}-trimmed.csv'.format(city)), city)}
+        for name, values in expected.items():
+            assert tuple(metrics[name][field] for field in report.METRIC_FIELDS[name]) == \
+                pytest.approx(values)
+        for figure in city_report['figures'].values():
+            assert os.path.getsize(os.path.join(out_dir, figure)) > 0
+        assert sum(city_report['histogram']['counts']['all']) <= metrics['len_of_trip']['trips']
+
+
+def test_city_files_arguments():
+    assert report.parse_city_files(['NYC=a.csv', 'Chicago=b.trips']) == \
+        {'NYC': 'a.csv', 'Chicago': 'b.trips'}
+    with pytest.raises(ValueError):
+        report.parse_city_files(['a.csv'])
@@ -0,0 +1,92 @@
+import csv
+import random
+
+import pytest
+
+import baseline
+from conftest import read_bytes, write_raw_file
+from bikeshare.sampling import condense_sample, estimate_sample
+
+
+def test_full_sample_matches_baseline(raw_file, summary_file, city, tmp_path):
+    sample_file = str(tmp_path / 'sample.csv')
+
+    info = condense_sample(raw_file, sample_file, city, fraction=1.0)
+    estimates = estimate_sample(sample_file)
+
+    assert read_bytes(sample_file) == read_bytes(summary_file)
+    assert info['rows'] == sum(stratum['population'] for stratum in info['strata'])
+    # a sample of every trip estimates the baseline figures exactly
+    for name in ('number_of_trips', 'len_of_trip', 'Duration_RiderShip'):
+        expected = getattr(baseline, name)(summary_file)
+        for estimate, value in zip(estimates[name], expected):
+            assert estimate.value == pytest.approx(value)
+            assert estimate.low == pytest.approx(estimate.high)
+
+
+def test_reservoir_keeps_per_stratum(raw_file, summary_file, city, tmp_path):
+    sample_file = str(tmp_path / 'sample.csv')
+
+    info = condense_sample(raw_file, sample_file, city, method='reservoir', per_stratum=1)
+
+    with open(sample_file, 'r') as f_in:
+        rows = list(csv.DictReader(f_in))
+    with open(summary_file, 'r') as f_in:
+        trips = list(csv.DictReader(f_in))
+    assert len(rows) == info['rows'] == len(info['strata'])
+    assert {(row['user_type'], int(row['month'])) for row in rows} == \
+        {(stratum['user_type'], stratum['month']) for stratum in info['strata']}
+    # the kept trips stay in file order
+    assert [trips.index(row) for row in rows] == sorted(trips.index(row) for row in rows)
+    assert estimate_sample(sample_file)['number_of_trips'][2].value == len(trips)
+
+
+def test_intervals_cover_the_full_file(tmp_path):
+    raw_file = str(tmp_path / 'raw.csv')
+    summary_file = str(tmp_path / 'Summary.csv')
+    rng = random.Random(0)
+    trips = []
+    for _ in range(3000):
+        start = '{}/{}/2016 {}:{:02d}'.format(rng.randint(1, 3), rng.randint(1, 28),
+                                             rng.randint(0, 23), rng.randint(0, 59))
+        member = rng.choice(['Registered', 'Registered', 'Casual'])
+        trips.append([int(rng.expovariate(1 / 900000)), start, start, '1', 'A', '2', 'B',
+                      'W1', member])
+    write_raw_file(raw_file, 'Washington', trips)
+    baseline.condense_data(raw_file, summary_file, 'Washington')
+    expected = {name: getattr(baseline, name)(summary_file)
+                for name in ('len_of_trip', 'Duration_RiderShip')}
+
+    covered = checked = 0
+    for seed in range(20):
+        sample_file = str(tmp_path / 'sample-{}.csv'.format(seed))
+        condense_sample(raw_file, sample_file, 'Washington', fraction=0.2, seed=seed)
+        estimates = estimate_sample(sample_file)
+        for name, values in expected.items():
+            for estimate, value in zip(estimates[name], values):
+                if estimate.low != estimate.high:
+                    checked += 1
+                    covered += estimate.low <= value <= estimate.high
+
+    # 95% intervals; a lot fewer hits would mean the variance is off
+    assert checked == 20 * 6
+    assert covered >= 0.85 * checked
+
+
+def test_seed_makes_the_sample_reproducible(data_dir, tmp_path):
+    raw_file = str(data_dir / 'NYC-raw.csv')
+    samples = []
+    for name in ('a', 'b'):
+        sample_file = str(tmp_path / '{}.csv'.format(name))
+        condense_sample(raw_file, sample_file, 'NYC', fraction=0.5, seed=1)
+        samples.append(read_bytes(sample_file))
+
+    assert samples[0] == samples[1]
+
+
+def test_sample_options(data_dir, tmp_path):
+    raw_file = str(data_dir / 'NYC-raw.csv')
+    with pytest.raises(ValueError):
+        condense_sample(raw_file, str(tmp_path / 'sample.csv'), 'NYC', method='systematic')
+    with pytest.raises(ValueError):
+        condense_sample(raw_file, str(tmp_path / 'sample.csv'), 'NYC', method='reservoir')
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from conftest import summary_durations
+from bikeshare.aggregate import run_aggregates
+from bikeshare.sketch import (DurationHistogram, DurationSketch, QuantileSketch,
+                              merge_summaries)
+
+
+def test_sketch_matches_exact_summaries(summary_file):
+    summaries = run_aggregates(summary_file, [DurationSketch()])['duration_sketch']
+
+    for group, summary in summaries.items():
+        durations = summary_durations(summary_file, None if group == 'all' else group)
+        edges = summary.histogram.edges()
+        assert summary.histogram.counts == np.histogram(durations, edges)[0].tolist()
+        assert summary.histogram.overflow == sum(duration >= 75 for duration in durations)
+        ordered = sorted(durations)
+        for q in (0, 0.5, 0.9, 1):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert summary.quantiles.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_merged_shards_equal_one_pass():
+    rng = np.random.default_rng(2016)
+    durations = rng.lognormal(2.5, 0.8, 5000).tolist()
+    whole = QuantileSketch()
+    parts = [QuantileSketch(), QuantileSketch()]
+    for i, duration in enumerate(durations):
+        whole.add(duration)
+        parts[i % 2].add(duration)
+
+    merged = parts[0].merge(parts[1])
+
+    assert merged.buckets == whole.buckets
+    ordered = sorted(durations)
+    for q in (0.01, 0.5, 0.99):
+        assert merged.quantile(q) == pytest.approx(ordered[int(q * (len(ordered) - 1))],
+                                                   rel=0.01)
+
+
+def test_merge_summaries_of_cities(data_dir):
+    results = [run_aggregates(str(data_dir / '{}-Summary.csv'.format(city)),
+                              [DurationSketch()])['duration_sketch']
+               for city in ('NYC', 'Chicago')]
+
+    merged = merge_summaries(*results)
+
+    assert merged['all'].quantiles.count == sum(result['all'].quantiles.count
+                                                for result in results)
+    assert 'Dependent' in merged
+    with pytest.raises(ValueError):
+        DurationHistogram(5, 75).merge(DurationHistogram(4, 75))
@@ -0,0 +1,80 @@
+import csv
+import random
+from collections import Counter
+
+import pytest
+
+from conftest import RAW_HEADERS, RAW_TRIPS, read_bytes
+from bikeshare.adapters import get_adapter
+from bikeshare.stations import SpaceSaving, StationIndex, load_station_report
+from bikeshare.wrangling import condense_data
+
+
+def station_columns(city):
+    adapter = get_adapter(city)
+    header = RAW_HEADERS[city]
+    return header.index(adapter.start_station_column), header.index(adapter.end_station_column)
+
+
+def test_condense_with_stations_matches_baseline(raw_file, summary_file, city, tmp_path):
+    out_file = str(tmp_path / 'out.csv')
+    stations_file = str(tmp_path / 'stations.json')
+
+    condense_data(raw_file, out_file, city, stations_file=stations_file)
+
+    assert read_bytes(out_file) == read_bytes(summary_file)
+    # the index counts the trips of the Summary file
+    start, end = station_columns(city)
+    trips = RAW_TRIPS[city][1:]
+    report = load_station_report(stations_file)
+    assert report['trips'] == len(trips)
+    assert dict(zip(report['stations'], report['departures'])) == \
+        Counter(trip[start] for trip in trips)
+    arrivals = Counter(trip[end] for trip in trips)
+    assert {name: count for name, count in zip(report['stations'], report['arrivals'])
+            if count} == arrivals
+    routes = Counter((trip[start], trip[end]) for trip in trips)
+    assert {(route['from'], route['to']): route['trips'] for route in report['top_routes']} == \
+        routes
+    assert all(route['error'] == 0 for route in report['top_routes'])
+
+
+def test_stations_only_in_rows_mode(raw_file, city, tmp_path):
+    with pytest.raises(ValueError):
+        condense_data(raw_file, str(tmp_path / 'out.csv'), city, mode='vectorized',
+                      stations_file=str(tmp_path / 'stations.json'))
+
+
+def test_top_stations(data_dir):
+    with open(str(data_dir / 'Chicago-raw.csv'), 'r') as f_in:
+        reader = csv.reader(f_in)
+        header = next(reader)
+        index = StationIndex('Chicago')
+        rows = list(index.observe(reader, header))
+
+    assert rows == RAW_TRIPS['Chicago']
+    start, end = station_columns('Chicago')
+    departures = Counter(trip[start] for trip in RAW_TRIPS['Chicago'])
+    assert index.top_stations(2) == departures.most_common(2)
+    assert index.top_stations(1, index.arrivals)[0][1] == \
+        max(Counter(trip[end] for trip in RAW_TRIPS['Chicago']).values())
+
+
+def test_space_saving_bounds():
+    generator = random.Random(7)
+    # a few heavy routes among many light ones
+    items = [(generator.randrange(3) if generator.random() < 0.5 else generator.randrange(3, 500),
+              0) for _ in range(5000)]
+    exact = Counter(items)
+    sketch = SpaceSaving(capacity=50)
+    for item in items:
+        sketch.add(item)
+
+    assert sketch.n == len(items)
+    assert len(sketch.counts) == 50
+    for item, count, error in sketch.top(50):
+        assert count - error <= exact[item] <= count
+    for item, count in exact.items():
+        if count > len(items) / 50:
+            assert item in sketch.counts
+    assert [item for item, _, _ in sketch.top(3)] == [item for item, _ in exact.most_common(3)]
@@ -0,0 +1,52 @@
+import pytest
+
+import baseline
+from bikeshare import store
+from bikeshare.aggregate import iter_condensed, run_aggregates
+from bikeshare.store import is_trip_store, iter_trips, read_store_meta, read_trip_store
+from bikeshare.wrangling import condense_data
+
+
+@pytest.fixture
+def store_file(raw_file, city, tmp_path):
+    filename = str(tmp_path / '{}.trips'.format(city))
+    condense_data(raw_file, filename, city, out_format='store')
+    return filename
+
+
+def test_store_holds_the_summary_trips(store_file, summary_file):
+    expected = list(iter_condensed(summary_file))
+    trips = list(iter_trips(store_file))
+
+    assert [trip[1:] for trip in trips] == [trip[1:] for trip in expected]
+    # durations are stored as float32
+    assert [trip[0] for trip in trips] == pytest.approx([trip[0] for trip in expected],
+                                                        rel=1e-6)
+
+
+def test_aggregates_match_baseline(store_file, summary_file):
+    results = run_aggregates(store_file)
+
+    assert results['number_of_trips'] == baseline.number_of_trips(summary_file)
+    assert results['len_of_trip'] == pytest.approx(baseline.len_of_trip(summary_file), rel=1e-6)
+    assert results['Duration_RiderShip'] == pytest.approx(
+        baseline.Duration_RiderShip(summary_file), rel=1e-6)
+
+
+def test_iter_trips_streams_chunks(store_file, monkeypatch):
+    expected = list(iter_trips(store_file))
+    # the whole store must not be read into memory
+    monkeypatch.setattr(store, 'read_trip_store', None)
+
+    assert list(iter_trips(store_file, chunk_rows=3)) == expected
+
+
+def test_store_layout(store_file, summary_file):
+    meta, columns = read_trip_store(store_file)
+
+    assert is_trip_store(store_file)
+    assert not is_trip_store(summary_file)
+    assert read_store_meta(store_file)['version'] == store.VERSION
+    assert meta['user_types'][:2] == ['Subscriber', 'Customer']
+    assert {len(values) for values in columns.values()} == {meta['rows']}
+    assert all(column['offset'] % store.ALIGNMENT == 0 for column in meta['columns'])
@@ -0,0 +1,74 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+import baseline
+from bikeshare.adapters import get_adapter
+from bikeshare.timeparse import (calendar_date, calendar_day, parse_start_time,
+                                 start_date_parser, start_time_parser)
+
+
+def test_matches_baseline_time_of_trip(raw_file, city):
+    adapter = get_adapter(city)
+    with open(raw_file, 'r') as f_in:
+        for datum in csv.DictReader(f_in):
+            assert parse_start_time(datum[adapter.start_column], adapter.time_format) == \
+                baseline.time_of_trip(datum, city)
+
+
+def test_padded_and_unpadded_dates_agree():
+    time_format = '%m/%d/%Y %H:%M:%S'
+    assert parse_start_time('01/02/2016 00:12:34', time_format) == \
+        parse_start_time('1/2/2016 0:12:34', time_format)
+    assert calendar_day('2/29/2016') == (2, 'Monday')
+    assert calendar_date('02/09/2016') == (2016, 2, 9)
+
+
+@pytest.mark.parametrize('value, time_format', [
+    ('2/30/2016 10:00', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 24:00', '%m/%d/%Y %H:%M'),
+    ('1/1/2016', '%m/%d/%Y %H:%M'),
+    ('', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 00:99', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:ab', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:00:00', '%m/%d/%Y %H:%M'),
+    ('+1/1/2016 07:00', '%m/%d/%Y %H:%M'),
+    ('1/1/16 07:00', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:001', '%m/%d/%Y %H:%M'),
+    ('1/1/2016 07:00', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 07:ab:cd', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 00:09:55:77', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 07:0_0:00', '%m/%d/%Y %H:%M:%S'),
+    ('1/1/2016 23:59:60', '%m/%d/%Y %H:%M:%S'),
+])
+def test_malformed_values_raise(value, time_format):
+    with pytest.raises(ValueError):
+        datetime.strptime(value, time_format)
+    with pytest.raises(ValueError):
+        parse_start_time(value, time_format)
+    with pytest.raises(ValueError):
+        start_date_parser(time_format)(value)
+
+
+@pytest.mark.parametrize('value, time_format', [
+    ('1/1/2016  07:05', '%m/%d/%Y %H:%M'),
+    ('1/1/2016\t07:05:09', '%m/%d/%Y %H:%M:%S'),
+    ('12/31/2016 7:5:9', '%m/%d/%Y %H:%M:%S'),
+])
+def test_odd_values_parse_as_with_strptime(value, time_format):
+    t = datetime.strptime(value, time_format)
+
+    assert parse_start_time(value, time_format) == (t.month, t.hour, t.strftime('%A'))
+    assert start_date_parser(time_format)(value) == (t.year, t.month, t.day)
+
+
+def test_other_layouts_use_strptime():
+    parse = start_time_parser('%d.%m.%Y %H:%M')
+
+    assert parse is not start_time_parser('%m/%d/%Y %H:%M')
+    assert parse('29.02.2016 23:59') == (2, 23, 'Monday')
+    assert start_date_parser('%d.%m.%Y %H:%M')('29.02.2016 23:59') == (2016, 2, 29)
+    assert start_date_parser('%m/%d/%Y %H:%M')('2/29/2016 23:59') == (2016, 2, 29)
+    with pytest.raises(ValueError):
+        parse('2/29/2016 23:59')
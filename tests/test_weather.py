@@ -0,0 +1,98 @@
+import csv
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+import baseline
+from conftest import RAW_HEADERS, RAW_TRIPS
+from bikeshare.adapters import get_adapter
+from bikeshare.query import query
+from bikeshare.weather import (PRECIPITATION_BANDS, UNKNOWN_BAND, load_hourly_weather,
+                               ridership_by_weather)
+from bikeshare.wrangling import condense_data
+
+
+def precipitation(timestamp):
+    return (timestamp.day % 4) * 3.0
+
+
+def band_of(value, bands):
+    for edge, label in bands:
+        if value <= edge:
+            return label
+
+
+@pytest.fixture(scope='module')
+def weather_file(tmp_path_factory):
+    """
+    Hourly weather of 2016 with no rows for December, where every trip of
+    the year is unknown weather.
+    """
+    filename = str(tmp_path_factory.mktemp('weather') / 'weather.csv')
+    with open(filename, 'w', newline='') as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(['time', 'temperature', 'precipitation'])
+        timestamp = datetime(2016, 1, 1)
+        while timestamp.month != 12:
+            writer.writerow([timestamp.strftime('%Y-%m-%d %H:%M'), timestamp.month * 3 - 5,
+                             precipitation(timestamp)])
+            timestamp += timedelta(hours=1)
+    return filename
+
+
+def test_join_matches_the_start_hours(raw_file, city, weather_file, tmp_path):
+    store_file = str(tmp_path / 'out.trips')
+    condense_data(raw_file, store_file, city, out_format='store')
+    adapter = get_adapter(city)
+    start_index = RAW_HEADERS[city].index(adapter.start_column)
+    expected = Counter()
+    for trip in RAW_TRIPS[city][1:]:
+        start = datetime.strptime(trip[start_index], adapter.time_format)
+        band = UNKNOWN_BAND if start.month == 12 else band_of(precipitation(start),
+                                                               PRECIPITATION_BANDS)
+        datum = dict(zip(RAW_HEADERS[city], trip))
+        expected[(band, baseline.type_of_user(datum, city))] += 1
+
+    rows = ridership_by_weather(store_file, load_hourly_weather(weather_file))
+
+    assert {(row['precipitation_band'], row['user_type']): row['count'] for row in rows} == \
+        expected
+    assert sum(row['share'] for row in rows) == pytest.approx(100)
+
+
+def test_filter_on_measurements(data_dir, weather_file, tmp_path):
+    store_file = str(tmp_path / 'out.trips')
+    condense_data(str(data_dir / 'NYC-raw.csv'), store_file, 'NYC', out_format='store')
+    weather = load_hourly_weather(weather_file)
+
+    # March to November is 4 degrees and above, January and February below,
+    # December unknown (NaN compares false)
+    cold = query(store_file, where=[('temperature', '<', 4)], weather=weather)
+    warm = query(store_file, where=[('temperature', '>=', 4)], weather=weather)
+    assert cold[0]['count'] == 3
+    assert warm[0]['count'] == 4
+    unknown = query(store_file, by=['temperature_band'],
+                    where=[('temperature_band', '==', UNKNOWN_BAND)], weather=weather)
+    assert unknown == [{'temperature_band': UNKNOWN_BAND, 'count': 1, 'mean': unknown[0]['mean']}]
+
+
+def test_join_needs_a_trip_store(data_dir, weather_file):
+    with pytest.raises(ValueError):
+        ridership_by_weather(str(data_dir / 'NYC-Summary.csv'), load_hourly_weather(weather_file))
+
+
+def test_weather_of_one_year_only(tmp_path):
+    filename = str(tmp_path / 'weather.csv')
+    with open(filename, 'w') as f_out:
+        f_out.write('time,temperature,precipitation\n'
+                    '2016-12-31T23:00,1.0,\n2017-01-01T00:00,1.0,0.0\n')
+    with pytest.raises(ValueError):
+        load_hourly_weather(filename)
+
+    with open(filename, 'w') as f_out:
+        f_out.write('time,temperature,precipitation\n2016-12-31T23:00,1.0,\n')
+    weather = load_hourly_weather(filename)
+    assert weather.values['temperature'][-1] == 1.0
+    assert math.isnan(weather.values['precipitation'][-1])